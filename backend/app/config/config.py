@@ -10,6 +10,13 @@ load_dotenv()
 SECRET_KEY = os.environ["SECRET_KEY"]
 ALGORITHM = os.environ["ALGORITHM"]
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ["ACCESS_TOKEN_EXPIRE_MINUTES"])
+# Verified tokens remembered to skip repeated signature checks (0 disables)
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "1024"))
+
+# PASSWORD HASHING
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+HASH_MAX_CONCURRENCY = int(os.environ.get("HASH_MAX_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_QUEUE = int(os.environ.get("HASH_MAX_QUEUE", "64"))
 
 # LOGGING
 LOG_LEVEL = os.environ["LOG_LEVEL"]
@@ -18,6 +25,12 @@ LOG_FORMATTER = logging.Formatter(
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 SQLALCHEMY_ECHO = os.environ["SQLALCHEMY_ECHO"].lower() == "FALSE"
+# "stream" writes on the calling thread; "queue" hands records to a background writer thread
+LOG_MODE = os.environ.get("LOG_MODE", "stream").lower()
+# "text" or "json" (one object per line)
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+# Per-logger fraction of sub-WARNING records kept, e.g. "app.routes.energy=0.1,app.core.security=0.01"
+LOG_SAMPLING = os.environ.get("LOG_SAMPLING", "")
 
 # POSTGRES_DB
 POSTGRES_DB = os.environ["POSTGRES_DB"]
@@ -26,8 +39,82 @@ POSTGRES_PASSWORD = os.environ["POSTGRES_PASSWORD"]
 POSTGRES_HOST = os.environ["POSTGRES_HOST"]
 POSTGRES_PORT = os.environ["POSTGRES_PORT"]
 
+# STORAGE SCHEMA ("standard" or "compact": UUID keys and dictionary-encoded dimensions)
+ENERGY_SCHEMA_MODE = os.environ.get("ENERGY_SCHEMA_MODE", "standard").lower()
+
+# PARTITIONING
+# Range-partition the energy tables by month (Postgres native partitioning)
+ENERGY_PARTITIONING = os.environ.get("ENERGY_PARTITIONING", "false").lower() == "true"
+PARTITION_START = os.environ.get("PARTITION_START", "2023-01")
+PARTITION_MONTHS_AHEAD = int(os.environ.get("PARTITION_MONTHS_AHEAD", "3"))
+
+# RESPONSE CACHE
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "300"))
+# Seconds the data version read from the database is reused before checking for rows committed elsewhere
+DATA_VERSION_TTL_SECONDS = float(os.environ.get("DATA_VERSION_TTL_SECONDS", "1"))
+
+# CONNECTION POOLS
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+# Seconds before a pooled connection is replaced (-1 keeps connections forever)
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+# Prepared statements cached per connection (0 for pgbouncer transaction pooling)
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "100"))
+# Server-side statement timeout in milliseconds (0 disables)
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "0"))
+READ_POOL_SIZE = int(os.environ.get("READ_POOL_SIZE", "10"))
+READ_MAX_OVERFLOW = int(os.environ.get("READ_MAX_OVERFLOW", "20"))
+
+# INGEST
+# Rows per INSERT/commit in the batch ingest endpoints
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", "5000"))
+# Rejected rows described individually in an ingest response
+INGEST_MAX_ERRORS = int(os.environ.get("INGEST_MAX_ERRORS", "100"))
+
+# SYSTEM STATS
+# Months scanned in parallel (one read connection each) when building per-system statistics
+SYSTEM_STATS_CONCURRENCY = int(os.environ.get("SYSTEM_STATS_CONCURRENCY", "4"))
+
+# ANALYTICS ENGINE
+# "sql" aggregates in Postgres; "memory" serves series from NumPy copies of the energy tables
+ANALYTICS_ENGINE = os.environ.get("ANALYTICS_ENGINE", "sql").lower()
+# Seconds after which the in-memory stores are reloaded in full, even if no new rows were seen
+ANALYTICS_MAX_STALENESS_SECONDS = float(os.environ.get("ANALYTICS_MAX_STALENESS_SECONDS", "300"))
+
+# FORECASTING
+# Processes fitting forecast models
+FORECAST_WORKERS = int(os.environ.get("FORECAST_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Fitted models kept (per series and data version)
+FORECAST_CACHE_SIZE = int(os.environ.get("FORECAST_CACHE_SIZE", "512"))
+# Trailing days of history each model is fitted on
+FORECAST_HISTORY_DAYS = int(os.environ.get("FORECAST_HISTORY_DAYS", "365"))
+
+# LIVE UPDATES
+# Milliseconds ingested rows are coalesced into one pushed update
+LIVE_WINDOW_MS = int(os.environ.get("LIVE_WINDOW_MS", "250"))
+# Updates buffered per client before its backlog is replaced by a resync event
+LIVE_QUEUE_SIZE = int(os.environ.get("LIVE_QUEUE_SIZE", "32"))
+# Readings per dataset sent in one update; larger updates carry only counts and daily totals
+LIVE_MAX_READINGS = int(os.environ.get("LIVE_MAX_READINGS", "1000"))
+# Seconds between keepalive comments on an idle stream
+LIVE_KEEPALIVE_SECONDS = float(os.environ.get("LIVE_KEEPALIVE_SECONDS", "15"))
+
+# EXPORTS
+# Directory export files are written to (defaults to "energy-exports" in the system temp directory);
+# cleanup only deletes files named like exports, but a dedicated directory is still best
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "")
+# Exports running at once, and exports allowed to wait for one
+EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", "2"))
+EXPORT_MAX_QUEUED = int(os.environ.get("EXPORT_MAX_QUEUED", "32"))
+# Seconds a finished export stays downloadable before its file is deleted
+EXPORT_RETENTION_SECONDS = float(os.environ.get("EXPORT_RETENTION_SECONDS", "86400"))
+
 # SQLAlchemy database URL
 DATABASE_URL = (
     f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
     f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-)
\ No newline at end of file
+)
+# Replica for energy reads; defaults to the primary, but always with its own pool
+READ_DATABASE_URL = os.environ.get("READ_DATABASE_URL", DATABASE_URL)
\ No newline at end of file
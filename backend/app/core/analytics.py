@@ -0,0 +1,369 @@
+import argparse
+import asyncio
+import time
+from datetime import UTC, datetime
+
+import numpy as np
+from sqlalchemy import BigInteger, Float, func, select
+
+from app.config import config
+from app.core.cache import ENERGY_MODELS, data_version
+from app.core.database import read_engine
+from app.core.energy_queries import AGGREGATES, Aggregate, Bucket
+from app.core.logger import setup_logger
+from app.core.streaming import DICTIONARY_COLUMNS
+
+logger = setup_logger(__name__)
+
+ANALYTICS_ENGINES = ("sql", "memory")
+
+# Rows fetched per round trip while loading a table
+LOAD_CHUNK_SIZE = 50_000
+
+
+def is_memory_engine() -> bool:
+    """
+    Whether aggregate routes are served from the in-memory column store.
+
+    Raises:
+        ValueError: If ANALYTICS_ENGINE is not a known engine.
+    """
+    if config.ANALYTICS_ENGINE not in ANALYTICS_ENGINES:
+        raise ValueError(f"Unsupported ANALYTICS_ENGINE: {config.ANALYTICS_ENGINE}")
+    return config.ANALYTICS_ENGINE == "memory"
+
+
+def bucket_edges(first: np.datetime64, last: np.datetime64, bucket: Bucket) -> np.ndarray:
+    """
+    Start of every `date_trunc` bucket from the one holding `first` to the one
+    holding `last`, plus the end of the last; weeks start on Monday, as in Postgres.
+
+    Returns:
+        np.ndarray: datetime64[us] bucket edges.
+    """
+    if bucket == "week":
+        days = np.datetime64(first, "D").astype(np.int64), np.datetime64(last, "D").astype(np.int64)
+        # 1970-01-01 was a Thursday
+        monday = days[0] - (days[0] + 3) % 7
+        edges = np.arange(monday, days[1] + 8, 7)
+        edges = edges[: np.searchsorted(edges, days[1], side="right") + 1].astype("datetime64[D]")
+    elif bucket in ("hour", "day", "month"):
+        unit = {"hour": "h", "day": "D", "month": "M"}[bucket]
+        edges = np.arange(np.datetime64(first, unit), np.datetime64(last, unit) + 2)
+    else:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    return edges.astype("datetime64[us]")
+
+
+def _position(value: datetime) -> np.datetime64:
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+class ColumnStore:
+    """
+    One energy table held as NumPy columns, sorted by timestamp.
+
+    Numeric columns are float64 arrays and the string dimensions are
+    dictionary-encoded: an int32 code per row plus the list of distinct
+    values. Time ranges are pruned with `searchsorted` before any scan.
+
+    Attributes:
+        model: Energy model the store mirrors
+        timestamps (np.ndarray): datetime64[us] reading times
+        metrics (dict[str, np.ndarray]): Numeric columns
+        codes (dict[str, np.ndarray]): Dimension codes per row
+        categories (dict[str, np.ndarray]): Dimension values, indexed by code
+        high_water (int): Highest `ingest_seq` held, 0 when empty
+    """
+
+    def __init__(self, model):
+        self.model = model
+        columns = [column for column in model.__table__.columns if column.name != "id"]
+        self._metric_names = [column.name for column in columns if isinstance(column.type, Float)]
+        self._dimension_names = [column.name for column in columns if column.name in DICTIONARY_COLUMNS]
+        self._columns = [model.timestamp] + [getattr(model, name) for name in self._metric_names + self._dimension_names]
+        self.timestamps = np.empty(0, dtype="datetime64[us]")
+        self.metrics = {name: np.empty(0) for name in self._metric_names}
+        self.codes = {name: np.empty(0, dtype=np.int32) for name in self._dimension_names}
+        self.categories = {name: np.empty(0, dtype=object) for name in self._dimension_names}
+        # Code -> position in sorted value order, and the values in that order, so grouped output sorts like SQL
+        self._ranks: dict[str, np.ndarray] = {}
+        self._sorted: dict[str, np.ndarray] = {}
+        self.high_water = 0
+
+    async def load(self, base: "ColumnStore | None" = None) -> int:
+        """
+        Fill the store from the table, read in timestamp order.
+
+        Given `base`, only rows ingested after its `high_water` mark are read
+        and merged with a copy of its columns; `base` itself is left as it is.
+
+        Args:
+            base (ColumnStore, optional): Store of the same model to extend.
+
+        Returns:
+            int: Rows read from the table.
+        """
+        # Timestamps travel as integer microseconds, which NumPy takes without per-row conversion
+        epoch_us = (func.extract("epoch", self.model.timestamp) * 1_000_000).cast(BigInteger)
+        stmt = select(epoch_us, self.model.ingest_seq, *self._columns[1:]).order_by(self.model.timestamp)
+        timestamps, metrics = [], {name: [] for name in self._metric_names}
+        codes = {name: [] for name in self._dimension_names}
+        lookups: dict[str, dict[str, int]] = {name: {} for name in self._dimension_names}
+        high_water = 0
+        if base is not None:
+            stmt = stmt.where(self.model.ingest_seq > base.high_water)
+            timestamps.append(base.timestamps)
+            for name, values in base.metrics.items():
+                metrics[name].append(values)
+            for name, values in base.codes.items():
+                codes[name].append(values)
+                lookups[name] = {value: code for code, value in enumerate(base.categories[name].tolist())}
+            high_water = base.high_water
+
+        # Straight to the driver: rows are consumed column-wise, so SQLAlchemy's
+        # per-row result processing would only add to the load time
+        sql = str(stmt.compile(dialect=read_engine.dialect, compile_kwargs={"literal_binds": True}))
+        read = 0
+        async with read_engine.connect() as conn:
+            driver = (await conn.get_raw_connection()).driver_connection
+            async with driver.transaction(readonly=True):
+                cursor = await driver.cursor(sql)
+                while rows := await cursor.fetch(LOAD_CHUNK_SIZE):
+                    read += len(rows)
+                    columns = list(zip(*rows))
+                    timestamps.append(np.array(columns[0], dtype=np.int64).view("datetime64[us]"))
+                    # Each table commits in `ingest_seq` order, so no row below the highest one seen is still to come
+                    high_water = max(high_water, max(columns[1]))
+                    for name, values in zip(self._metric_names, columns[2:]):
+                        metrics[name].append(np.array(values, dtype=np.float64))
+                    for name, values in zip(self._dimension_names, columns[2 + len(self._metric_names):]):
+                        lookup = lookups[name]
+                        encode = lookup.setdefault
+                        codes[name].append(
+                            np.fromiter((encode(value, len(lookup)) for value in values), np.int32, len(values))
+                        )
+
+        def concat(parts, dtype):
+            return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+        self.timestamps = concat(timestamps, "datetime64[us]")
+        self.metrics = {name: concat(parts, np.float64) for name, parts in metrics.items()}
+        self.codes = {name: concat(parts, np.int32) for name, parts in codes.items()}
+        self.categories = {name: np.array(list(lookup), dtype=object) for name, lookup in lookups.items()}
+        self.high_water = high_water
+        # Rows read after `base` are sorted among themselves; re-sort only if they reach back before its last one
+        merged_at = len(base.timestamps) if base is not None else 0
+        if 0 < merged_at < len(self.timestamps) and self.timestamps[merged_at] < self.timestamps[merged_at - 1]:
+            order = np.argsort(self.timestamps, kind="stable")
+            self.timestamps = self.timestamps[order]
+            self.metrics = {name: values[order] for name, values in self.metrics.items()}
+            self.codes = {name: values[order] for name, values in self.codes.items()}
+        self._ranks, self._sorted = {}, {}
+        for name, values in self.categories.items():
+            order = np.argsort(values)
+            self._ranks[name] = np.empty(len(values), dtype=np.int64)
+            self._ranks[name][order] = np.arange(len(values))
+            self._sorted[name] = values[order]
+        return read
+
+    def series(
+        self,
+        metric: str,
+        bucket: Bucket,
+        aggregate: Aggregate,
+        group_by: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        **dimensions: list[str] | None,
+    ) -> list[tuple]:
+        """
+        In-memory equivalent of `series_query`: `(bucket, key, value)` rows ordered by bucket and key.
+
+        Args:
+            metric (str): Numeric column to aggregate.
+            bucket (Bucket): Time bucket size.
+            aggregate (Aggregate): Aggregate function name.
+            group_by (str, optional): Dimension column to split the series by.
+            start (datetime, optional): Inclusive lower bound on timestamp.
+            end (datetime, optional): Exclusive upper bound on timestamp.
+            **dimensions: Column name to list of accepted values; empty values are ignored.
+
+        Returns:
+            list[tuple]: Series rows.
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {aggregate}")
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, _position(start)))
+        hi = len(self.timestamps) if end is None else int(np.searchsorted(self.timestamps, _position(end)))
+        timestamps = self.timestamps[lo:hi]
+        values = self.metrics[metric][lo:hi]
+        keys = self.codes[group_by][lo:hi] if group_by else None
+
+        mask = None
+        for name, accepted in dimensions.items():
+            if accepted:
+                wanted = np.flatnonzero(np.isin(self.categories[name], accepted))
+                matches = np.isin(self.codes[name][lo:hi], wanted)
+                mask = matches if mask is None else mask & matches
+        if mask is not None:
+            timestamps, values = timestamps[mask], values[mask]
+            keys = keys[mask] if keys is not None else None
+        if not len(timestamps):
+            return []
+
+        # Rows are in time order, so each bucket is a contiguous run found by
+        # binary search on the bucket edges rather than by truncating every row
+        edges = bucket_edges(timestamps[0], timestamps[-1], bucket)
+        starts = np.searchsorted(timestamps, edges[:-1])
+        sizes = np.diff(np.append(starts, len(timestamps)))
+        filled = sizes > 0
+        bucket_starts, starts, sizes = edges[:-1][filled], starts[filled], sizes[filled]
+
+        if not group_by:
+            result = self._reduce_runs(aggregate, values, starts, sizes)
+            return list(zip(bucket_starts.tolist(), [None] * len(starts), result.tolist()))
+
+        width = len(self.categories[group_by])
+        groups = np.repeat(np.arange(len(starts)) * width, sizes) + self._ranks[group_by][keys]
+        size = len(starts) * width
+        counts = np.bincount(groups, minlength=size)
+        present = np.flatnonzero(counts)
+
+        if aggregate == "count":
+            result = counts.astype(np.float64)
+        elif aggregate in ("sum", "avg"):
+            result = np.bincount(groups, weights=values, minlength=size)
+            if aggregate == "avg":
+                result[present] /= counts[present]
+        else:
+            extreme = np.minimum if aggregate == "min" else np.maximum
+            result = np.full(size, np.inf if aggregate == "min" else -np.inf)
+            extreme.at(result, groups, values)
+
+        bucket_values = bucket_starts[present // width].tolist()
+        key_values = self._sorted[group_by][present % width].tolist()
+        return list(zip(bucket_values, key_values, result[present].tolist()))
+
+    @staticmethod
+    def _reduce_runs(aggregate: Aggregate, values: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        if aggregate == "count":
+            return sizes.astype(np.float64)
+        if aggregate == "min":
+            return np.minimum.reduceat(values, starts)
+        if aggregate == "max":
+            return np.maximum.reduceat(values, starts)
+        sums = np.add.reduceat(values, starts)
+        return sums / sizes if aggregate == "avg" else sums
+
+    def memory_usage(self) -> dict:
+        """
+        Bytes held per column (codes plus dictionary for dimensions), with the row count and total.
+        """
+        columns = {"timestamp": self.timestamps.nbytes}
+        columns.update({name: values.nbytes for name, values in self.metrics.items()})
+        for name, codes in self.codes.items():
+            dictionary = sum(len(value.encode("utf-8")) for value in self.categories[name])
+            columns[name] = codes.nbytes + self.categories[name].nbytes + dictionary
+        return {"rows": len(self.timestamps), "columns": columns, "bytes": sum(columns.values())}
+
+
+class AnalyticsEngine:
+    """
+    In-process column stores for both energy tables, kept in step with `data_version`.
+
+    Stores are loaded before the first query. When the data version read
+    from the database moves, including after ingests through other
+    processes, only the rows above each store's high-water mark are read
+    and merged in. A mark that went down means rows were removed, and that
+    store is loaded again in full, as are all stores once `max_staleness`
+    seconds have passed since the last full load, which also bounds how
+    long changes that leave the marks alone go unseen. Concurrent requests
+    wait for an update instead of starting their own. Updates fill new
+    stores and swap them in whole, so aggregations still running in worker
+    threads keep reading the old ones.
+
+    Attributes:
+        max_staleness (float): Seconds after which the stores are loaded again in full
+    """
+
+    def __init__(self, max_staleness: float):
+        self.max_staleness = max_staleness
+        self.stores = {model: ColumnStore(model) for model in ENERGY_MODELS}
+        self._version: tuple[int, ...] | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.appends = 0
+        self.load_seconds = 0.0
+
+    def _is_current(self, version: tuple[int, ...]) -> bool:
+        return self._version == version and time.monotonic() - self._loaded_at < self.max_staleness
+
+    async def ensure_loaded(self) -> None:
+        if self._is_current(await data_version.current()):
+            return
+        async with self._lock:
+            version = await data_version.current()
+            if self._is_current(version):
+                return
+            started = time.perf_counter()
+            full = self._version is None or time.monotonic() - self._loaded_at >= self.max_staleness
+            marks = dict(zip(ENERGY_MODELS, version))
+            previous = dict(zip(ENERGY_MODELS, self._version or ()))
+            stores, reads = {}, []
+            for model, store in self.stores.items():
+                if not full and marks[model] == previous[model]:
+                    stores[model] = store
+                    continue
+                stores[model] = ColumnStore(model)
+                base = None if full or marks[model] < previous[model] else store
+                reads.append(stores[model].load(base))
+            rows = await asyncio.gather(*reads)
+            self.stores = stores
+            self._version = version
+            if full:
+                self._loaded_at = time.monotonic()
+                self.loads += 1
+                self.load_seconds = time.perf_counter() - started
+                logger.info("🧮 Loaded %d energy rows into memory in %.2fs.", sum(rows), self.load_seconds)
+            else:
+                self.appends += 1
+                logger.debug("🧮 Merged %d new energy rows into memory in %.2fs.", sum(rows), time.perf_counter() - started)
+
+    async def series(self, model, *args, **filters) -> list[tuple]:
+        """
+        Run `ColumnStore.series` in a worker thread on the model's store, loading it first if stale.
+        """
+        await self.ensure_loaded()
+        return await asyncio.to_thread(self.stores[model].series, *args, **filters)
+
+    def stats(self) -> dict:
+        stats = {"loads": self.loads, "appends": self.appends, "load_seconds": self.load_seconds}
+        for model, store in self.stores.items():
+            usage = store.memory_usage()
+            stats[f"{model.__tablename__}_rows"] = usage["rows"]
+            stats[f"{model.__tablename__}_bytes"] = usage["bytes"]
+        return stats
+
+
+analytics = AnalyticsEngine(config.ANALYTICS_MAX_STALENESS_SECONDS)
+
+
+async def _report() -> None:
+    await analytics.ensure_loaded()
+    for model, store in analytics.stores.items():
+        usage = store.memory_usage()
+        print(f"{model.__tablename__}: {usage['rows']:,} rows, {usage['bytes'] / 2**20:.1f} MiB")
+        for name, size in usage["columns"].items():
+            print(f"  {name:<16}{size / 2**20:>10.2f} MiB")
+    await read_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the energy tables into memory and report their footprint.")
+    parser.add_argument("command", choices=["report"])
+    parser.parse_args()
+    asyncio.run(_report())
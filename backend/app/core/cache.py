@@ -0,0 +1,242 @@
+import asyncio
+import gzip
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from email.utils import format_datetime
+from urllib.parse import urlencode
+
+import brotli
+from fastapi import Request, Response
+from sqlalchemy import select
+
+from app.config import config
+from app.core.database import read_engine
+from app.core.energy_queries import high_water_query
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+
+# Bodies smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+ENERGY_MODELS = (EnergyGeneration, EnergyConsumption)
+
+
+class DataVersion:
+    """
+    Version of the energy data: the highest `ingest_seq` committed to each
+    energy table, as read through the read pool.
+
+    Every process derives it from the database, so rows committed by another
+    worker or by `init_db` invalidate this process's cached responses too.
+    `current` reuses the last value for `ttl` seconds, which bounds how long
+    another process's changes can go unnoticed; ingest calls `refresh` after
+    committing so its own rows are seen at once.
+
+    The marks are kept per table because each table has its own ingest lock:
+    commits are ordered within a table but not across the two, so a batch
+    that drew a lower number than one already committed to the other table
+    would not move a single maximum over both.
+
+    Attributes:
+        value (tuple[int, ...]): Last marks read, in `ENERGY_MODELS` order; empty before the first read
+        changed_at (datetime): When this process first saw the current version
+        ttl (float): Seconds a read version is reused
+    """
+
+    def __init__(self, ttl: float):
+        self.value: tuple[int, ...] = ()
+        self.changed_at = datetime.now(UTC).replace(microsecond=0)
+        self.ttl = ttl
+        self._fresh_until = 0.0
+        self._pending: asyncio.Task | None = None
+        self._reads = 0
+        self._applied = 0
+
+    async def current(self) -> tuple[int, ...]:
+        """
+        The version, re-read when older than `ttl`; concurrent callers share one read.
+        """
+        if time.monotonic() < self._fresh_until:
+            return self.value
+        pending = self._pending
+        if pending is None or pending.done() or pending.get_loop() is not asyncio.get_running_loop():
+            pending = self._pending = asyncio.ensure_future(self.refresh())
+        return await asyncio.shield(pending)
+
+    async def refresh(self) -> tuple[int, ...]:
+        """
+        Read the version from the database now.
+        """
+        self._reads += 1
+        read = self._reads
+        async with read_engine.connect() as conn:
+            result = await conn.execute(
+                select(*(high_water_query(model).scalar_subquery() for model in ENERGY_MODELS))
+            )
+            version = tuple(result.one())
+        # Reads can finish out of order; the one started last saw the newest data
+        if read > self._applied:
+            self._applied = read
+            self._fresh_until = time.monotonic() + self.ttl
+            if version != self.value:
+                self.value = version
+                self.changed_at = datetime.now(UTC).replace(microsecond=0)
+        return self.value
+
+
+data_version = DataVersion(config.DATA_VERSION_TTL_SECONDS)
+
+
+class CachedResponse:
+    """
+    A serialized response body with its pre-compressed variants and validators.
+    """
+
+    __slots__ = ("body", "encoded", "headers", "media_type", "etag", "last_modified", "version", "expires_at", "size")
+
+    def __init__(self, body: bytes, headers: dict[str, str], media_type: str, version: tuple[int, ...], ttl: float):
+        self.body = body
+        self.encoded = {"identity": body}
+        if len(body) >= COMPRESS_MIN_BYTES:
+            self.encoded["br"] = brotli.compress(body, quality=5)
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=6)
+        self.headers = headers
+        self.media_type = media_type
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.last_modified = format_datetime(data_version.changed_at, usegmt=True)
+        self.version = version
+        self.expires_at = time.monotonic() + ttl
+        self.size = sum(len(variant) for variant in self.encoded.values())
+
+
+class ResponseCache:
+    """
+    LRU response cache bounded by total body size, with per-entry TTL and
+    invalidation on `data_version` changes.
+
+    Attributes:
+        max_bytes (int): Memory budget for stored bodies
+        ttl (float): Seconds an entry stays fresh
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is not None and (entry.version != data_version.value or entry.expires_at < time.monotonic()):
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        if entry.size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+response_cache = ResponseCache(config.RESPONSE_CACHE_MAX_BYTES, config.RESPONSE_CACHE_TTL_SECONDS)
+
+
+def cache_key(request: Request) -> str:
+    """
+    Path plus query parameters in a canonical order.
+    """
+    return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+
+def _accepted_encodings(request: Request) -> set[str]:
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.lower())
+    return accepted
+
+
+def _render(request: Request, entry: CachedResponse, cache_status: str) -> Response:
+    headers = {
+        **entry.headers,
+        "ETag": entry.etag,
+        "Last-Modified": entry.last_modified,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding, Authorization",
+        "X-Cache": cache_status,
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and entry.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    accepted = _accepted_encodings(request)
+    encoding = next((name for name in ("br", "gzip") if name in accepted and name in entry.encoded), "identity")
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=entry.encoded[encoding], headers=headers, media_type=entry.media_type)
+
+
+async def cached_response(
+    request: Request,
+    build: Callable[[], Awaitable[tuple[bytes, dict[str, str]]]],
+    media_type: str = "application/json",
+) -> Response:
+    """
+    Serve a response from the cache, or build, compress and store it.
+
+    Responses carry an `ETag` and `Last-Modified`; a matching `If-None-Match`
+    gets a 304 without a body, and bodies are sent pre-compressed according
+    to `Accept-Encoding`.
+
+    Args:
+        request (Request): Incoming request; its path and query form the key.
+        build: Coroutine factory returning the body and extra response headers.
+        media_type (str): Content type of the body.
+
+    Returns:
+        Response: Cached, fresh or 304 response.
+    """
+    version = await data_version.current()
+    key = cache_key(request)
+    entry = response_cache.get(key)
+    if entry is not None:
+        return _render(request, entry, "HIT")
+
+    body, headers = await build()
+    entry = await asyncio.to_thread(CachedResponse, body, headers, media_type, version, response_cache.ttl)
+    response_cache.put(key, entry)
+    return _render(request, entry, "MISS")
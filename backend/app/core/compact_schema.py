@@ -0,0 +1,310 @@
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import config
+from app.core.logger import setup_logger
+from app.models.base import INGEST_SEQUENCE, record_columns
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+
+logger = setup_logger(__name__)
+
+# Dimension lookup tables: name -> key type. Systems and consumers get 4-byte
+# keys because the data generator can create more of them than SMALLINT holds.
+DIMENSIONS = {
+    "location": "SMALLINT",
+    "source": "SMALLINT",
+    "sector": "SMALLINT",
+    "system": "INTEGER",
+    "consumer": "INTEGER",
+}
+
+# Physical fact tables; columns are ordered widest first to avoid alignment padding
+FACT_TABLES = {
+    "energy_generation": """
+        CREATE TABLE IF NOT EXISTS energy_generation_facts (
+            id UUID PRIMARY KEY,
+            timestamp TIMESTAMP NOT NULL,
+            ingest_seq BIGINT NOT NULL DEFAULT nextval('energy_ingest_seq'),
+            energy_kwh REAL NOT NULL,
+            system_id INTEGER NOT NULL REFERENCES energy_dim_system (id),
+            location_id SMALLINT NOT NULL REFERENCES energy_dim_location (id),
+            source_id SMALLINT NOT NULL REFERENCES energy_dim_source (id)
+        )
+    """,
+    "energy_consumption": """
+        CREATE TABLE IF NOT EXISTS energy_consumption_facts (
+            id UUID PRIMARY KEY,
+            timestamp TIMESTAMP NOT NULL,
+            ingest_seq BIGINT NOT NULL DEFAULT nextval('energy_ingest_seq'),
+            energy_kwh REAL NOT NULL,
+            consumer_id INTEGER NOT NULL REFERENCES energy_dim_consumer (id),
+            location_id SMALLINT NOT NULL REFERENCES energy_dim_location (id),
+            sector_id SMALLINT NOT NULL REFERENCES energy_dim_sector (id),
+            price NUMERIC(10, 4) NOT NULL,
+            total NUMERIC(12, 2) NOT NULL
+        )
+    """,
+}
+
+FACT_INDEXES = {
+    "energy_generation": [
+        "(location_id, timestamp)",
+        "(source_id, timestamp)",
+        "(system_id)",
+        "(timestamp, id)",
+        "USING brin (timestamp)",
+        "(ingest_seq)",
+    ],
+    "energy_consumption": [
+        "(location_id, timestamp)",
+        "(sector_id, timestamp)",
+        "(consumer_id)",
+        "(timestamp, id)",
+        "USING brin (timestamp)",
+        "(ingest_seq)",
+    ],
+}
+
+# Views that present the facts with the columns and types of the standard tables.
+# REAL values go through numeric so 48.97 reads back as 48.97, not 48.970001220703125.
+VIEWS = {
+    "energy_generation": """
+        CREATE OR REPLACE VIEW energy_generation AS
+        SELECT f.id::text AS id, f.timestamp, f.energy_kwh::numeric::float8 AS energy_kwh,
+               src.name AS source, loc.name AS location, sys.name AS system_id, f.ingest_seq
+        FROM energy_generation_facts f
+        JOIN energy_dim_source src ON src.id = f.source_id
+        JOIN energy_dim_location loc ON loc.id = f.location_id
+        JOIN energy_dim_system sys ON sys.id = f.system_id
+    """,
+    "energy_consumption": """
+        CREATE OR REPLACE VIEW energy_consumption AS
+        SELECT f.id::text AS id, f.timestamp, f.energy_kwh::numeric::float8 AS energy_kwh,
+               loc.name AS location, sec.name AS sector, con.name AS consumer_id,
+               f.price::float8 AS price, f.total::float8 AS total, f.ingest_seq
+        FROM energy_consumption_facts f
+        JOIN energy_dim_location loc ON loc.id = f.location_id
+        JOIN energy_dim_sector sec ON sec.id = f.sector_id
+        JOIN energy_dim_consumer con ON con.id = f.consumer_id
+    """,
+}
+
+# INSTEAD OF INSERT triggers route writes (including COPY) on the views to the facts.
+# Returning NULL for duplicate ids makes them disappear from RETURNING, like ON CONFLICT DO NOTHING.
+INSERT_TRIGGERS = {
+    "energy_generation": """
+        INSERT INTO energy_generation_facts (id, timestamp, energy_kwh, system_id, location_id, source_id)
+        VALUES (NEW.id::uuid, NEW.timestamp, NEW.energy_kwh, energy_dim_system_id(NEW.system_id),
+                energy_dim_location_id(NEW.location), energy_dim_source_id(NEW.source))
+        ON CONFLICT (id) DO NOTHING
+    """,
+    "energy_consumption": """
+        INSERT INTO energy_consumption_facts
+            (id, timestamp, energy_kwh, consumer_id, location_id, sector_id, price, total)
+        VALUES (NEW.id::uuid, NEW.timestamp, NEW.energy_kwh, energy_dim_consumer_id(NEW.consumer_id),
+                energy_dim_location_id(NEW.location), energy_dim_sector_id(NEW.sector), NEW.price, NEW.total)
+        ON CONFLICT (id) DO NOTHING
+    """,
+}
+
+# View column -> dimension it is encoded by; the fact column is "<dimension>_id"
+DIMENSION_COLUMNS = {
+    "energy_generation": {"system_id": "system", "location": "location", "source": "source"},
+    "energy_consumption": {"consumer_id": "consumer", "location": "location", "sector": "sector"},
+}
+
+ENERGY_MODELS = (EnergyGeneration, EnergyConsumption)
+
+
+def is_compact() -> bool:
+    if config.ENERGY_SCHEMA_MODE not in ("standard", "compact"):
+        raise ValueError(f"Unknown ENERGY_SCHEMA_MODE: {config.ENERGY_SCHEMA_MODE}")
+    return config.ENERGY_SCHEMA_MODE == "compact"
+
+
+def managed_tables(metadata) -> list:
+    """
+    Tables `create_all` should create: everything except the energy tables
+    when they are provided as views by the compact schema.
+    """
+    if not is_compact():
+        return list(metadata.sorted_tables)
+    views = {model.__tablename__ for model in ENERGY_MODELS}
+    return [table for table in metadata.sorted_tables if table.name not in views]
+
+
+def _dimension_sql(name: str, key_type: str) -> list[str]:
+    table = f"energy_dim_{name}"
+    return [
+        f"CREATE TABLE IF NOT EXISTS {table} ("
+        f"id {key_type} GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY, name VARCHAR NOT NULL UNIQUE)",
+        f"""
+        CREATE OR REPLACE FUNCTION {table}_id(value VARCHAR) RETURNS {key_type} AS $$
+        DECLARE
+            result {key_type};
+        BEGIN
+            SELECT id INTO result FROM {table} WHERE name = value;
+            IF result IS NULL THEN
+                INSERT INTO {table} (name) VALUES (value) ON CONFLICT (name) DO NOTHING RETURNING id INTO result;
+                IF result IS NULL THEN
+                    SELECT id INTO result FROM {table} WHERE name = value;
+                END IF;
+            END IF;
+            RETURN result;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+    ]
+
+
+def _fact_sql(view: str) -> list[str]:
+    statements = [
+        FACT_TABLES[view],
+        # Fact tables created before the ingest sequence existed number their rows on upgrade
+        f"ALTER TABLE {view}_facts ADD COLUMN IF NOT EXISTS ingest_seq BIGINT NOT NULL "
+        f"DEFAULT nextval('{INGEST_SEQUENCE.name}')",
+    ]
+    for i, definition in enumerate(FACT_INDEXES[view]):
+        statements.append(f"CREATE INDEX IF NOT EXISTS ix_{view}_facts_{i} ON {view}_facts {definition}")
+    statements += [
+        VIEWS[view],
+        f"""
+        CREATE OR REPLACE FUNCTION {view}_insert() RETURNS trigger AS $$
+        BEGIN
+            {INSERT_TRIGGERS[view]};
+            IF NOT FOUND THEN
+                RETURN NULL;
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS {view}_insert ON {view}",
+        f"CREATE TRIGGER {view}_insert INSTEAD OF INSERT ON {view} FOR EACH ROW EXECUTE FUNCTION {view}_insert()",
+    ]
+    return statements
+
+
+async def _relation_kind(conn: AsyncConnection, name: str) -> str | None:
+    result = await conn.execute(
+        text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}
+    )
+    return result.scalar_one_or_none()
+
+
+async def ensure_compact_schema(conn: AsyncConnection) -> None:
+    """
+    Create the compact energy schema: dimension lookup tables, UUID-keyed
+    fact tables and views named like the standard tables.
+
+    Standard tables found in place are migrated: their rows are re-inserted
+    through the views and the old tables dropped. Runs in the caller's transaction.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+    """
+    if config.ENERGY_PARTITIONING:
+        raise ValueError("ENERGY_PARTITIONING is not supported with ENERGY_SCHEMA_MODE=compact")
+
+    await conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {INGEST_SEQUENCE.name}"))
+    for name, key_type in DIMENSIONS.items():
+        for statement in _dimension_sql(name, key_type):
+            await conn.execute(text(statement))
+
+    for model in ENERGY_MODELS:
+        view = model.__tablename__
+        legacy = None
+        if await _relation_kind(conn, view) in ("r", "p"):
+            legacy = f"{view}_legacy"
+            logger.info(f"🗜️ Migrating {view} to the compact schema...")
+            await conn.execute(text(f"ALTER TABLE {view} RENAME TO {legacy}"))
+
+        for statement in _fact_sql(view):
+            await conn.execute(text(statement))
+
+        if legacy:
+            columns = ", ".join(column.name for column in record_columns(model))
+            result = await conn.execute(text(f"INSERT INTO {view} ({columns}) SELECT {columns} FROM {legacy}"))
+            await conn.execute(text(f"DROP TABLE {legacy}"))
+            logger.info(f"✅ Moved {result.rowcount} rows into {view}_facts.")
+
+
+def _bulk_insert_sql(model, staging: str) -> list[str]:
+    """
+    Set-based equivalent of the insert trigger for a staged batch: add the new
+    dimension values, then insert the facts with their keys resolved by joins.
+    """
+    view = model.__tablename__
+    encoded = DIMENSION_COLUMNS[view]
+    statements = [
+        # NOT EXISTS first so known values do not burn identity numbers on conflicts
+        f"INSERT INTO energy_dim_{dim} (name) SELECT DISTINCT s.{column} FROM {staging} s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM energy_dim_{dim} d WHERE d.name = s.{column}) "
+        f"ON CONFLICT (name) DO NOTHING"
+        for column, dim in encoded.items()
+    ]
+
+    targets, values, joins = [], [], []
+    for column in record_columns(model):
+        dim = encoded.get(column.name)
+        if dim is None:
+            targets.append(column.name)
+            values.append(f"s.{column.name}::uuid" if column.name == "id" else f"s.{column.name}")
+        else:
+            targets.append(f"{dim}_id")
+            values.append(f"d_{dim}.id")
+            joins.append(f"JOIN energy_dim_{dim} d_{dim} ON d_{dim}.name = s.{column.name}")
+    statements.append(
+        f"INSERT INTO {view}_facts ({', '.join(targets)}) SELECT {', '.join(values)} "
+        f"FROM {staging} s {' '.join(joins)} ON CONFLICT (id) DO NOTHING RETURNING id"
+    )
+    return statements
+
+
+async def copy_records(conn: AsyncConnection, driver, model, records: list[tuple]) -> list[tuple]:
+    """
+    `COPY` records into an energy table in either schema mode.
+
+    In compact mode the records are copied into a temporary staging table
+    and moved into the facts with set-based statements, which is much faster
+    than firing the view's insert trigger per row. Ids already present are
+    skipped there, as they are by the trigger. Must run inside a transaction.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+        driver: The asyncpg connection underlying `conn`.
+        model: EnergyGeneration or EnergyConsumption.
+        records (list[tuple]): Rows in table column order.
+
+    Returns:
+        list[tuple]: The records that were actually inserted.
+    """
+    table = model.__tablename__
+    columns = [column.name for column in record_columns(model)]
+    if not is_compact():
+        # A plain COPY inserts every record or fails on the first duplicate key
+        await driver.copy_records_to_table(table, records=records, columns=columns)
+        return records
+
+    staging = f"{table}_staging"
+    await conn.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table}) ON COMMIT DELETE ROWS"
+    ))
+    await driver.copy_records_to_table(staging, records=records, columns=columns)
+    *dimensions, facts = _bulk_insert_sql(model, staging)
+    for statement in dimensions:
+        await conn.execute(text(statement))
+    result = await conn.execute(text(facts))
+    inserted = {str(value) for value in result.scalars()}
+    # The staging table is scanned in copy order, so of records repeating an id the first is the one inserted
+    position = columns.index("id")
+    kept = []
+    for record in records:
+        key = str(uuid.UUID(str(record[position])))
+        if key in inserted:
+            inserted.remove(key)
+            kept.append(record)
+    return kept
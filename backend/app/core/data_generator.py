@@ -1,20 +1,33 @@
-import csv
+import argparse
 import os
-import uuid
-import random
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import List
+
+import numpy as np
 
 # Paths
 DATA_DIR = "data"
 GEN_CSV = os.path.join(DATA_DIR, "energy_generation.csv")
 CON_CSV = os.path.join(DATA_DIR, "energy_consumption.csv")
-os.makedirs(DATA_DIR, exist_ok=True)
 
 # Date range
 START_DATE = datetime(2023, 1, 1)
 END_DATE = datetime(2025, 4, 8)
 
+# Reading interval per resolution; capacities are expressed per day
+RESOLUTIONS = {
+    "daily": timedelta(days=1),
+    "hourly": timedelta(hours=1),
+    "15min": timedelta(minutes=15),
+}
+
+# Approximate number of rows generated and written per chunk
+CHUNK_ROWS = 500_000
+
+GEN_FIELDS = ["id", "timestamp", "energy_kwh", "source", "location", "system_id"]
+CON_FIELDS = ["id", "timestamp", "energy_kwh", "location", "sector", "consumer_id", "price", "total"]
+
 # Generation config with initial capacities
 GENERATION_CONFIG = {
     "USA": {
@@ -66,123 +79,362 @@ CONSUMPTION_CONFIG = {
     },
 }
 
+# Region (state or constituent country) of every consumption location
+CONSUMPTION_REGIONS = {
+    "New York": "New York",
+    "Texas": "Texas",
+    "London": "England",
+    "Manchester": "England",
+    "Sydney": "New South Wales",
+    "Melbourne": "Victoria",
+}
+
 
-def date_range(start: datetime, end: datetime) -> List[datetime]:
-    current = start
-    while current <= end:
-        yield current
-        current += timedelta(days=1)
+_HEX_DIGITS = np.array(list(b"0123456789abcdef"), dtype=np.uint8)
+_UUID_HEX_POSITIONS = [i for i in range(36) if i not in (8, 13, 18, 23)]
 
 
 def month_index(date: datetime) -> int:
     return (date.year - START_DATE.year) * 12 + (date.month - START_DATE.month)
 
 
-def generate_generation_data(filepath: str):
-    rows = []
-    for date in date_range(START_DATE, END_DATE):
-        for country, sources in GENERATION_CONFIG.items():
-            country_total = 0
-            for source_type, systems in sources.items():
-                system_ids = list(systems.items())
-                if not system_ids:
-                    continue
-
-                active_systems = random.sample(system_ids, k=random.randint(1, len(system_ids)))
-                for sys_id, base_capacity in system_ids:
-                    # Capacity upgrade factor
-                    monthly_increment = 0.02 * base_capacity  # 2% per month
-                    upgrade = month_index(date) * monthly_increment
-                    final_capacity = base_capacity + upgrade
-
-                    if (sys_id, base_capacity) in active_systems:
-                        energy_kwh = round(random.uniform(0.85, 1.0) * final_capacity, 2)
-                        country_total += energy_kwh
-                    else:
-                        energy_kwh = round(random.uniform(0.0, 0.1) * final_capacity, 2)
-
-                    rows.append({
-                        "id": str(uuid.uuid4()),
-                        "timestamp": date.replace(hour=23, minute=59).isoformat(),
-                        "energy_kwh": energy_kwh,
-                        "source": source_type,
-                        "location": country,
-                        "system_id": sys_id,
-                    })
-
-            if country_total < 10:
-                print(f"⚠️ Warning: Very low generation for {country} on {date.date()}")
-
-    with open(filepath, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["id", "timestamp", "energy_kwh", "source", "location", "system_id"])
-        writer.writeheader()
-        writer.writerows(rows)
-    print(f"✅ Generated {len(rows)} generation rows at {filepath}")
-
-
-def generate_consumption_data(filepath: str):
-    rows = []
-    # Assign base capacity to each consumer only once
-    consumer_base_capacity = {}
-
-    for country, locations in CONSUMPTION_CONFIG.items():
-        for loc, sectors in locations.items():
-            for sector, consumers in sectors.items():
-                for con_id in consumers:
-                    # Assign base capacity between 30 and 70 kWh per day
-                    consumer_base_capacity[con_id] = random.randint(30, 70)
-
-    for date in date_range(START_DATE, END_DATE):
-        for country, locations in CONSUMPTION_CONFIG.items():
-            country_total = 0
-            for loc, sectors in locations.items():
-                for sector, consumers in sectors.items():
-                    consumer_ids = list(consumers.items())
-
-                    if not consumer_ids:
-                        continue
-
-                    # Randomly decide who is active today
-                    active_consumers = random.sample(consumer_ids, k=random.randint(1, len(consumer_ids)))
-
-                    for con_id, price_range in consumer_ids:
-                        base_capacity = consumer_base_capacity[con_id]
-                        monthly_growth = 0.01 * base_capacity  # 1% monthly capacity growth
-                        upgrade = month_index(date) * monthly_growth
-                        final_capacity = base_capacity + upgrade
-
-                        if (con_id, price_range) in active_consumers:
-                            energy_kwh = round(random.uniform(0.8, 1.0) * final_capacity, 2)
-                            price = round(random.uniform(*price_range), 4)
-                            total = round(energy_kwh * price, 2)
-                            country_total += energy_kwh
-                        else:
-                            energy_kwh = price = total = 0.0
-
-                        rows.append({
-                            "id": str(uuid.uuid4()),
-                            "timestamp": date.replace(hour=23, minute=59).isoformat(),
-                            "energy_kwh": energy_kwh,
-                            "location": loc,
-                            "sector": sector,
-                            "consumer_id": con_id,
-                            "price": price,
-                            "total": total,
-                        })
-
-            if country_total < 5:
-                print(f"⚠️ Warning: Very low consumption for {country} on {date.date()}")
-
-    with open(filepath, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            "id", "timestamp", "energy_kwh", "location", "sector", "consumer_id", "price", "total"
-        ])
-        writer.writeheader()
-        writer.writerows(rows)
-
-    print(f"✅ Generated {len(rows)} consumption rows at {filepath}")
+def timestamps(start: datetime, end: datetime, resolution: str) -> np.ndarray:
+    """
+    Reading times between two dates, inclusive of the end day.
+
+    Daily readings keep the historical 23:59 stamp; finer resolutions start
+    each interval on the hour or quarter hour.
+
+    Args:
+        start (datetime): First day.
+        end (datetime): Last day.
+        resolution (str): Key of `RESOLUTIONS`.
+
+    Returns:
+        np.ndarray: datetime64[m] reading times.
+    """
+    step = np.timedelta64(int(RESOLUTIONS[resolution].total_seconds() // 60), "m")
+    first = np.datetime64(start.date(), "m")
+    stop = np.datetime64(end.date(), "m") + np.timedelta64(1, "D")
+    times = np.arange(first, stop, step)
+    if resolution == "daily":
+        times = times + np.timedelta64(23 * 60 + 59, "m")
+    return times
+
+
+def month_indices(times: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `month_index` for datetime64 values.
+    """
+    months = times.astype("datetime64[M]").astype(np.int64)
+    return months - np.datetime64(START_DATE, "M").astype(np.int64)
+
+
+def uuid4_array(rng: np.random.Generator, n: int) -> np.ndarray:
+    """
+    Random version 4 UUID strings drawn from a seeded generator.
+
+    Args:
+        rng (np.random.Generator): Source of randomness.
+        n (int): Number of UUIDs.
+
+    Returns:
+        np.ndarray: `S36` array of canonical UUID strings.
+    """
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    nibbles = np.stack([raw >> 4, raw & 0x0F], axis=2).reshape(n, 32)
+    chars = np.full((n, 36), ord("-"), dtype=np.uint8)
+    chars[:, _UUID_HEX_POSITIONS] = _HEX_DIGITS[nibbles]
+    return chars.view("S36").ravel()
+
+
+def active_mask(rng: np.random.Generator, steps: int, groups: list[np.ndarray], width: int) -> np.ndarray:
+    """
+    Pick a random non-empty subset of each group to be active at every step.
+
+    For every step and group, `k` is drawn uniformly from 1..len(group) and
+    the `k` members with the lowest random keys are marked active, matching
+    `random.sample(group, k=random.randint(1, len(group)))`.
+
+    Args:
+        rng (np.random.Generator): Source of randomness.
+        steps (int): Number of time steps.
+        groups (list[np.ndarray]): Column indices of each group.
+        width (int): Total number of columns.
+
+    Returns:
+        np.ndarray: Boolean array of shape (steps, width).
+    """
+    mask = np.zeros((steps, width), dtype=bool)
+    for columns in groups:
+        ranks = rng.random((steps, len(columns))).argsort(axis=1).argsort(axis=1)
+        active = rng.integers(1, len(columns) + 1, size=(steps, 1))
+        mask[:, columns] = ranks < active
+    return mask
+
+
+def _expand(ids: list[str], copies: int) -> list[str]:
+    if copies == 1:
+        return ids
+    return [f"{base}-{k}" for base in ids for k in range(1, copies + 1)]
+
+
+def _format_decimal(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Format non-negative floats like `str(round(value, decimals))`, without per-row Python.
+
+    Float-to-string conversion dominates generation time, so values are split
+    into integer and fractional parts and the fraction looked up in a table
+    of pre-formatted digits (`88.5`, `0.0`, `0.0125`).
+
+    Args:
+        values (np.ndarray): Non-negative floats.
+        decimals (int): Decimal places to round to.
+
+    Returns:
+        np.ndarray: Bytes array of formatted numbers.
+    """
+    scale = 10 ** decimals
+    scaled = np.rint(values * scale).astype(np.int64)
+    fractions = np.array(
+        [f"{k:0{decimals}d}".rstrip("0") or "0" for k in range(scale)], dtype=bytes
+    )
+    whole = (scaled // scale).astype(bytes)
+    return np.char.add(np.char.add(whole, b"."), fractions[scaled % scale])
+
+
+def _join_columns(columns: list[np.ndarray]) -> bytes:
+    line = columns[0]
+    for column in columns[1:]:
+        line = np.char.add(line, column)
+    return b"\n".join(line.tolist()) + b"\n"
+
+
+def _csv_prefix(values) -> np.ndarray:
+    return np.array([b"," + value.encode() for value in values], dtype=bytes)
+
+
+def _chunks(times: np.ndarray, width: int):
+    steps = max(1, CHUNK_ROWS // max(width, 1))
+    for i in range(0, len(times), steps):
+        yield times[i:i + steps]
+
+
+def _day_fraction(resolution: str) -> float:
+    return RESOLUTIONS[resolution] / timedelta(days=1)
+
+
+def _write_generation_part(country, sources, path, seed, start, end, resolution, systems_per_config):
+    rng = np.random.default_rng(seed)
+    system_ids, source_names, capacities, groups = [], [], [], []
+    for source_type, systems in sources.items():
+        expanded = _expand(list(systems), systems_per_config)
+        if not expanded:
+            continue
+        groups.append(np.arange(len(system_ids), len(system_ids) + len(expanded)))
+        system_ids += expanded
+        source_names += [source_type] * len(expanded)
+        capacities += [systems[sid.rsplit("-", 1)[0] if systems_per_config > 1 else sid] for sid in expanded]
+
+    width = len(system_ids)
+    capacity = np.array(capacities, dtype=np.float64)
+    # source, location and system_id only vary by column, so they are pre-joined once
+    dimensions = _csv_prefix(f"{source},{country},{sid}" for source, sid in zip(source_names, system_ids))
+    fraction = _day_fraction(resolution)
+    rows = low_steps = 0
+
+    with open(path, "wb") as f:
+        for times in _chunks(timestamps(start, end, resolution), width):
+            steps = len(times)
+            # 2% per month capacity upgrade
+            final_capacity = capacity * (1 + 0.02 * month_indices(times))[:, None]
+            active = active_mask(rng, steps, groups, width)
+            factor = np.where(active, rng.uniform(0.85, 1.0, (steps, width)), rng.uniform(0.0, 0.1, (steps, width)))
+            energy = np.round(factor * final_capacity * fraction, 2)
+            low_steps += int((np.where(active, energy, 0).sum(axis=1) < 10 * fraction).sum())
+
+            n = steps * width
+            f.write(_join_columns([
+                uuid4_array(rng, n),
+                np.repeat(_csv_prefix(np.datetime_as_string(times, unit="s")), width),
+                np.char.add(b",", _format_decimal(energy.ravel(), 2)),
+                np.tile(dimensions, steps),
+            ]))
+            rows += n
+
+    if low_steps:
+        print(f"⚠️ Warning: Very low generation for {country} in {low_steps} intervals")
+    return rows
+
+
+def _write_consumption_part(country, locations, path, seed, start, end, resolution, consumers_per_config):
+    rng = np.random.default_rng(seed)
+    consumer_ids, location_names, sectors, price_ranges, groups = [], [], [], [], []
+    for loc, loc_sectors in locations.items():
+        for sector, consumers in loc_sectors.items():
+            expanded = _expand(list(consumers), consumers_per_config)
+            if not expanded:
+                continue
+            groups.append(np.arange(len(consumer_ids), len(consumer_ids) + len(expanded)))
+            consumer_ids += expanded
+            location_names += [loc] * len(expanded)
+            sectors += [sector] * len(expanded)
+            price_ranges += [
+                consumers[cid.rsplit("-", 1)[0] if consumers_per_config > 1 else cid] for cid in expanded
+            ]
+
+    width = len(consumer_ids)
+    # Base capacity between 30 and 70 kWh per day, assigned once per consumer
+    capacity = rng.integers(30, 71, size=width).astype(np.float64)
+    low_price, high_price = np.array(price_ranges, dtype=np.float64).T
+    # location, sector and consumer_id only vary by column, so they are pre-joined once
+    dimensions = _csv_prefix(
+        f"{loc},{sector},{cid}," for loc, sector, cid in zip(location_names, sectors, consumer_ids)
+    )
+    fraction = _day_fraction(resolution)
+    rows = low_steps = 0
+
+    with open(path, "wb") as f:
+        for times in _chunks(timestamps(start, end, resolution), width):
+            steps = len(times)
+            # 1% monthly capacity growth
+            final_capacity = capacity * (1 + 0.01 * month_indices(times))[:, None]
+            active = active_mask(rng, steps, groups, width)
+            energy = np.round(rng.uniform(0.8, 1.0, (steps, width)) * final_capacity * fraction, 2)
+            price = np.round(rng.uniform(low_price, high_price, (steps, width)), 4)
+            energy = np.where(active, energy, 0.0)
+            price = np.where(active, price, 0.0)
+            total = np.round(energy * price, 2)
+            low_steps += int((energy.sum(axis=1) < 5 * fraction).sum())
+
+            n = steps * width
+            f.write(_join_columns([
+                uuid4_array(rng, n),
+                np.repeat(_csv_prefix(np.datetime_as_string(times, unit="s")), width),
+                np.char.add(b",", _format_decimal(energy.ravel(), 2)),
+                np.tile(dimensions, steps),
+                _format_decimal(price.ravel(), 4),
+                np.char.add(b",", _format_decimal(total.ravel(), 2)),
+            ]))
+            rows += n
+
+    if low_steps:
+        print(f"⚠️ Warning: Very low consumption for {country} in {low_steps} intervals")
+    return rows
+
+
+def _generate(filepath, fields, part_writer, config, seed, stream, workers, **options):
+    """
+    Run one part writer per country in a process pool and concatenate the parts.
+
+    Each country gets its own child of the seed sequence (and each dataset
+    its own `stream`), so output is reproducible for a given seed regardless
+    of scheduling.
+    """
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    countries = list(config)
+    seeds = np.random.SeedSequence(seed, spawn_key=(stream,)).spawn(len(countries))
+    parts = [f"{filepath}.{i}.part" for i in range(len(countries))]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(part_writer, country, config[country], part, child, **options)
+            for country, part, child in zip(countries, parts, seeds)
+        ]
+        rows = sum(future.result() for future in futures)
+
+    with open(filepath, "wb") as out:
+        out.write((",".join(fields) + "\n").encode())
+        for part in parts:
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out, length=16 * 1024 * 1024)
+            os.remove(part)
+    return rows
+
+
+def generate_generation_data(
+    filepath: str,
+    seed: int | None = None,
+    start: datetime = START_DATE,
+    end: datetime = END_DATE,
+    resolution: str = "daily",
+    systems_per_config: int = 1,
+    workers: int | None = None,
+) -> int:
+    """
+    Generate synthetic generation readings for every configured system.
+
+    Args:
+        filepath (str): Destination CSV.
+        seed (int, optional): Seed for reproducible output.
+        start (datetime): First day.
+        end (datetime): Last day, inclusive.
+        resolution (str): daily, hourly or 15min.
+        systems_per_config (int): Synthetic systems generated per configured system.
+        workers (int, optional): Process pool size; defaults to the CPU count.
+
+    Returns:
+        int: Number of rows written.
+    """
+    rows = _generate(
+        filepath, GEN_FIELDS, _write_generation_part, GENERATION_CONFIG, seed, 0, workers,
+        start=start, end=end, resolution=resolution, systems_per_config=systems_per_config,
+    )
+    print(f"✅ Generated {rows} generation rows at {filepath}")
+    return rows
+
+
+def generate_consumption_data(
+    filepath: str,
+    seed: int | None = None,
+    start: datetime = START_DATE,
+    end: datetime = END_DATE,
+    resolution: str = "daily",
+    consumers_per_config: int = 1,
+    workers: int | None = None,
+) -> int:
+    """
+    Generate synthetic consumption readings for every configured consumer.
+
+    Args:
+        filepath (str): Destination CSV.
+        seed (int, optional): Seed for reproducible output.
+        start (datetime): First day.
+        end (datetime): Last day, inclusive.
+        resolution (str): daily, hourly or 15min.
+        consumers_per_config (int): Synthetic consumers generated per configured consumer.
+        workers (int, optional): Process pool size; defaults to the CPU count.
+
+    Returns:
+        int: Number of rows written.
+    """
+    rows = _generate(
+        filepath, CON_FIELDS, _write_consumption_part, CONSUMPTION_CONFIG, seed, 1, workers,
+        start=start, end=end, resolution=resolution, consumers_per_config=consumers_per_config,
+    )
+    print(f"✅ Generated {rows} consumption rows at {filepath}")
+    return rows
 
 
 if __name__ == "__main__":
-    generate_generation_data(GEN_CSV)
-    generate_consumption_data(CON_CSV)
+    parser = argparse.ArgumentParser(description="Generate synthetic energy CSVs.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=START_DATE, help="First day (ISO date)")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=END_DATE, help="Last day (ISO date)")
+    parser.add_argument("--resolution", choices=list(RESOLUTIONS), default="daily")
+    parser.add_argument("--systems", type=int, default=1, help="Synthetic systems per configured system")
+    parser.add_argument("--consumers", type=int, default=1, help="Synthetic consumers per configured consumer")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+    parser.add_argument("--out-dir", default=DATA_DIR, help="Output directory")
+    args = parser.parse_args()
+
+    common = {"seed": args.seed, "start": args.start, "end": args.end,
+              "resolution": args.resolution, "workers": args.workers}
+    generate_generation_data(
+        os.path.join(args.out_dir, os.path.basename(GEN_CSV)), systems_per_config=args.systems, **common
+    )
+    generate_consumption_data(
+        os.path.join(args.out_dir, os.path.basename(CON_CSV)), consumers_per_config=args.consumers, **common
+    )
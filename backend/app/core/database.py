@@ -1,27 +1,84 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.config import config
+from app.core.metrics import MetricsPool, instrument_engine
 from app.models import Base
 
 metadata = Base.metadata
 
-# Create async SQLAlchemy engine
-engine = create_async_engine(config.DATABASE_URL, echo=config.SQLALCHEMY_ECHO)
 
-# Create session factory
+def create_engine(url: str, pool_size: int, max_overflow: int, read_only: bool = False) -> AsyncEngine:
+    """
+    Create an instrumented async engine with the pool and driver settings from config.
+
+    Args:
+        url (str): SQLAlchemy database URL.
+        pool_size (int): Connections kept open.
+        max_overflow (int): Extra connections allowed under load.
+        read_only (bool): Open every transaction read-only, so a misrouted write fails loudly.
+
+    Returns:
+        AsyncEngine: The new engine.
+    """
+    server_settings = {}
+    if config.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(config.DB_STATEMENT_TIMEOUT_MS)
+    if read_only:
+        server_settings["default_transaction_read_only"] = "on"
+
+    return create_async_engine(
+        url,
+        echo=config.SQLALCHEMY_ECHO,
+        poolclass=MetricsPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        connect_args={
+            # SQLAlchemy's and asyncpg's prepared statement caches; set both to 0 behind pgbouncer
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    )
+
+
+# Create async SQLAlchemy engines: the primary for writes, a separate pool for energy reads
+engine = create_engine(config.DATABASE_URL, config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW)
+read_engine = create_engine(config.READ_DATABASE_URL, config.READ_POOL_SIZE, config.READ_MAX_OVERFLOW, read_only=True)
+instrument_engine(engine)
+instrument_engine(read_engine, "read")
+
+# Create session factories
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     expire_on_commit=False,
     class_=AsyncSession,
 )
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
 
 async def get_db():
     """
     Dependency that provides an async DB session.
-    
+
     Yields:
         AsyncSession: SQLAlchemy async session
     """
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_db():
+    """
+    Dependency that provides a read-only async DB session on the read replica pool.
+
+    Yields:
+        AsyncSession: SQLAlchemy async session
+    """
+    async with ReadSessionLocal() as session:
+        yield session
@@ -0,0 +1,120 @@
+from collections.abc import Sequence
+from typing import Literal
+
+import numpy as np
+
+Method = Literal["lttb", "minmax"]
+
+
+def _bucket_edges(start: int, stop: int, buckets: int) -> np.ndarray:
+    return np.linspace(start, stop, buckets + 1).astype(np.int64)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: pick the points that best preserve the visual shape of a line.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the point kept
+    from the previous bucket and the mean of the next bucket. Candidate
+    areas are computed with array operations per bucket; only the walk
+    across buckets, which depends on the previous choice, is a loop.
+
+    Args:
+        x (np.ndarray): Ascending x values (e.g. timestamps as numbers).
+        y (np.ndarray): Values, same length as `x`.
+        points (int): Number of points to keep (at least 3).
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    edges = _bucket_edges(1, n - 1, points - 2)
+    # Mean point of every bucket, plus the last point as the "next bucket" of the final one
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    mean_x = np.append(sums_x / sizes, x[-1])
+    mean_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = mean_x[i + 1], mean_y[i + 1]
+        areas = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Min/max envelope: keep the lowest and highest point of `points // 2` equal-count buckets.
+
+    Fully vectorized; preserves every spike, which LTTB may smooth away.
+
+    Args:
+        x (np.ndarray): Ascending x values.
+        y (np.ndarray): Values, same length as `x`.
+        points (int): Upper bound on the number of points kept.
+
+    Returns:
+        np.ndarray: Sorted, unique indices of the kept points.
+    """
+    n = len(x)
+    buckets = points // 2
+    if points >= n or buckets < 1:
+        return np.arange(n)
+
+    edges = _bucket_edges(0, n, buckets)
+    sizes = np.diff(edges)
+    bucket = np.repeat(np.arange(buckets), sizes)
+    kept = []
+    for extreme in (np.minimum, np.maximum):
+        hits = np.flatnonzero(y == np.repeat(extreme.reduceat(y, edges[:-1]), sizes))
+        # First hit per bucket, in case the extreme value repeats
+        _, first = np.unique(bucket[hits], return_index=True)
+        kept.append(hits[first])
+    return np.unique(np.concatenate(kept))
+
+
+ALGORITHMS = {"lttb": lttb, "minmax": minmax}
+
+
+def downsample_series(rows: Sequence[Sequence], points: int, method: Method = "lttb") -> list[tuple]:
+    """
+    Downsample `(bucket, key, value)` series rows to at most `points` per key.
+
+    Rows are split into one series per key, each series is reduced on its
+    own, and the kept rows are returned in their original order.
+
+    Args:
+        rows (Sequence[Sequence]): Series rows ordered by bucket.
+        points (int): Point budget per series.
+        method (Method): "lttb" or "minmax".
+
+    Returns:
+        list[tuple]: The kept rows.
+    """
+    if len(rows) <= points:
+        return [tuple(row) for row in rows]
+
+    buckets, keys, values = zip(*rows)
+    x = np.array(buckets, dtype="datetime64[us]").astype(np.int64).astype(np.float64)
+    y = np.array(values, dtype=np.float64)
+    _, codes = np.unique(np.array([str(key) for key in keys]), return_inverse=True)
+
+    # Stable sort by key keeps each series in bucket order
+    order = np.argsort(codes, kind="stable")
+    boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+    algorithm = ALGORITHMS[method]
+    kept = [
+        series[algorithm(x[series], y[series], points)]
+        for series in np.split(order, boundaries)
+    ]
+    return [tuple(rows[i]) for i in np.sort(np.concatenate(kept))]
@@ -0,0 +1,201 @@
+import base64
+import binascii
+from datetime import UTC, datetime
+from typing import Literal
+
+from sqlalchemy import Select, column, func, literal_column, select, table, tuple_
+
+from app.core.compact_schema import is_compact
+
+Bucket = Literal["hour", "day", "week", "month"]
+Aggregate = Literal["sum", "avg", "min", "max", "count"]
+
+BUCKETS = ("hour", "day", "week", "month")
+
+AGGREGATES = {
+    "sum": func.sum,
+    "avg": func.avg,
+    "min": func.min,
+    "max": func.max,
+    "count": func.count,
+}
+
+
+def bucket_expr(bucket: Bucket, column):
+    """
+    Build a `date_trunc` expression for the given bucket size.
+
+    The bucket is rendered as a literal rather than a bound parameter so the
+    SELECT and GROUP BY expressions stay identical for Postgres.
+
+    Args:
+        bucket (Bucket): One of hour, day, week or month.
+        column: Timestamp column to truncate.
+
+    Returns:
+        ColumnElement: Truncated timestamp expression.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    return func.date_trunc(literal_column(f"'{bucket}'"), column)
+
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    """
+    Convert a timezone-aware bound to naive UTC, the form timestamps are stored in.
+
+    Naive values are assumed to be UTC already and returned unchanged.
+    """
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def apply_filters(
+    stmt: Select,
+    model,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    **dimensions: list[str] | None,
+) -> Select:
+    """
+    Apply a half-open time range and dimension filters to a statement.
+
+    Args:
+        stmt (Select): Statement to filter.
+        model: Energy model the statement selects from.
+        start (datetime, optional): Inclusive lower bound on timestamp.
+        end (datetime, optional): Exclusive upper bound on timestamp.
+        **dimensions: Column name to list of accepted values; empty values are ignored.
+
+    Returns:
+        Select: Filtered statement.
+    """
+    if start is not None:
+        stmt = stmt.where(model.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(model.timestamp < end)
+    for name, values in dimensions.items():
+        if values:
+            stmt = stmt.where(getattr(model, name).in_(values))
+    return stmt
+
+
+def series_query(
+    model,
+    metric: str,
+    bucket: Bucket,
+    aggregate: Aggregate,
+    group_by: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    **dimensions: list[str] | None,
+) -> Select:
+    """
+    Build a time-bucketed aggregation over an energy table.
+
+    Args:
+        model: EnergyGeneration or EnergyConsumption.
+        metric (str): Numeric column to aggregate.
+        bucket (Bucket): Time bucket size.
+        aggregate (Aggregate): Aggregate function name.
+        group_by (str, optional): Dimension column to split the series by.
+        start (datetime, optional): Inclusive lower bound on timestamp.
+        end (datetime, optional): Exclusive upper bound on timestamp.
+        **dimensions: Dimension filters passed to `apply_filters`.
+
+    Returns:
+        Select: Statement yielding `bucket`, `key` and `value` columns.
+    """
+    bucket_col = bucket_expr(bucket, model.timestamp).label("bucket")
+    key_col = getattr(model, group_by) if group_by else literal_column("NULL")
+    value_col = AGGREGATES[aggregate](getattr(model, metric)).label("value")
+
+    stmt = select(bucket_col, key_col.label("key"), value_col)
+    stmt = apply_filters(stmt, model, start, end, **dimensions)
+
+    group_cols = [bucket_col, key_col] if group_by else [bucket_col]
+    return stmt.group_by(*group_cols).order_by(*group_cols)
+
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    """
+    Encode the `(timestamp, id)` keyset position of a row as an opaque cursor.
+
+    Args:
+        timestamp (datetime): Timestamp of the last row on the page.
+        row_id (str): Id of the last row on the page.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    raw = f"{timestamp.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): Opaque cursor string.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+
+    Returns:
+        tuple[datetime, str]: Keyset position `(timestamp, id)`.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(timestamp), row_id
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def high_water_query(model) -> Select:
+    """
+    Select the highest `ingest_seq` of an energy table, 0 when it is empty.
+
+    The compact schema is asked through its fact table: through the view's
+    joins Postgres would aggregate every row instead of reading one index entry.
+    """
+    seq = model.ingest_seq
+    if is_compact():
+        seq = table(f"{model.__tablename__}_facts", column("ingest_seq")).c.ingest_seq
+    return select(func.coalesce(func.max(seq), 0))
+
+
+def keyset_query(
+    model,
+    after: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    since: int | None = None,
+    **dimensions: list[str] | None,
+) -> Select:
+    """
+    Build a filtered listing ordered by `(timestamp, id)`, starting after a cursor.
+
+    Args:
+        model: EnergyGeneration or EnergyConsumption.
+        after (str, optional): Cursor of the last row already returned.
+        start (datetime, optional): Inclusive lower bound on timestamp.
+        end (datetime, optional): Exclusive upper bound on timestamp.
+        since (int, optional): Only rows with a higher `ingest_seq`, i.e. ingested after that high-water mark.
+        **dimensions: Dimension filters passed to `apply_filters`.
+
+    Raises:
+        ValueError: If `after` is not a valid cursor.
+
+    Returns:
+        Select: Statement selecting model instances in keyset order.
+    """
+    stmt = apply_filters(select(model), model, start, end, **dimensions)
+    if since is not None:
+        stmt = stmt.where(model.ingest_seq > since)
+    if after:
+        stmt = stmt.where(tuple_(model.timestamp, model.id) > tuple_(*decode_cursor(after)))
+    return stmt.order_by(model.timestamp, model.id)
+
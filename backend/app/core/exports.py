@@ -0,0 +1,349 @@
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+
+import orjson
+import pyarrow.parquet as pq
+from sqlalchemy import func, select
+
+from app.config import config
+from app.core.cache import data_version
+from app.core.database import ReadSessionLocal
+from app.core.energy_queries import apply_filters, keyset_query
+from app.core.logger import setup_logger
+from app.core.streaming import PARQUET_MEDIA_TYPE, arrow_schema, encode_csv, encode_record_batch, stream_partitions
+from app.models.base import record_columns
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+from app.schemas.energy import EnergyExportCreate
+
+logger = setup_logger(__name__)
+
+EXPORT_MODELS = {"generation": EnergyGeneration, "consumption": EnergyConsumption}
+
+# Format -> (file suffix, media type the finished file is served as)
+EXPORT_FORMATS = {
+    "csv": (".csv.gz", "application/gzip"),
+    "parquet": (".parquet", PARQUET_MEDIA_TYPE),
+}
+
+# Names of export files and their temporary files; nothing else in the export directory is ever deleted
+EXPORT_FILE_PATTERN = re.compile(
+    r"[0-9a-f]{32}(?:" + "|".join(re.escape(suffix) for suffix, _ in EXPORT_FORMATS.values()) + r")(?:\.part)?"
+)
+
+# Rows fetched and written per chunk
+EXPORT_CHUNK_SIZE = 20_000
+
+# Seconds between sweeps for expired export files
+CLEANUP_INTERVAL = 300
+
+
+class ExportsOverloaded(Exception):
+    pass
+
+
+class _GzipCsvSink:
+    """
+    Gzip-compressed CSV file with a header row.
+    """
+
+    def __init__(self, path: str, columns):
+        self._file = gzip.open(path, "wb", compresslevel=6)
+        self._file.write(encode_csv([[column.name for column in columns]]))
+
+    def write(self, rows: Sequence[Sequence]) -> None:
+        self._file.write(encode_csv(rows))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetSink:
+    """
+    Zstd-compressed Parquet file, one row group per chunk.
+    """
+
+    def __init__(self, path: str, columns):
+        self._schema = arrow_schema(columns)
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows: Sequence[Sequence]) -> None:
+        self._writer.write_batch(encode_record_batch(self._schema, rows))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+SINKS = {"csv": _GzipCsvSink, "parquet": _ParquetSink}
+
+
+class ExportJob:
+    """
+    State of one export: its parameters, progress and, once done, its file.
+    """
+
+    def __init__(self, key: str, request: EnergyExportCreate, directory: str):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.request = request
+        self.status = "queued"
+        self.rows = 0
+        self.total_rows: int | None = None
+        self.bytes = 0
+        self.created_at = datetime.now(UTC).replace(microsecond=0)
+        self.finished_at: datetime | None = None
+        self.error: str | None = None
+        suffix, self.media_type = EXPORT_FORMATS[request.format]
+        self.filename = f"energy-{request.dataset}-{self.id[:8]}{suffix}"
+        self.path = os.path.join(directory, f"{self.id}{suffix}")
+
+    def describe(self, retention: float) -> dict:
+        """
+        Fields of `EnergyExportJob`.
+        """
+        progress = 1.0 if self.status == "done" else self.rows / self.total_rows if self.total_rows else 0.0
+        return {
+            "id": self.id,
+            "status": self.status,
+            "dataset": self.request.dataset,
+            "format": self.request.format,
+            "rows": self.rows,
+            "total_rows": self.total_rows,
+            "progress": round(min(progress, 1.0), 4),
+            "bytes": self.bytes,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "expires_at": self.finished_at + timedelta(seconds=retention) if self.finished_at else None,
+            "error": self.error,
+        }
+
+
+class ExportManager:
+    """
+    Runs bulk exports as background jobs writing compressed files.
+
+    Jobs wait in a queue served by `workers` tasks started on first use.
+    A job counts the matching rows, then streams them from a server-side
+    cursor in chunks; encoding, compression and file writes run in a
+    thread, overlapping with the fetch of the next chunk. Files are written
+    under a temporary name and renamed when complete.
+
+    A request identical to one that is queued, running or done against the
+    same `data_version` gets the existing job. Finished jobs and their files
+    are removed `retention` seconds after they finish.
+
+    Jobs are held in the memory of the process that accepted them: with
+    several server processes, a job id is only known to the process that
+    created it, and looking it up through another returns 404.
+
+    Attributes:
+        directory (str): Where export files are written
+        workers (int): Exports running at once
+        max_queued (int): Jobs allowed to wait; beyond that `submit` raises `ExportsOverloaded`
+        retention (float): Seconds finished exports are kept
+    """
+
+    def __init__(self, directory: str, workers: int, max_queued: int, retention: float):
+        self.directory = directory
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self._jobs: dict[str, ExportJob] = {}
+        self._by_key: dict[str, ExportJob] = {}
+        self._queue: asyncio.Queue[ExportJob] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: list[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.expired = 0
+
+    def _ensure_workers(self) -> asyncio.Queue:
+        # Queue and workers belong to the event loop that first needed them
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            os.makedirs(self.directory, exist_ok=True)
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        return self._queue
+
+    async def start(self) -> None:
+        """
+        Start the workers and the periodic sweep for expired files.
+        """
+        self._ensure_workers()
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, request: EnergyExportCreate) -> ExportJob:
+        """
+        Queue an export, or return the existing job for an identical one.
+
+        Raises:
+            ExportsOverloaded: If `max_queued` jobs are already waiting.
+
+        Returns:
+            ExportJob: The new or existing job.
+        """
+        self.cleanup()
+        params = orjson.dumps(request.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+        key = f"{hashlib.sha256(params).hexdigest()}:{data_version.value}"
+        existing = self._by_key.get(key)
+        if existing is not None and existing.status != "failed":
+            self.deduplicated += 1
+            return existing
+
+        queue = self._ensure_workers()
+        if queue.qsize() >= self.max_queued:
+            raise ExportsOverloaded(f"{queue.qsize()} exports queued")
+        job = ExportJob(key, request, self.directory)
+        self._jobs[job.id] = job
+        self._by_key[key] = job
+        queue.put_nowait(job)
+        logger.info("📦 Queued %s export %s.", request.dataset, job.id)
+        return job
+
+    def get(self, job_id: str) -> ExportJob | None:
+        return self._jobs.get(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ExportJob) -> None:
+        request = job.request
+        model = EXPORT_MODELS[request.dataset]
+        filters = request.filters()
+        columns = record_columns(model)
+        stmt = keyset_query(model, None, request.start, request.end, **filters).with_only_columns(*columns)
+        partial = f"{job.path}.part"
+        job.status = "running"
+        started = time.perf_counter()
+        sink = None
+        try:
+            async with ReadSessionLocal() as session:
+                count = apply_filters(select(func.count()).select_from(model), model, request.start, request.end, **filters)
+                job.total_rows = await session.scalar(count)
+
+            sink = await asyncio.to_thread(SINKS[request.format], partial, columns)
+            pending = None
+            try:
+                async for rows in stream_partitions(stmt, EXPORT_CHUNK_SIZE):
+                    if pending is not None:
+                        job.rows += await pending
+                    # Written while the next chunk is fetched
+                    pending = asyncio.ensure_future(asyncio.to_thread(self._write, sink, rows))
+            finally:
+                if pending is not None:
+                    job.rows += await pending
+            await asyncio.to_thread(sink.close)
+            sink = None
+            os.replace(partial, job.path)
+        except asyncio.CancelledError:
+            job.status, job.error = "failed", "cancelled"
+            self.failed += 1
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            self.failed += 1
+            logger.error("❌ Export %s failed: %s", job.id, e)
+        else:
+            job.status = "done"
+            job.bytes = os.path.getsize(job.path)
+            self.completed += 1
+            logger.info(
+                "✅ Exported %d %s rows to %s (%d bytes) in %.2fs.",
+                job.rows, request.dataset, job.filename, job.bytes, time.perf_counter() - started,
+            )
+        finally:
+            job.finished_at = datetime.now(UTC).replace(microsecond=0)
+            if sink is not None:
+                with contextlib.suppress(Exception):
+                    sink.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(partial)
+
+    @staticmethod
+    def _write(sink, rows: Sequence[Sequence]) -> int:
+        sink.write(rows)
+        return len(rows)
+
+    def cleanup(self) -> int:
+        """
+        Forget jobs finished more than `retention` seconds ago and delete their
+        files, along with export files no job owns that are as old, such as
+        those left by a previous process. Only names matching
+        `EXPORT_FILE_PATTERN` are considered, so other files in the export
+        directory are left alone.
+
+        Returns:
+            int: Jobs expired.
+        """
+        cutoff = datetime.now(UTC) - timedelta(seconds=self.retention)
+        expired = [job for job in self._jobs.values() if job.finished_at and job.finished_at < cutoff]
+        for job in expired:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(job.path)
+        self.expired += len(expired)
+
+        owned = {os.path.basename(job.path) for job in self._jobs.values()}
+        owned |= {f"{name}.part" for name in owned}
+        with contextlib.suppress(FileNotFoundError):
+            for entry in os.scandir(self.directory):
+                if (
+                    EXPORT_FILE_PATTERN.fullmatch(entry.name)
+                    and entry.name not in owned
+                    and entry.stat().st_mtime < cutoff.timestamp()
+                ):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(entry.path)
+        if expired:
+            logger.info("🧹 Removed %d expired exports.", len(expired))
+        return len(expired)
+
+    async def _sweep(self) -> None:
+        while True:
+            # At least a second apart, so a retention of 0 does not spin
+            await asyncio.sleep(max(1, min(CLEANUP_INTERVAL, self.retention)))
+            self.cleanup()
+
+    def stats(self) -> dict:
+        return {
+            "jobs": len(self._jobs),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+            "expired": self.expired,
+        }
+
+
+exports = ExportManager(
+    config.EXPORT_DIR or os.path.join(tempfile.gettempdir(), "energy-exports"),
+    config.EXPORT_WORKERS,
+    config.EXPORT_MAX_QUEUED,
+    config.EXPORT_RETENTION_SECONDS,
+)
@@ -0,0 +1,271 @@
+import asyncio
+import multiprocessing
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from statistics import NormalDist
+
+import numpy as np
+
+from app.config import config
+from app.core.cache import data_version
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Weekly seasonality of daily totals
+SEASON = 7
+
+# Smoothing parameters searched for every series; all combinations are fitted at once
+ALPHAS = np.array([0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5])
+BETAS = np.array([0.0, 0.001, 0.005, 0.01, 0.05])
+GAMMAS = np.array([0.0, 0.05, 0.1, 0.3])
+_GRID = np.stack(np.meshgrid(ALPHAS, BETAS, GAMMAS, indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+def fit_holt_winters(values: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Fit additive Holt-Winters (level, trend, weekly season) to daily series by grid search.
+
+    Every series is filtered with every parameter combination of the grid
+    simultaneously: the state arrays have shape (series, combinations) and
+    only the walk over time is a Python loop. The combination with the
+    smallest one-step-ahead squared error is kept per series.
+
+    Args:
+        values (np.ndarray): Daily values, shape (series, days), at least `2 * SEASON` days.
+
+    Returns:
+        dict[str, np.ndarray]: Per series: `alpha`, `beta`, `gamma`, final `level` and
+        `trend`, `season` (shape (series, SEASON), indexed by day number modulo SEASON)
+        and `sigma`, the standard deviation of the one-step errors.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count, days = values.shape
+    alpha, beta, gamma = (_GRID[:, i][None, :] for i in range(3))
+
+    # Initial state from a least-squares line through the weekly means and the
+    # mean residual per weekday; daily data is too noisy to start from the first weeks
+    weeks = days // SEASON
+    weekly = values[:, :weeks * SEASON].reshape(count, weeks, SEASON)
+    centres = np.arange(weeks) * SEASON + (SEASON - 1) / 2
+    offsets = centres - centres.mean()
+    slope = (weekly.mean(axis=2) * offsets).sum(axis=1) / (offsets * offsets).sum()
+    intercept = weekly.mean(axis=(1, 2)) - slope * centres.mean()
+    t = np.arange(weeks * SEASON).reshape(weeks, SEASON)
+    residuals = weekly - (intercept[:, None, None] + slope[:, None, None] * t)
+    weekday = residuals.mean(axis=1)
+    level = np.repeat((intercept - slope)[:, None], len(_GRID), axis=1)
+    trend = np.repeat(slope[:, None], len(_GRID), axis=1)
+    season = np.repeat((weekday - weekday.mean(axis=1, keepdims=True))[:, None, :], len(_GRID), axis=1)
+    sse = np.zeros_like(level)
+
+    for t in range(days):
+        y = values[:, t, None]
+        s = season[:, :, t % SEASON]
+        error = y - (level + trend + s)
+        if t >= SEASON:
+            sse += error * error
+        new_level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, :, t % SEASON] = gamma * (y - new_level) + (1 - gamma) * s
+        level = new_level
+
+    best = sse.argmin(axis=1)
+    rows = np.arange(count)
+    return {
+        "alpha": _GRID[best, 0],
+        "beta": _GRID[best, 1],
+        "gamma": _GRID[best, 2],
+        "level": level[rows, best],
+        "trend": trend[rows, best],
+        "season": season[rows, best],
+        "sigma": np.sqrt(sse[rows, best] / max(days - SEASON, 1)),
+        "days": np.full(count, days),
+    }
+
+
+def project(fit: dict, horizon: int, level: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Point forecasts and prediction intervals `horizon` days past the end of the fitted series.
+
+    The interval uses the ETS(A,A,A) forecast variance
+    sigma^2 * (1 + sum_{j<h} (alpha * (1 + j * beta) + gamma * [j % SEASON == 0])^2),
+    and is clipped at zero since energy cannot be negative.
+
+    Args:
+        fit (dict): Output of `fit_holt_winters` (or one series of it).
+        horizon (int): Days to project.
+        level (float): Interval coverage, e.g. 0.95.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: Forecast, lower and upper bounds, shape (series, horizon).
+    """
+    steps = np.arange(1, horizon + 1)
+    days = np.atleast_1d(fit["days"])[:, None]
+    season = np.atleast_2d(fit["season"])
+    season_index = (days + steps[None, :] - 1) % SEASON
+    mean = (
+        np.atleast_1d(fit["level"])[:, None]
+        + steps[None, :] * np.atleast_1d(fit["trend"])[:, None]
+        + np.take_along_axis(season, season_index, axis=1)
+    )
+
+    alpha, beta, gamma = (np.atleast_1d(fit[name])[:, None] for name in ("alpha", "beta", "gamma"))
+    lags = np.arange(horizon)[None, :]
+    weights = alpha * (1 + lags * beta) + gamma * ((lags % SEASON == 0) & (lags > 0))
+    weights[:, 0] = 0.0
+    variance = np.atleast_1d(fit["sigma"])[:, None] ** 2 * (1 + np.cumsum(weights ** 2, axis=1))
+    spread = NormalDist().inv_cdf(0.5 + level / 2) * np.sqrt(variance)
+    return np.maximum(mean, 0.0), np.maximum(mean - spread, 0.0), mean + spread
+
+
+def daily_series(rows: Sequence[Sequence], history_days: int) -> dict[str, tuple[datetime, np.ndarray]]:
+    """
+    Split daily `(bucket, key, value)` rows into one gap-filled series per key.
+
+    Each series ends on its own last recorded day and keeps at most the
+    `history_days` up to it, starting on its first recorded day within that
+    window, so keys with different date ranges never shorten each other.
+    Missing days inside a series take its previous value.
+
+    Returns:
+        dict[str, tuple[datetime, np.ndarray]]: Key -> first day and daily values, in key order.
+    """
+    if not rows:
+        return {}
+    buckets, keys, values = zip(*rows)
+    days = np.array(buckets, dtype="datetime64[D]")
+    values = np.array(values, dtype=np.float64)
+    names, codes = np.unique(np.array([str(key) for key in keys]), return_inverse=True)
+
+    series = {}
+    for code, name in enumerate(names.tolist()):
+        key_days, key_values = days[codes == code], values[codes == code]
+        keep = key_days > key_days.max() - np.timedelta64(history_days, "D")
+        key_days, key_values = key_days[keep], key_values[keep]
+        first = key_days.min()
+        filled = np.full(int((key_days.max() - first).astype(np.int64)) + 1, np.nan)
+        filled[(key_days - first).astype(np.int64)] = key_values
+        # Forward fill; the first day is always recorded
+        positions = np.where(np.isnan(filled), 0, np.arange(len(filled)))
+        np.maximum.accumulate(positions, out=positions)
+        series[name] = (first.astype("datetime64[us]").item(), filled[positions])
+    return series
+
+
+class Forecaster:
+    """
+    Fits Holt-Winters models in a process pool and caches the fits.
+
+    Fits are keyed by series, key, the key's history window and
+    `data_version`, so a dashboard asking for other horizons, interval
+    levels or key subsets of the same data only re-projects cached fits.
+    The pool is started on first use and shut down by `stop`.
+
+    Attributes:
+        workers (int): Processes fitting in parallel
+        max_entries (int): Fits kept before the least recently used is evicted
+        history_days (int): Trailing days of history each model is fitted on
+    """
+
+    def __init__(self, workers: int, max_entries: int, history_days: int):
+        self.workers = workers
+        self.max_entries = max_entries
+        self.history_days = history_days
+        self._executor: ProcessPoolExecutor | None = None
+        self._fits: OrderedDict[tuple, dict] = OrderedDict()
+        self.hits = 0
+        self.fitted = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process that runs threads (the event loop's thread pools) can copy locks held mid-call
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def stop(self) -> None:
+        """
+        Shut the worker processes down, cancelling fits that have not started.
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+
+    async def _fit(self, values: np.ndarray) -> list[dict]:
+        # One job per worker, each fitting a slice of the series
+        slices = [part for part in np.array_split(values, min(self.workers, len(values))) if len(part)]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(loop.run_in_executor(self._pool(), fit_holt_winters, part) for part in slices))
+        return [{name: array[i] for name, array in result.items()} for result in results for i in range(len(result["level"]))]
+
+    async def forecast(self, series: str, rows: Sequence[Sequence], horizon: int, level: float) -> list[tuple]:
+        """
+        Forecast every key of daily `(bucket, key, value)` rows `horizon` days ahead.
+
+        Each key is forecast from its own last recorded day; keys with less
+        than two weeks of history are skipped.
+
+        Args:
+            series (str): Identifies the query the rows came from, e.g. "generation:system_id".
+            rows (Sequence[Sequence]): Daily totals per key.
+            horizon (int): Days to forecast.
+            level (float): Prediction interval coverage.
+
+        Returns:
+            list[tuple]: `(key, day, forecast, lower, upper)` rows ordered by key and day.
+        """
+        history = {
+            key: (first, values)
+            for key, (first, values) in daily_series(rows, self.history_days).items()
+            if len(values) >= 2 * SEASON
+        }
+        if not history:
+            return []
+
+        version = await data_version.current()
+        cache_keys = {key: (series, key, first, len(values), version) for key, (first, values) in history.items()}
+        # Fits are read into a local dict: the shared cache may evict them while this request awaits the pool
+        fits = {}
+        for key, cache_key in cache_keys.items():
+            fit = self._fits.get(cache_key)
+            if fit is not None:
+                self._fits.move_to_end(cache_key)
+                fits[key] = fit
+        missing = [key for key in history if key not in fits]
+        self.hits += len(fits)
+        if missing:
+            # Series are fitted as matrices, so keys are grouped by history length
+            by_length: dict[int, list[str]] = {}
+            for key in missing:
+                by_length.setdefault(len(history[key][1]), []).append(key)
+            groups = list(by_length.values())
+            results = await asyncio.gather(*(self._fit(np.stack([history[key][1] for key in group])) for group in groups))
+            for group, group_fits in zip(groups, results):
+                for key, fit in zip(group, group_fits):
+                    fits[key] = self._fits[cache_keys[key]] = fit
+            self.fitted += len(missing)
+            logger.info("📈 Fitted %d %s forecast models.", len(missing), series)
+        while len(self._fits) > self.max_entries:
+            self._fits.popitem(last=False)
+
+        ordered = [fits[key] for key in history]
+        stacked = {name: np.stack([fit[name] for fit in ordered]) for name in ordered[0]}
+        mean, lower, upper = project(stacked, horizon, level)
+        points = []
+        for (key, (first, values)), mean_row, lower_row, upper_row in zip(
+            history.items(), mean.tolist(), lower.tolist(), upper.tolist()
+        ):
+            last = first + timedelta(days=len(values) - 1)
+            future = [last + timedelta(days=step) for step in range(1, horizon + 1)]
+            points.extend((key, day, *bounds) for day, *bounds in zip(future, mean_row, lower_row, upper_row))
+        return points
+
+    def stats(self) -> dict:
+        return {"cached_fits": len(self._fits), "fits": self.fitted, "hits": self.hits}
+
+
+forecaster = Forecaster(config.FORECAST_WORKERS, config.FORECAST_CACHE_SIZE, config.FORECAST_HISTORY_DAYS)
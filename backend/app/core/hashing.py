@@ -0,0 +1,131 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app.config import config
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class HashingOverloaded(Exception):
+    """
+    Raised when more hashing jobs are waiting than the configured queue allows.
+    """
+
+
+def hash_rounds(hashed_password: str) -> int | None:
+    """
+    Cost factor encoded in a bcrypt hash such as `$2b$12$...`, or None if unparseable.
+    """
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated thread pool so password checks never block the event loop.
+
+    bcrypt releases the GIL while hashing, so the pool size is the number of
+    hashes computed in parallel. Jobs beyond that wait in the pool's queue;
+    once `max_queue` are waiting, new jobs are rejected with `HashingOverloaded`
+    instead of piling up behind a login burst.
+
+    Attributes:
+        rounds (int): bcrypt cost factor for new hashes
+        max_concurrency (int): Worker threads
+        max_queue (int): Jobs allowed to wait for a worker
+    """
+
+    def __init__(self, rounds: int, max_concurrency: int, max_queue: int):
+        self.rounds = rounds
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.max_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.work_seconds = 0.0
+
+    async def _run(self, fn, *args):
+        if self.pending - self.max_concurrency >= self.max_queue:
+            self.rejected += 1
+            logger.warning("🚦 Rejecting hashing job: %d already pending.", self.pending)
+            raise HashingOverloaded(f"{self.pending} hashing jobs pending")
+
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            return fn(*args), started, time.perf_counter()
+
+        try:
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            self.pending -= 1
+
+        wait = started - submitted
+        self.completed += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        self.work_seconds += finished - started
+        return result
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a plain text password with the configured cost factor.
+
+        Args:
+            password (str): Plain text password.
+
+        Returns:
+            str: Hashed password.
+        """
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = await self._run(bcrypt.hashpw, password.encode("utf-8"), salt)
+        return hashed.decode("utf-8")
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Verify a plain password against a stored bcrypt hash.
+
+        Args:
+            password (str): Plain password input.
+            hashed_password (str): Stored hashed password.
+
+        Returns:
+            bool: True if the password matches.
+        """
+        return await self._run(bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Whether a stored hash was made with a different cost factor than the configured one.
+        """
+        return hash_rounds(hashed_password) != self.rounds
+
+    def stats(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "max_concurrency": self.max_concurrency,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.max_concurrency),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": round(self.wait_seconds, 6),
+            "max_wait_seconds": round(self.max_wait_seconds, 6),
+            "work_seconds_total": round(self.work_seconds, 6),
+        }
+
+
+password_hasher = PasswordHasher(config.BCRYPT_ROUNDS, config.HASH_MAX_CONCURRENCY, config.HASH_MAX_QUEUE)
@@ -0,0 +1,207 @@
+import csv
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC
+
+import orjson
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import config
+from app.core.cache import data_version
+from app.core.compact_schema import is_compact
+from app.core.database import engine
+from app.core.live import live
+from app.core.logger import setup_logger
+from app.core.rollups import apply_rollups
+from app.core.streaming import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE
+from app.models.base import record_columns
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+from app.schemas.energy import EnergyConsumptionIngest, EnergyGenerationIngest, IngestError, IngestResult
+
+logger = setup_logger(__name__)
+
+INGEST_MEDIA_TYPES = (NDJSON_MEDIA_TYPE, CSV_MEDIA_TYPE)
+
+# Model -> (row schema, column identifying the meter); rows without an id get
+# a deterministic one from the meter and timestamp, so resent rows deduplicate
+INGEST_SCHEMAS: dict[type, tuple[type[BaseModel], str]] = {
+    EnergyGeneration: (EnergyGenerationIngest, "system_id"),
+    EnergyConsumption: (EnergyConsumptionIngest, "consumer_id"),
+}
+
+_ID_NAMESPACE = uuid.UUID("6f1c2b1e-7d0a-4f43-9a55-3f7f0b3c2e10")
+
+# Arbitrary advisory lock keys, one per energy table, held by each inserting transaction
+INGEST_LOCK_IDS = {EnergyGeneration: 72_310_101, EnergyConsumption: 72_310_102}
+
+
+class RowError(ValueError):
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Split a streamed body into lines without buffering more than one partial line.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+async def parse_body(chunks: AsyncIterator[bytes], media_type: str) -> AsyncIterator[tuple[int, dict | RowError]]:
+    """
+    Parse an NDJSON or CSV (with header) body incrementally into raw row dicts.
+
+    Yields:
+        tuple[int, dict | RowError]: Line number and the row, or the reason it could not be parsed.
+    """
+    header = None
+    number = 0
+    async for line in iter_lines(chunks):
+        number += 1
+        line = line.rstrip(b"\r")
+        if not line.strip():
+            continue
+        if media_type == NDJSON_MEDIA_TYPE:
+            try:
+                row = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                yield number, RowError(f"invalid JSON: {e}")
+                continue
+            yield number, row if isinstance(row, dict) else RowError("expected a JSON object")
+            continue
+
+        values = next(csv.reader([line.decode("utf-8", errors="replace")]))
+        if header is None:
+            header = [name.strip() for name in values]
+        elif len(values) != len(header):
+            yield number, RowError(f"expected {len(header)} columns, got {len(values)}")
+        else:
+            yield number, dict(zip(header, values))
+
+
+def to_record(model, raw: dict) -> tuple:
+    """
+    Validate one raw row into a record tuple in table column order.
+
+    Raises:
+        RowError: If the row does not match the ingest schema.
+    """
+    schema, meter = INGEST_SCHEMAS[model]
+    try:
+        row = schema.model_validate(raw)
+    except ValidationError as e:
+        first = e.errors()[0]
+        raise RowError(f"{'.'.join(str(part) for part in first['loc'])}: {first['msg']}")
+
+    values = row.model_dump()
+    timestamp = values["timestamp"]
+    if timestamp.tzinfo is not None:
+        values["timestamp"] = timestamp.astimezone(UTC).replace(tzinfo=None)
+    if not values["id"]:
+        values["id"] = str(uuid.uuid5(_ID_NAMESPACE, f"{model.__tablename__}|{values[meter]}|{values['timestamp'].isoformat()}"))
+    elif is_compact():
+        try:
+            uuid.UUID(values["id"])
+        except ValueError:
+            raise RowError("id: must be a UUID")
+    return tuple(values[column.name] for column in record_columns(model))
+
+
+async def lock_ingest_order(conn: AsyncConnection, model) -> None:
+    """
+    Take the table's ingest lock until the end of the transaction.
+
+    `ingest_seq` numbers are drawn when rows are inserted but only become
+    visible on commit. With one inserting transaction per table at a time
+    they become visible in order, so a reader that sees number N has seen
+    every committed row below it and N is a safe high-water mark.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": INGEST_LOCK_IDS[model]})
+
+
+async def insert_records(conn: AsyncConnection, model, records: list[tuple]) -> list[tuple]:
+    """
+    Insert records, skipping ids that already exist, and fold the inserted ones into the rollups.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+        model: EnergyGeneration or EnergyConsumption.
+        records (list[tuple]): Rows in table column order.
+
+    Returns:
+        list[tuple]: The records that were actually inserted.
+    """
+    await lock_ingest_order(conn, model)
+    columns = record_columns(model)
+    stmt = insert(model).returning(*columns)
+    if not is_compact():
+        # No conflict target: with partitioning the unique key is (id, timestamp).
+        # Compact views skip duplicates in their insert trigger instead.
+        stmt = stmt.on_conflict_do_nothing()
+    result = await conn.execute(stmt, [dict(zip((c.name for c in columns), record)) for record in records])
+    inserted = [tuple(row) for row in result]
+    await apply_rollups(conn, model, inserted)
+    return inserted
+
+
+async def ingest(model, chunks: AsyncIterator[bytes], media_type: str) -> IngestResult:
+    """
+    Stream-parse a request body and write its rows in committed batches.
+
+    Each batch of `INGEST_BATCH_SIZE` valid rows is inserted and committed
+    with its rollup updates, so an interrupted upload keeps the batches
+    already written and can simply be resent. After each commit the data
+    version is re-read, then the committed rows are published to live
+    subscribers, so their update carries a version that includes them.
+
+    Args:
+        model: EnergyGeneration or EnergyConsumption.
+        chunks (AsyncIterator[bytes]): Request body chunks.
+        media_type (str): NDJSON or CSV media type.
+
+    Returns:
+        IngestResult: Accepted, duplicate and rejected row counts with the first errors.
+    """
+    result = IngestResult(accepted=0, duplicates=0, rejected=0)
+    batch: list[tuple] = []
+
+    async def flush():
+        async with engine.begin() as conn:
+            inserted = await insert_records(conn, model, batch)
+        if inserted:
+            await data_version.refresh()
+            live.publish(model, inserted)
+        result.accepted += len(inserted)
+        result.duplicates += len(batch) - len(inserted)
+        batch.clear()
+
+    async for number, raw in parse_body(chunks, media_type):
+        try:
+            if isinstance(raw, RowError):
+                raise raw
+            batch.append(to_record(model, raw))
+        except RowError as e:
+            result.rejected += 1
+            if len(result.errors) < config.INGEST_MAX_ERRORS:
+                result.errors.append(IngestError(line=number, error=str(e)))
+            continue
+        if len(batch) >= config.INGEST_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    logger.info(
+        "📥 Ingested %s: %d accepted, %d duplicates, %d rejected.",
+        model.__tablename__, result.accepted, result.duplicates, result.rejected,
+    )
+    return result
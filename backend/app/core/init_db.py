@@ -1,14 +1,22 @@
 import asyncio
 import csv
+import itertools
 import os
-from datetime import datetime
+import time
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime
 
+from sqlalchemy import DateTime, Float, text
 from sqlalchemy.future import select
 
+from app.core.compact_schema import copy_records, managed_tables
 from app.core.database import AsyncSessionLocal, engine
+from app.core.hashing import password_hasher
+from app.core.ingest import lock_ingest_order
 from app.core.logger import setup_logger
-from app.core.security import hash_password
-from app.models.base import Base
+from app.core.migrations import run_migrations
+from app.core.rollups import apply_rollups
+from app.models.base import Base, record_columns
 from app.models.user import User
 from app.models.energy_generation import EnergyGeneration
 from app.models.energy_consumption import EnergyConsumption
@@ -19,15 +27,29 @@ DATA_DIR = "data"
 GEN_CSV = os.path.join(DATA_DIR, "energy_generation.csv")
 CONSUMPTION_CSV = os.path.join(DATA_DIR, "energy_consumption.csv")
 
+# Rows sent per COPY and committed together
+COPY_CHUNK_SIZE = 50_000
+
+# Rows of each CSV committed so far, updated in the same transaction as every chunk
+CSV_LOADS_DDL = (
+    "CREATE TABLE IF NOT EXISTS csv_loads ("
+    "table_name VARCHAR PRIMARY KEY, rows BIGINT NOT NULL DEFAULT 0, "
+    "completed_at TIMESTAMP WITH TIME ZONE)"
+)
+
 
 async def init_models():
     """
     Initializes database tables, creates demo user,
-    and inserts energy data from CSVs.
+    and bulk-loads energy data from CSVs concurrently.
     """
     logger.info("📦 Starting database table creation...")
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(Base.metadata.create_all, tables=managed_tables(Base.metadata))
+        await run_migrations(conn)
+        # Created here, under the migration lock, rather than by the loads below,
+        # whose concurrent CREATE TABLE IF NOT EXISTS would race on the type name
+        await conn.execute(text(CSV_LOADS_DDL))
     logger.info("✅ Tables created successfully.")
 
     async with AsyncSessionLocal() as session:
@@ -42,7 +64,7 @@ async def init_models():
             logger.info("👤 Creating new demo user...")
             demo_user = User(
                 email=demo_email,
-                hashed_password=hash_password(demo_password)
+                hashed_password=await password_hasher.hash(demo_password)
             )
             session.add(demo_user)
             await session.commit()
@@ -51,61 +73,132 @@ async def init_models():
         else:
             logger.info("ℹ️ Demo user already exists. Skipping creation.")
 
-        # ⚡ Insert energy generation data
-        gen_result = await session.execute(select(EnergyGeneration).limit(1))
-        gen_exists = gen_result.scalar_one_or_none()
-
-        if not gen_exists and os.path.exists(GEN_CSV):
-            logger.info(f"📥 Loading energy generation data from '{GEN_CSV}'...")
-            with open(GEN_CSV, newline="") as f:
-                reader = csv.DictReader(f)
-                gen_entries = [
-                    EnergyGeneration(
-                        id=row["id"],
-                        timestamp=datetime.fromisoformat(row["timestamp"]),
-                        energy_kwh=float(row["energy_kwh"]),
-                        source=row["source"],
-                        location=row["location"],
-                        system_id=row["system_id"],
-                    )
-                    for row in reader
-                ]
-            session.add_all(gen_entries)
-            await session.commit()
-            logger.info(f"✅ Inserted {len(gen_entries)} energy generation rows.")
-        elif gen_exists:
-            logger.info("ℹ️ Energy generation data already exists. Skipping CSV import.")
+    await asyncio.gather(
+        load_csv(EnergyGeneration, GEN_CSV),
+        load_csv(EnergyConsumption, CONSUMPTION_CSV),
+    )
+
+
+def _column_converters(model) -> list[tuple[str, Callable[[str], object]]]:
+    """
+    Pair each table column with the function that parses its CSV text.
+    """
+    converters = []
+    for column in record_columns(model):
+        if isinstance(column.type, Float):
+            converters.append((column.name, float))
+        elif isinstance(column.type, DateTime):
+            converters.append((column.name, datetime.fromisoformat))
         else:
-            logger.warning(f"⚠️ Generation CSV not found at '{GEN_CSV}'.")
-
-        # 🔌 Insert energy consumption data
-        cons_result = await session.execute(select(EnergyConsumption).limit(1))
-        cons_exists = cons_result.scalar_one_or_none()
-
-        if not cons_exists and os.path.exists(CONSUMPTION_CSV):
-            logger.info(f"📥 Loading energy consumption data from '{CONSUMPTION_CSV}'...")
-            with open(CONSUMPTION_CSV, newline="") as f:
-                reader = csv.DictReader(f)
-                consumption_entries = [
-                    EnergyConsumption(
-                        id=row["id"],
-                        timestamp=datetime.fromisoformat(row["timestamp"]),
-                        energy_kwh=float(row["energy_kwh"]),
-                        location=row["location"],
-                        sector=row["sector"],
-                        consumer_id=row["consumer_id"],
-                        price=float(row["price"]),
-                        total=float(row["total"]),
-                    )
-                    for row in reader
-                ]
-            session.add_all(consumption_entries)
-            await session.commit()
-            logger.info(f"✅ Inserted {len(consumption_entries)} energy consumption rows.")
-        elif cons_exists:
-            logger.info("ℹ️ Energy consumption data already exists. Skipping CSV import.")
+            converters.append((column.name, str))
+    return converters
+
+
+def read_csv_chunks(path: str, model, chunk_size: int = COPY_CHUNK_SIZE, skip: int = 0) -> Iterator[list[tuple]]:
+    """
+    Read a CSV file as parsed record tuples in table column order, one chunk at a time.
+
+    Args:
+        path (str): CSV file with a header row naming the table columns.
+        model: Model whose table the records are destined for.
+        chunk_size (int): Maximum records per chunk.
+        skip (int): Leading records to pass over without parsing.
+
+    Yields:
+        list[tuple]: Up to `chunk_size` records.
+    """
+    converters = _column_converters(model)
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        next(itertools.islice(reader, skip, skip), None)
+        while chunk := [
+            tuple(parse(row[name]) for name, parse in converters)
+            for row in itertools.islice(reader, chunk_size)
+        ]:
+            yield chunk
+
+
+async def load_csv(model, path: str, chunk_size: int = COPY_CHUNK_SIZE) -> int:
+    """
+    Bulk-load a CSV into an energy table with `COPY`, committing chunk by chunk
+    together with the matching rollup updates.
+
+    Progress is recorded in `csv_loads`, created by `init_models`, within
+    each chunk's transaction, so a load interrupted part-way resumes after
+    the last committed chunk on the next start, and a finished load is
+    never repeated. A table that already
+    has rows but no record was loaded before loads were tracked and counts
+    as complete.
+
+    Parsing runs in a worker thread so that loads of several tables can
+    overlap with each other's `COPY` round trips.
+
+    Args:
+        model: EnergyGeneration or EnergyConsumption.
+        path (str): Source CSV file.
+        chunk_size (int): Records per `COPY` and per commit.
+
+    Returns:
+        int: Number of rows loaded by this call (0 when skipped).
+    """
+    table = model.__tablename__
+    async with engine.connect() as conn:
+        async with conn.begin():
+            progress = (await conn.execute(
+                text("SELECT rows, completed_at FROM csv_loads WHERE table_name = :table"), {"table": table},
+            )).first()
+            if progress is None:
+                existing = await conn.execute(select(model.id).limit(1))
+                untracked = existing.first() is not None
+                progress = (await conn.execute(
+                    text(
+                        "INSERT INTO csv_loads (table_name, completed_at) VALUES (:table, :completed_at) "
+                        "RETURNING rows, completed_at"
+                    ),
+                    {"table": table, "completed_at": datetime.now(UTC) if untracked else None},
+                )).first()
+        loaded, completed = progress
+        if completed is not None:
+            logger.info(f"ℹ️ {table} data already loaded. Skipping CSV import.")
+            return 0
+
+        if not os.path.exists(path):
+            logger.warning(f"⚠️ CSV for {table} not found at '{path}'.")
+            return 0
+
+        if loaded:
+            logger.info(f"📥 Resuming {table} load from '{path}' after {loaded} committed rows...")
         else:
-            logger.warning(f"⚠️ Consumption CSV not found at '{CONSUMPTION_CSV}'.")
+            logger.info(f"📥 Loading {table} data from '{path}'...")
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+        chunks = read_csv_chunks(path, model, chunk_size, skip=loaded)
+
+        started = time.perf_counter()
+        total = 0
+        while chunk := await asyncio.to_thread(next, chunks, None):
+            async with conn.begin():
+                # The lock opens the transaction that the raw COPY and the rollup
+                # upsert then join, so a chunk and its rollups always commit together.
+                # Only rows the COPY inserted are counted, not ids already present
+                await lock_ingest_order(conn, model)
+                inserted = await copy_records(conn, driver, model, chunk)
+                await apply_rollups(conn, model, inserted)
+                await conn.execute(
+                    text("UPDATE csv_loads SET rows = rows + :rows WHERE table_name = :table"),
+                    {"rows": len(chunk), "table": table},
+                )
+            total += len(chunk)
+            elapsed = time.perf_counter() - started
+            logger.info(f"⏳ {table}: {loaded + total} rows committed ({total / elapsed:,.0f} rows/s).")
+
+        async with conn.begin():
+            await conn.execute(
+                text("UPDATE csv_loads SET completed_at = now() WHERE table_name = :table"), {"table": table},
+            )
+
+    logger.info(f"✅ Inserted {total} {table} rows in {time.perf_counter() - started:.2f}s.")
+    return total
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+import asyncio
+from collections.abc import Sequence
+from datetime import datetime
+
+import orjson
+
+from app.config import config
+from app.core.cache import data_version
+from app.core.logger import setup_logger
+from app.models.base import record_columns
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+
+logger = setup_logger(__name__)
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Model -> (payload key, dimension the pushed daily totals are split by)
+LIVE_DATASETS = {
+    EnergyGeneration: ("generation", "source"),
+    EnergyConsumption: ("consumption", "sector"),
+}
+
+# Sent in place of the queued updates when a client falls behind; it should reload instead of applying deltas
+RESYNC_EVENT = b"event: resync\ndata: {}\n\n"
+KEEPALIVE_EVENT = b": keepalive\n\n"
+
+
+def sse_event(event: str, data: bytes, event_id: int | None = None) -> bytes:
+    """
+    Frame a JSON payload as one Server-Sent Event.
+    """
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + data + b"\n\n"
+
+
+def daily_totals(model, records: Sequence[Sequence]) -> list[dict]:
+    """
+    Sum `energy_kwh` of new records per day and the dataset's dimension, as `EnergySeriesPoint` dicts.
+    """
+    columns = [column.name for column in record_columns(model)]
+    timestamp, energy, key = (columns.index(name) for name in ("timestamp", "energy_kwh", LIVE_DATASETS[model][1]))
+    totals: dict[tuple[datetime, str], float] = {}
+    for record in records:
+        bucket = (record[timestamp].replace(hour=0, minute=0, second=0, microsecond=0), record[key])
+        totals[bucket] = totals.get(bucket, 0.0) + record[energy]
+    return [{"bucket": bucket, "key": key, "value": value} for (bucket, key), value in sorted(totals.items())]
+
+
+class Subscriber:
+    """
+    One connected live client: a bounded queue of framed events.
+
+    Attributes:
+        user (str): Subject of the client's token
+        queue (asyncio.Queue[bytes]): Events not yet written to the client
+        resyncs (int): Times the client fell behind and had its backlog replaced
+    """
+
+    __slots__ = ("user", "queue", "resyncs")
+
+    def __init__(self, user: str, max_queued: int):
+        self.user = user
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=max_queued)
+        self.resyncs = 0
+
+    def offer(self, event: bytes) -> bool:
+        """
+        Queue an event without waiting; a full queue is conflated into a single resync event.
+
+        Returns:
+            bool: False if the backlog had to be dropped.
+        """
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+            self.resyncs += 1
+            return False
+
+
+class LiveBroadcaster:
+    """
+    Coalesces ingested rows into periodic update events fanned out to live subscribers.
+
+    Ingest paths `publish` the rows they committed once `data_version` has
+    been refreshed past them. The first publish after an idle period opens
+    a `window` during which further rows accumulate; when it closes one
+    event with the new readings, their daily totals and the data version
+    is encoded once and offered to every subscriber. Slow subscribers never
+    hold up the others: their bounded queues are conflated into a resync.
+
+    Subscribers and published rows are both local to the process: with
+    several worker processes, each broadcasts only the ingests it handled.
+
+    Attributes:
+        window (float): Seconds rows are coalesced before an update is sent
+        max_queued (int): Events buffered per subscriber
+        max_readings (int): Readings per dataset included in one event; beyond it only the count and totals are sent
+    """
+
+    def __init__(self, window: float, max_queued: int, max_readings: int):
+        self.window = window
+        self.max_queued = max_queued
+        self.max_readings = max_readings
+        self._subscribers: set[Subscriber] = set()
+        self._pending: dict[type, list[tuple]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._sequence = 0
+        self.events = 0
+        self.resyncs = 0
+
+    def subscribe(self, user: str) -> Subscriber:
+        subscriber = Subscriber(user, self.max_queued)
+        self._subscribers.add(subscriber)
+        logger.info("📡 Live subscriber %s connected (%d total).", user, len(self._subscribers))
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        logger.info("📡 Live subscriber %s disconnected (%d total).", subscriber.user, len(self._subscribers))
+
+    def publish(self, model, records: Sequence[tuple]) -> None:
+        """
+        Queue committed records, in table column order, for the next update.
+
+        Call after `data_version.refresh()` so the update's version covers the records.
+        """
+        if not records or not self._subscribers:
+            return
+        self._pending.setdefault(model, []).extend(records)
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self) -> None:
+        """
+        Encode the pending records into one update event and offer it to every subscriber.
+        """
+        self._timer = None
+        pending, self._pending = self._pending, {}
+        if not pending or not self._subscribers:
+            return
+
+        payload = {"version": data_version.value}
+        for model, records in pending.items():
+            name, _ = LIVE_DATASETS[model]
+            columns = [column.name for column in record_columns(model)]
+            payload[name] = {
+                "count": len(records),
+                "readings": [dict(zip(columns, record)) for record in records[-self.max_readings:]],
+                "totals": daily_totals(model, records),
+            }
+        self._sequence += 1
+        event = sse_event("update", orjson.dumps(payload), self._sequence)
+
+        dropped = sum(not subscriber.offer(event) for subscriber in self._subscribers)
+        self.events += 1
+        self.resyncs += dropped
+        logger.debug("📡 Sent live update %d to %d subscribers.", self._sequence, len(self._subscribers))
+
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), "events": self.events, "resyncs": self.resyncs}
+
+
+live = LiveBroadcaster(config.LIVE_WINDOW_MS / 1000, config.LIVE_QUEUE_SIZE, config.LIVE_MAX_READINGS)
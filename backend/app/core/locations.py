@@ -0,0 +1,141 @@
+from datetime import datetime
+
+from sqlalchemy import Float, Select, and_, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.data_generator import CONSUMPTION_CONFIG, CONSUMPTION_REGIONS, GENERATION_CONFIG
+from app.core.energy_queries import Bucket, bucket_expr
+from app.core.logger import setup_logger
+from app.core.rollups import ROLLUPS, rollup_granularity
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+from app.models.location import LocationHierarchy
+
+logger = setup_logger(__name__)
+
+
+def hierarchy_rows() -> list[dict]:
+    """
+    Build the location hierarchy from the data generator configs.
+
+    Generation is recorded per country and consumption per city, so every
+    configured country becomes a country-level row and every consumption
+    location a city-level row pointing at its region and country.
+
+    Returns:
+        list[dict]: Rows for `location_hierarchy`.
+    """
+    rows = {}
+    for country in (*GENERATION_CONFIG, *CONSUMPTION_CONFIG):
+        rows[country] = {"location": country, "level": "country", "city": None, "region": None, "country": country}
+    for country, cities in CONSUMPTION_CONFIG.items():
+        for city in cities:
+            rows[city] = {
+                "location": city, "level": "city", "city": city,
+                "region": CONSUMPTION_REGIONS.get(city), "country": country,
+            }
+    return list(rows.values())
+
+
+async def seed_locations(conn: AsyncConnection) -> int:
+    """
+    Create the location hierarchy table if needed and upsert the configured locations.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+
+    Returns:
+        int: Number of locations written.
+    """
+    await conn.run_sync(LocationHierarchy.__table__.create, checkfirst=True)
+    rows = hierarchy_rows()
+    stmt = insert(LocationHierarchy)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LocationHierarchy.location],
+        set_={name: stmt.excluded[name] for name in ("level", "city", "region", "country")},
+    )
+    await conn.execute(stmt, rows)
+    logger.info(f"🌍 Seeded {len(rows)} locations.")
+    return len(rows)
+
+
+def _country_totals(
+    model,
+    bucket: Bucket,
+    start: datetime | None,
+    end: datetime | None,
+    countries: list[str] | None,
+) -> Select:
+    """
+    Energy per bucket and country for one energy table, read from its rollups when they answer exactly.
+
+    Locations missing from the hierarchy count as their own country.
+    """
+    granularity = rollup_granularity(bucket, start, end)
+    if granularity:
+        source, _ = ROLLUPS[model]
+        timestamp, energy = source.bucket, source.energy_kwh_sum
+    else:
+        source = model
+        timestamp, energy = model.timestamp, model.energy_kwh
+
+    bucket_col = timestamp if bucket == granularity else bucket_expr(bucket, timestamp)
+    country = func.coalesce(LocationHierarchy.country, source.location)
+    stmt = (
+        select(bucket_col.label("bucket"), country.label("country"), func.sum(energy).label("energy_kwh"))
+        .select_from(source)
+        .outerjoin(LocationHierarchy, LocationHierarchy.location == source.location)
+    )
+    if granularity:
+        stmt = stmt.where(source.granularity == granularity)
+    if start is not None:
+        stmt = stmt.where(timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(timestamp < end)
+    if countries:
+        stmt = stmt.where(country.in_(countries))
+    return stmt.group_by(bucket_col, country)
+
+
+def balance_query(
+    bucket: Bucket,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    countries: list[str] | None = None,
+) -> Select:
+    """
+    Build the net generation minus consumption per country and time bucket.
+
+    Both sides are aggregated to country level through `location_hierarchy`
+    and full-outer-joined, so a bucket with only generation or only
+    consumption still appears with the other side as zero.
+
+    Args:
+        bucket (Bucket): Time bucket size.
+        start (datetime, optional): Inclusive lower bound on timestamp.
+        end (datetime, optional): Exclusive upper bound on timestamp.
+        countries (list[str], optional): Countries to include.
+
+    Returns:
+        Select: Statement yielding `bucket`, `country`, `generation_kwh`, `consumption_kwh` and `net_kwh`.
+    """
+    generation = _country_totals(EnergyGeneration, bucket, start, end, countries).subquery("generation")
+    consumption = _country_totals(EnergyConsumption, bucket, start, end, countries).subquery("consumption")
+
+    bucket_col = func.coalesce(generation.c.bucket, consumption.c.bucket)
+    country = func.coalesce(generation.c.country, consumption.c.country)
+    generated = func.coalesce(generation.c.energy_kwh, 0.0)
+    consumed = func.coalesce(consumption.c.energy_kwh, 0.0)
+    on = and_(generation.c.bucket == consumption.c.bucket, generation.c.country == consumption.c.country)
+    return (
+        select(
+            bucket_col.label("bucket"),
+            country.label("country"),
+            generated.cast(Float).label("generation_kwh"),
+            consumed.cast(Float).label("consumption_kwh"),
+            (generated - consumed).cast(Float).label("net_kwh"),
+        )
+        .select_from(generation.join(consumption, on, full=True))
+        .order_by(bucket_col, country)
+    )
@@ -1,11 +1,120 @@
+import atexit
+import json
 import logging
+import queue
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
 
 from app.config import config
 
+# Attributes every LogRecord has; anything else was passed via `extra=` and is emitted in JSON output
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, including any `extra=` fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through a fixed fraction of records below WARNING; warnings and errors always pass.
+
+    Sampling is deterministic (every 1/rate-th record) so rates are exact
+    even for low-volume loggers.
+
+    Attributes:
+        rate (float): Fraction of records kept, between 0 and 1
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._credit = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        self._credit += self.rate
+        if self._credit >= 1.0:
+            self._credit -= 1.0
+            return True
+        return False
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    Queue handler that enqueues records untouched.
+
+    The stock `prepare` formats the message so records can be pickled; the
+    listener runs in this process, so formatting is left to its thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_sampling(spec: str) -> dict[str, float]:
+    """
+    Parse `LOG_SAMPLING`, e.g. "app.routes.energy=0.1,app.core.security=0.01".
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+def _sampling_rate(name: str, rates: dict[str, float]) -> float | None:
+    # The most specific configured prefix wins
+    matches = [prefix for prefix in rates if name == prefix or name.startswith(prefix + ".")]
+    return rates[max(matches, key=len)] if matches else None
+
+
+_handler: logging.Handler | None = None
+
+
+def _shared_handler() -> logging.Handler:
+    """
+    Build the process-wide handler once: a stream handler, or with LOG_MODE=queue,
+    a queue handler whose background listener thread does the formatting and I/O.
+    """
+    global _handler
+    if _handler is not None:
+        return _handler
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(JsonFormatter() if config.LOG_FORMAT == "json" else config.LOG_FORMATTER)
+    if config.LOG_MODE != "queue":
+        _handler = stream
+        return _handler
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(records, stream, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    _handler = _InProcessQueueHandler(records)
+    return _handler
+
 
 def setup_logger(name: str) -> logging.Logger:
     """
-    Sets up a logger using the log level and formatter defined in config.
+    Sets up a logger using the log level, output mode, format and sampling defined in config.
 
     Args:
         name (str): Name of the logger (usually __name__)
@@ -17,10 +126,11 @@ def setup_logger(name: str) -> logging.Logger:
 
     logger.setLevel(config.LOG_LEVEL.upper())
 
-    handler = logging.StreamHandler()
-    handler.setFormatter(config.LOG_FORMATTER)
-
     if not logger.hasHandlers():
-        logger.addHandler(handler)
+        logger.addHandler(_shared_handler())
+
+    rate = _sampling_rate(name, parse_sampling(config.LOG_SAMPLING))
+    if rate is not None and rate < 1.0 and not any(isinstance(f, SamplingFilter) for f in logger.filters):
+        logger.addFilter(SamplingFilter(rate))
 
     return logger
@@ -0,0 +1,263 @@
+import re
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Base for labelled metrics; subclasses keep one value (or bucket list) per label combination.
+
+    Updates happen on the event loop thread, so no locking is needed.
+
+    Attributes:
+        name (str): Metric name
+        help (str): One-line description
+        labelnames (tuple[str, ...]): Label names, in the order values are passed
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, object] = {}
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Cumulative-bucket histogram; each observation is one bisect and two additions.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            # Per-bucket (non-cumulative) counts, then sum
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Holds metrics plus collectors that sample other components' `stats()` at scrape time.
+    """
+
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors: list[tuple[str, str, Callable[[], dict]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_stats(self, prefix: str, help: str, stats: Callable[[], dict]) -> None:
+        """
+        Expose each numeric key of a `stats()` dict as the gauge `<prefix>_<key>`.
+        """
+        self._collectors.append((prefix, help, stats))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for prefix, help, stats in self._collectors:
+            for key, value in stats().items():
+                if isinstance(value, int | float) and not isinstance(value, bool):
+                    lines += [f"# HELP {prefix}_{key} {help}", f"# TYPE {prefix}_{key} gauge", f"{prefix}_{key} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response finished", ("method", "route")))
+http_response_size = registry.register(Histogram(
+    "http_response_size_bytes", "HTTP response body size", ("method", "route"), SIZE_BUCKETS))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being processed"))
+db_latency = registry.register(Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time", ("operation", "table")))
+db_rows = registry.register(Histogram(
+    "db_statement_rows", "Rows returned or affected per SQL statement", ("operation", "table"), ROW_BUCKETS))
+db_checkout_wait = registry.register(Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled connection", (), LATENCY_BUCKETS))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status, body size and in-flight
+    requests per route template (e.g. `/energy/generation`), not per raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            http_requests.inc(method, template, str(status))
+            http_latency.observe(time.perf_counter() - started, method, template)
+            http_response_size.observe(size, method, template)
+
+
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+"?(\w+)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def statement_labels(statement: str) -> tuple[str, str]:
+    """
+    (operation, table) for a SQL string; cached since compiled statements repeat.
+    """
+    operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+    match = _TABLE.search(statement)
+    return operation, match.group(1) if match else ""
+
+
+class MetricsPool(AsyncAdaptedQueuePool):
+    """
+    Connection pool that records how long each checkout waited for a connection.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            db_checkout_wait.observe(time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "checked_in": self.checkedin(),
+        }
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "primary") -> None:
+    """
+    Time every SQL statement run through an engine and expose its pool usage.
+
+    Args:
+        engine (AsyncEngine): Engine to instrument.
+        name (str): Suffix distinguishing the engine's pool gauges.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        operation, table = statement_labels(statement)
+        db_latency.observe(elapsed, operation, table)
+        if cursor.rowcount >= 0:
+            db_rows.observe(cursor.rowcount, operation, table)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def failed(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    pool = sync_engine.pool
+    if isinstance(pool, MetricsPool):
+        registry.register_stats(f"db_pool_{name}", "Connection pool usage", pool.stats)
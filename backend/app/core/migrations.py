@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import config
+from app.core.compact_schema import ensure_compact_schema, is_compact
+from app.core.database import engine
+from app.core.locations import seed_locations
+from app.core.logger import setup_logger
+from app.core.partitions import convert_to_partitioned, detach_partition, ensure_configured_partitions, is_partitioned
+from app.core.rollups import rebuild_rollups
+from app.models.base import INGEST_SEQUENCE
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+
+logger = setup_logger(__name__)
+
+ENERGY_MODELS = (EnergyGeneration, EnergyConsumption)
+
+# Arbitrary key for the advisory lock that serializes concurrent upgrades
+MIGRATION_LOCK_ID = 72_310_001
+
+
+# Indexes added by migration 1, named explicitly so that indexes later declared
+# on the models are created by their own steps, after the columns they cover
+TIME_INDEXES = (
+    "ix_energy_generation_location_timestamp",
+    "ix_energy_generation_source_timestamp",
+    "ix_energy_generation_timestamp_id",
+    "ix_energy_generation_timestamp_brin",
+    "ix_energy_consumption_location_timestamp",
+    "ix_energy_consumption_sector_timestamp",
+    "ix_energy_consumption_timestamp_id",
+    "ix_energy_consumption_timestamp_brin",
+)
+INGEST_SEQ_INDEXES = ("ix_energy_generation_ingest_seq", "ix_energy_consumption_ingest_seq")
+
+
+async def _create_model_indexes(conn: AsyncConnection, names: tuple[str, ...]) -> None:
+    """
+    Create the named indexes declared on the energy models for tables that predate them.
+    The compact schema indexes its fact tables itself.
+    """
+    if is_compact():
+        return
+
+    def create(sync_conn):
+        for model in ENERGY_MODELS:
+            for index in model.__table__.indexes:
+                if index.name in names:
+                    index.create(sync_conn, checkfirst=True)
+
+    await conn.run_sync(create)
+
+
+async def _create_time_indexes(conn: AsyncConnection) -> None:
+    await _create_model_indexes(conn, TIME_INDEXES)
+
+
+async def _add_ingest_sequence(conn: AsyncConnection) -> None:
+    """
+    Add `ingest_seq` to energy tables that predate it, numbering their existing
+    rows, and index it. The compact schema adds it to its fact tables itself.
+    """
+    await conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {INGEST_SEQUENCE.name}"))
+    if is_compact():
+        return
+    for model in ENERGY_MODELS:
+        await conn.execute(text(
+            f'ALTER TABLE "{model.__tablename__}" ADD COLUMN IF NOT EXISTS ingest_seq BIGINT NOT NULL '
+            f"DEFAULT nextval('{INGEST_SEQUENCE.name}')"
+        ))
+    await _create_model_indexes(conn, INGEST_SEQ_INDEXES)
+
+
+# Ordered, append-only list of (version, name, step); never edit an applied step
+MIGRATIONS: list[tuple[int, str, Callable[[AsyncConnection], Awaitable[None]]]] = [
+    (1, "energy_time_indexes", _create_time_indexes),
+    (2, "energy_rollups_backfill", rebuild_rollups),
+    (3, "location_hierarchy", seed_locations),
+    (4, "energy_ingest_sequence", _add_ingest_sequence),
+]
+
+
+async def run_migrations(conn: AsyncConnection) -> list[int]:
+    """
+    Apply the compact schema when configured, pending schema migrations and,
+    when enabled, monthly partitioning.
+
+    Applied versions are recorded in `schema_migrations`; a transaction-level
+    advisory lock keeps concurrently starting containers from racing.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+
+    Returns:
+        list[int]: Versions applied by this call.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+        "applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now())"
+    ))
+    result = await conn.execute(text("SELECT version FROM schema_migrations"))
+    applied = set(result.scalars().all())
+
+    if is_compact():
+        await ensure_compact_schema(conn)
+
+    newly_applied = []
+    for version, name, step in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info(f"🛠️ Applying migration {version}: {name}...")
+        await step(conn)
+        await conn.execute(
+            text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+            {"version": version, "name": name},
+        )
+        newly_applied.append(version)
+
+    if config.ENERGY_PARTITIONING:
+        for model in ENERGY_MODELS:
+            if not await is_partitioned(conn, model.__tablename__):
+                await convert_to_partitioned(conn, model)
+            await ensure_configured_partitions(conn, model.__tablename__)
+
+    logger.info(f"✅ Schema up to date ({len(newly_applied)} migrations applied).")
+    return newly_applied
+
+
+async def _main(args: argparse.Namespace) -> None:
+    async with engine.begin() as conn:
+        if args.command == "detach":
+            await detach_partition(conn, args.table, datetime.strptime(args.month, "%Y-%m").date())
+        else:
+            await run_migrations(conn)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the energy database schema.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("upgrade", help="Apply pending migrations and partitions")
+    detach = commands.add_parser("detach", help="Detach one monthly partition")
+    detach.add_argument("table", choices=[model.__tablename__ for model in ENERGY_MODELS])
+    detach.add_argument("month", help="Month to detach, as YYYY-MM")
+    asyncio.run(_main(parser.parse_args()))
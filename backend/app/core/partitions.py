@@ -0,0 +1,163 @@
+from datetime import date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import config
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """
+    Name of the partition holding one month of a table, e.g. `energy_generation_p2024_03`.
+    """
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+async def is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    result = await conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": table},
+    )
+    return result.first() is not None
+
+
+async def ensure_monthly_partitions(conn: AsyncConnection, table: str, start: date, end: date) -> int:
+    """
+    Create the missing monthly partitions of a table between two months, inclusive,
+    plus a DEFAULT partition for rows outside every explicit range.
+
+    Postgres refuses to add a partition whose range overlaps rows already in
+    the DEFAULT partition, so each new month is built as a plain table, the
+    DEFAULT rows falling into it are moved over, and it is then attached.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+        table (str): Range-partitioned parent table.
+        start (date): First month to cover.
+        end (date): Last month to cover.
+
+    Returns:
+        int: Number of partitions created.
+    """
+    existing = await conn.execute(
+        text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table)"),
+        {"table": table},
+    )
+    names = set(existing.scalars().all())
+    default = f"{table}_pdefault"
+
+    created = 0
+    month = month_start(start)
+    while month <= end:
+        name = partition_name(table, month)
+        if name not in names:
+            lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+            if default in names:
+                await conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS)'))
+                moved = await conn.execute(text(
+                    f'WITH moved AS (DELETE FROM "{default}" '
+                    f"WHERE timestamp >= '{lower}' AND timestamp < '{upper}' RETURNING *) "
+                    f'INSERT INTO "{name}" SELECT * FROM moved'
+                ))
+                await conn.execute(text(
+                    f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" '
+                    f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+                ))
+                if moved.rowcount:
+                    logger.info("🧱 Moved %d rows of %s from %s into %s.", moved.rowcount, table, default, name)
+            else:
+                await conn.execute(text(
+                    f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                    f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+                ))
+            created += 1
+        month = add_months(month, 1)
+
+    if default not in names:
+        await conn.execute(text(f'CREATE TABLE "{default}" PARTITION OF "{table}" DEFAULT'))
+        created += 1
+
+    if created:
+        logger.info("🧱 Created %d partitions for %s.", created, table)
+    return created
+
+
+async def ensure_configured_partitions(conn: AsyncConnection, table: str) -> int:
+    """
+    Cover `PARTITION_START` through `PARTITION_MONTHS_AHEAD` months past today.
+    """
+    start = datetime.strptime(config.PARTITION_START, "%Y-%m").date()
+    end = add_months(month_start(date.today()), config.PARTITION_MONTHS_AHEAD)
+    return await ensure_monthly_partitions(conn, table, start, end)
+
+
+async def convert_to_partitioned(conn: AsyncConnection, model) -> None:
+    """
+    Rebuild an existing plain energy table as a monthly range-partitioned table.
+
+    The rows are copied into a new partitioned parent with partitions
+    covering their full time span, the old table is dropped, and the model's
+    indexes are recreated on the new parent. Runs in the caller's transaction.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+        model: EnergyGeneration or EnergyConsumption.
+    """
+    table = model.__tablename__
+    staging = f"{table}_partitioned"
+    logger.info("🧱 Converting %s to a monthly partitioned table...", table)
+
+    await conn.execute(text(
+        f'CREATE TABLE "{staging}" (LIKE "{table}" INCLUDING DEFAULTS) PARTITION BY RANGE (timestamp)'
+    ))
+    await conn.execute(text(f'ALTER TABLE "{staging}" ADD CONSTRAINT "{table}_pkey_new" PRIMARY KEY (id, timestamp)'))
+
+    bounds = await conn.execute(text(f'SELECT min(timestamp), max(timestamp) FROM "{table}"'))
+    lowest, highest = bounds.one()
+    if lowest is not None:
+        await ensure_monthly_partitions(conn, staging, lowest.date(), highest.date())
+        # Partitions were created under the staging name; give them their final names
+        result = await conn.execute(
+            text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table)"),
+            {"table": staging},
+        )
+        for name in result.scalars().all():
+            await conn.execute(text(f'ALTER TABLE "{name}" RENAME TO "{table}{name[len(staging):]}"'))
+
+    await conn.execute(text(f'INSERT INTO "{staging}" SELECT * FROM "{table}"'))
+    await conn.execute(text(f'DROP TABLE "{table}"'))
+    await conn.execute(text(f'ALTER TABLE "{staging}" RENAME TO "{table}"'))
+    await conn.execute(text(f'ALTER TABLE "{table}" RENAME CONSTRAINT "{table}_pkey_new" TO "{table}_pkey"'))
+    await conn.run_sync(lambda sync_conn: [index.create(sync_conn) for index in model.__table__.indexes])
+    logger.info("✅ %s is now partitioned by month.", table)
+
+
+async def detach_partition(conn: AsyncConnection, table: str, month: date) -> str:
+    """
+    Detach one month from a partitioned table, leaving it as a standalone table
+    that can be archived or dropped without touching the live data.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+        table (str): Range-partitioned parent table.
+        month (date): Any day in the month to detach.
+
+    Returns:
+        str: Name of the detached table.
+    """
+    name = partition_name(table, month_start(month))
+    await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+    logger.info("📤 Detached partition %s from %s.", name, table)
+    return name
@@ -0,0 +1,283 @@
+import argparse
+import asyncio
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy import Float, Select, delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.database import engine
+from app.core.energy_queries import Aggregate, Bucket, bucket_expr
+from app.core.logger import setup_logger
+from app.models.base import record_columns
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+from app.models.energy_rollup import EnergyConsumptionRollup, EnergyGenerationRollup
+
+logger = setup_logger(__name__)
+
+ROLLUP_GRANULARITIES = ("day", "month")
+
+# Raw model -> (rollup model, dimension column besides location)
+ROLLUPS = {
+    EnergyGeneration: (EnergyGenerationRollup, "source"),
+    EnergyConsumption: (EnergyConsumptionRollup, "sector"),
+}
+
+# Relative tolerance when comparing float sums in `check_rollups`
+CHECK_TOLERANCE = 1e-6
+
+
+def _truncate(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "month":
+        return datetime(timestamp.year, timestamp.month, 1)
+    return datetime(timestamp.year, timestamp.month, timestamp.day)
+
+
+def rollup_rows(model, records: Sequence[Sequence]) -> list[dict]:
+    """
+    Aggregate raw records into rollup rows for every granularity.
+
+    Args:
+        model: EnergyGeneration or EnergyConsumption.
+        records (Sequence[Sequence]): Raw rows as tuples in table column order.
+
+    Returns:
+        list[dict]: Rollup rows sorted by key, ready for `apply_rollups`.
+    """
+    _, dimension = ROLLUPS[model]
+    names = [column.name for column in record_columns(model)]
+    ts_i, loc_i, dim_i, kwh_i = (names.index(n) for n in ("timestamp", "location", dimension, "energy_kwh"))
+    total_i = names.index("total") if "total" in names else None
+
+    groups: dict[tuple, dict] = {}
+    for record in records:
+        kwh = record[kwh_i]
+        for granularity in ROLLUP_GRANULARITIES:
+            key = (granularity, _truncate(record[ts_i], granularity), record[loc_i], record[dim_i])
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    "granularity": key[0], "bucket": key[1], "location": key[2], dimension: key[3],
+                    "readings": 0, "energy_kwh_sum": 0.0, "energy_kwh_min": kwh, "energy_kwh_max": kwh,
+                }
+                if total_i is not None:
+                    group["total_sum"] = 0.0
+            group["readings"] += 1
+            group["energy_kwh_sum"] += kwh
+            group["energy_kwh_min"] = min(group["energy_kwh_min"], kwh)
+            group["energy_kwh_max"] = max(group["energy_kwh_max"], kwh)
+            if total_i is not None:
+                group["total_sum"] += record[total_i]
+
+    # A stable key order keeps concurrent upserts from deadlocking on each other
+    return [groups[key] for key in sorted(groups)]
+
+
+async def apply_rollups(conn: AsyncConnection, model, records: Sequence[Sequence]) -> int:
+    """
+    Fold newly inserted raw records into the rollup table of their model.
+
+    Must run in the same transaction as the raw insert so the rollups never
+    disagree with committed data. Only pass rows that were actually inserted.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+        model: EnergyGeneration or EnergyConsumption.
+        records (Sequence[Sequence]): Inserted rows as tuples in table column order.
+
+    Returns:
+        int: Number of rollup rows upserted.
+    """
+    rows = rollup_rows(model, records)
+    if not rows:
+        return 0
+
+    rollup, _ = ROLLUPS[model]
+    stmt = insert(rollup)
+    updates = {
+        "readings": rollup.readings + stmt.excluded.readings,
+        "energy_kwh_sum": rollup.energy_kwh_sum + stmt.excluded.energy_kwh_sum,
+        "energy_kwh_min": func.least(rollup.energy_kwh_min, stmt.excluded.energy_kwh_min),
+        "energy_kwh_max": func.greatest(rollup.energy_kwh_max, stmt.excluded.energy_kwh_max),
+    }
+    if "total_sum" in rows[0]:
+        updates["total_sum"] = rollup.total_sum + stmt.excluded.total_sum
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[column.name for column in rollup.__table__.primary_key],
+        set_=updates,
+    )
+    await conn.execute(stmt, rows)
+    return len(rows)
+
+
+def _aligned(value: datetime | None, granularity: str) -> bool:
+    return value is None or value == _truncate(value, granularity)
+
+
+def rollup_granularity(bucket: Bucket, start: datetime | None = None, end: datetime | None = None) -> str | None:
+    """
+    Rollup granularity that answers `bucket` exactly over `[start, end)`, if any.
+
+    Month buckets over month-aligned ranges read the monthly rollups; other
+    day, week and month buckets over day-aligned ranges read the daily ones.
+
+    Returns:
+        str | None: "day" or "month", or None when only the raw tables will do.
+    """
+    if bucket == "hour":
+        return None
+    granularity = "month" if bucket == "month" and _aligned(start, "month") and _aligned(end, "month") else "day"
+    if not (_aligned(start, granularity) and _aligned(end, granularity)):
+        return None
+    return granularity
+
+
+def rollup_series_query(
+    model,
+    metric: str,
+    bucket: Bucket,
+    aggregate: Aggregate,
+    group_by: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    **dimensions: list[str] | None,
+) -> Select | None:
+    """
+    Build the equivalent of `series_query` over the rollup tables, when it can be answered exactly.
+
+    Rollups serve day, week and month buckets of energy_kwh (any aggregate)
+    or total (sum only), grouped or filtered by location and source/sector,
+    for ranges whose bounds fall on day (or, for month buckets, month)
+    boundaries. Anything else returns None and should go to the raw tables.
+
+    Returns:
+        Select | None: Statement yielding `bucket`, `key` and `value`, or None.
+    """
+    rollup, dimension = ROLLUPS[model]
+    if bucket == "hour" or group_by not in (None, "location", dimension):
+        return None
+    if metric not in ("energy_kwh", "total") or (metric == "total" and aggregate != "sum"):
+        return None
+    if any(values for name, values in dimensions.items() if name not in ("location", dimension)):
+        return None
+
+    granularity = rollup_granularity(bucket, start, end)
+    if granularity is None:
+        return None
+
+    if metric == "total":
+        value = func.sum(rollup.total_sum)
+    else:
+        value = {
+            "sum": func.sum(rollup.energy_kwh_sum),
+            "count": func.sum(rollup.readings),
+            "min": func.min(rollup.energy_kwh_min),
+            "max": func.max(rollup.energy_kwh_max),
+            "avg": func.sum(rollup.energy_kwh_sum) / func.sum(rollup.readings),
+        }[aggregate]
+
+    bucket_col = (rollup.bucket if bucket == granularity else bucket_expr(bucket, rollup.bucket)).label("bucket")
+    key_col = getattr(rollup, group_by) if group_by else literal_column("NULL")
+    stmt = select(bucket_col, key_col.label("key"), value.cast(Float).label("value"))
+    stmt = stmt.where(rollup.granularity == granularity)
+    if start is not None:
+        stmt = stmt.where(rollup.bucket >= start)
+    if end is not None:
+        stmt = stmt.where(rollup.bucket < end)
+    for name in ("location", dimension):
+        if dimensions.get(name):
+            stmt = stmt.where(getattr(rollup, name).in_(dimensions[name]))
+
+    group_cols = [bucket_col, key_col] if group_by else [bucket_col]
+    return stmt.group_by(*group_cols).order_by(*group_cols)
+
+
+def _raw_rollup_select(model, granularity: str):
+    rollup, dimension = ROLLUPS[model]
+    bucket = bucket_expr(granularity, model.timestamp)
+    columns = [
+        literal(granularity).label("granularity"),
+        bucket.label("bucket"),
+        model.location,
+        getattr(model, dimension),
+        func.count().label("readings"),
+        func.sum(model.energy_kwh).label("energy_kwh_sum"),
+        func.min(model.energy_kwh).label("energy_kwh_min"),
+        func.max(model.energy_kwh).label("energy_kwh_max"),
+    ]
+    if hasattr(rollup, "total_sum"):
+        columns.append(func.sum(model.total).label("total_sum"))
+    return select(*columns).group_by(bucket, model.location, getattr(model, dimension))
+
+
+async def rebuild_rollups(conn: AsyncConnection) -> None:
+    """
+    Recompute every rollup table from the raw data.
+
+    Used to backfill databases that were loaded before rollups existed, or
+    to repair rollups after `check_rollups` reports drift.
+
+    Args:
+        conn (AsyncConnection): Connection inside a transaction.
+    """
+    for model, (rollup, _) in ROLLUPS.items():
+        await conn.execute(delete(rollup))
+        for granularity in ROLLUP_GRANULARITIES:
+            select_stmt = _raw_rollup_select(model, granularity)
+            columns = [column.name for column in select_stmt.selected_columns]
+            await conn.execute(insert(rollup).from_select(columns, select_stmt))
+        logger.info(f"🔁 Rebuilt {rollup.__tablename__} from {model.__tablename__}.")
+
+
+async def check_rollups(conn: AsyncConnection) -> list[str]:
+    """
+    Compare every rollup row against an aggregate of the raw data.
+
+    Args:
+        conn (AsyncConnection): Open connection.
+
+    Returns:
+        list[str]: One description per mismatching bucket; empty when consistent.
+    """
+    problems = []
+    for model, (rollup, dimension) in ROLLUPS.items():
+        measures = [c.name for c in rollup.__table__.columns if not c.primary_key]
+        for granularity in ROLLUP_GRANULARITIES:
+            raw = await conn.execute(_raw_rollup_select(model, granularity))
+            expected = {(row.bucket, row.location, getattr(row, dimension)): row for row in raw}
+            stored_rows = await conn.execute(select(rollup).where(rollup.granularity == granularity))
+            stored = {(row.bucket, row.location, getattr(row, dimension)): row for row in stored_rows}
+
+            for key in expected.keys() | stored.keys():
+                want, have = expected.get(key), stored.get(key)
+                if want is None or have is None:
+                    problems.append(f"{rollup.__tablename__} {granularity} {key}: missing {'rollup' if have is None else 'raw'} row")
+                    continue
+                for name in measures:
+                    a, b = getattr(want, name), getattr(have, name)
+                    if abs(a - b) > CHECK_TOLERANCE * max(1.0, abs(a)):
+                        problems.append(f"{rollup.__tablename__} {granularity} {key}: {name} raw={a} rollup={b}")
+    return problems
+
+
+async def _main(command: str) -> int:
+    async with engine.begin() as conn:
+        if command == "rebuild":
+            await rebuild_rollups(conn)
+            return 0
+        problems = await check_rollups(conn)
+    for problem in problems:
+        logger.warning(f"❌ {problem}")
+    if problems:
+        logger.warning(f"⚠️ {len(problems)} rollup buckets disagree with raw data.")
+        return 1
+    logger.info("✅ Rollups match raw data.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify or rebuild the energy rollup tables.")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    raise SystemExit(asyncio.run(_main(parser.parse_args().command)))
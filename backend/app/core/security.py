@@ -1,7 +1,10 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import UTC, datetime, timedelta
 
-import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
@@ -13,47 +16,74 @@ ALGORITHM = config.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = config.ACCESS_TOKEN_EXPIRE_MINUTES
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 logger = setup_logger(__name__)
 
 
-def hash_password(password: str) -> str:
+class TokenCache:
     """
-    Hash a plain text password using bcrypt.
-
-    Args:
-        password (str): Plain text password.
-
-    Returns:
-        str: Hashed password.
-    """
-    logger.info("🔒 Hashing password...")
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(pwd_bytes, salt)
-    return hashed.decode("utf-8")
+    LRU cache of verified JWT payloads keyed by a SHA-256 digest of the token.
 
+    Entries are never served at or past the token's `exp` claim, so a cached
+    token expires exactly when its signature check would start failing. Sync
+    dependencies run on threadpool workers, so lookups and inserts hold a lock.
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+    Attributes:
+        max_entries (int): Tokens kept before the least recently used is evicted
     """
-    Verify a plain password against a hashed password using bcrypt.
-
-    Args:
-        plain_password (str): Plain password input.
-        hashed_password (str): Stored hashed password.
 
-    Returns:
-        bool: True if passwords match, False otherwise.
-    """
-    logger.info("🔍 Verifying password...")
-    valid = bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
-    if valid:
-        logger.info("✅ Password verified successfully.")
-    else:
-        logger.warning("❌ Password verification failed.")
-    return valid
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return dict(entry[0])
+
+    def put(self, token: str, payload: dict) -> None:
+        exp = payload.get("exp")
+        if not isinstance(exp, int | float) or self.max_entries <= 0:
+            return
+        key = self._key(token)
+        entry = (dict(payload), float(exp))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache(config.TOKEN_CACHE_SIZE)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -71,7 +101,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     to_encode = data.copy()
     to_encode.update({"exp": expire})
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    logger.info(f"🔑 Created access token, expires at {expire.isoformat()}")
+    logger.info("🔑 Created access token, expires at %s", expire)
     return token
 
 
@@ -79,18 +109,25 @@ def decode_access_token(token: str) -> dict | None:
     """
     Decode and verify a JWT token.
 
+    Verified payloads are kept in `token_cache` until their expiry, so
+    repeated requests with the same token skip signature verification.
+
     Args:
         token (str): The encoded JWT token.
 
     Returns:
         dict | None: Decoded payload if valid, else None.
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.info("✅ Token successfully decoded.")
+        logger.debug("✅ Token successfully decoded.")
+        token_cache.put(token, payload)
         return payload
     except JWTError as e:
-        logger.warning(f"⚠️ Token decoding failed: {str(e)}")
+        logger.warning("⚠️ Token decoding failed: %s", e)
         return None
 
 
@@ -107,7 +144,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     Returns:
         dict: Decoded JWT payload.
     """
-    logger.info("👤 Getting current user from token...")
+    logger.debug("👤 Getting current user from token...")
     payload = decode_access_token(token)
     if payload is None:
         logger.warning("❌ Invalid or expired token received.")
@@ -115,5 +152,27 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
-    logger.info(f"✅ Authenticated user: {payload.get('sub')}")
+    logger.debug("✅ Authenticated user: %s", payload.get("sub"))
     return payload
+
+
+def get_stream_user(
+    header_token: str | None = Depends(optional_oauth2_scheme),
+    token: str | None = Query(None, description="Access token, for clients such as EventSource that cannot set headers"),
+) -> dict:
+    """
+    Like `get_current_user`, but also accepts the token as a `token` query parameter.
+
+    Raises:
+        HTTPException: If no token is given or it is invalid or expired.
+
+    Returns:
+        dict: Decoded JWT payload.
+    """
+    if not (header_token or token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return get_current_user(header_token or token)
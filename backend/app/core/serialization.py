@@ -0,0 +1,45 @@
+from collections.abc import Iterable, Sequence
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+
+def read_fields(schema: type[BaseModel]) -> list[str]:
+    """
+    Field names of a response schema in the order Pydantic would serialize them.
+    """
+    return list(schema.model_fields)
+
+
+def select_fields(stmt: Select, model, fields: Sequence[str]) -> Select:
+    """
+    Narrow a model query to plain column tuples in schema field order, skipping the ORM identity map.
+    """
+    return stmt.with_only_columns(*(getattr(model, name) for name in fields))
+
+
+def encode_records(fields: Sequence[str], rows: Iterable[Sequence]) -> bytes:
+    """
+    Encode row tuples as a JSON array of objects keyed by `fields`.
+
+    Produces the same bytes as the Pydantic dump of the matching read
+    schema for the column types the energy tables use (str, float and
+    naive datetime), without validating every row.
+
+    Args:
+        fields (Sequence[str]): Key for each tuple position.
+        rows (Iterable[Sequence]): Row tuples, e.g. a SQLAlchemy result.
+
+    Returns:
+        bytes: JSON document.
+    """
+    return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+
+def encode_series(rows: Iterable[Sequence]) -> bytes:
+    """
+    Encode `(bucket, key, value)` rows as `EnergySeriesPoint` JSON; values are
+    always floats, as the schema declares, even for integer counts.
+    """
+    return orjson.dumps([{"bucket": bucket, "key": key, "value": float(value)} for bucket, key, value in rows])
@@ -0,0 +1,107 @@
+import numpy as np
+
+# Values buffered before they are folded into the centroids
+BUFFER_SIZE = 4096
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest with the arcsine scale function).
+
+    Values are buffered and folded into at most about `compression / 2`
+    weighted centroids; centroids near the tails stay small, so extreme
+    quantiles are more accurate than the median. Two digests merge by
+    folding one's centroids into the other, so partial digests computed in
+    parallel combine into the digest of the whole input.
+
+    Attributes:
+        compression (float): Accuracy/size trade-off (delta)
+        count (float): Total weight added
+        min (float): Smallest value added
+        max (float): Largest value added
+    """
+
+    def __init__(self, compression: float = 100):
+        self.compression = compression
+        self.count = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer: list[tuple[np.ndarray, np.ndarray]] = []
+        self._buffered = 0
+
+    def update(self, values, weights=None) -> None:
+        """
+        Add values, optionally with weights (defaults to 1 each).
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64).ravel()
+        self._buffer.append((values, weights))
+        self._buffered += len(values)
+        self.count += float(weights.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered >= BUFFER_SIZE:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """
+        Fold another digest into this one and return self.
+        """
+        other._compress()
+        if other.count:
+            self._buffer.append((other._means, other._weights))
+            self._buffered += len(other._means)
+            self.count += other.count
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress()
+        return self
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        means = np.concatenate([self._means, *(values for values, _ in self._buffer)])
+        weights = np.concatenate([self._weights, *(weights for _, weights in self._buffer)])
+        self._buffer.clear()
+        self._buffered = 0
+
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        # Items whose weight midpoint falls in the same unit of the scale
+        # function k(q) = delta / (2 pi) * asin(2q - 1) share a centroid
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        clusters = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.diff(clusters, prepend=-1))
+        self._weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / self._weights
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the value below which a fraction `q` of the weight lies.
+
+        Args:
+            q (float): Quantile in [0, 1].
+
+        Returns:
+            float: Estimated quantile, or NaN for an empty digest.
+        """
+        self._compress()
+        if not self.count:
+            return float("nan")
+        if len(self._means) == 1:
+            return float(self._means[0])
+        # Interpolate between centroid centres, anchored at the exact extremes
+        centres = np.cumsum(self._weights) - self._weights / 2
+        positions = np.concatenate([[0.0], centres, [self.count]])
+        values = np.concatenate([[self.min], self._means, [self.max]])
+        return float(np.interp(q * self.count, positions, values))
+
+    def __len__(self) -> int:
+        self._compress()
+        return len(self._means)
@@ -0,0 +1,235 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import DateTime, Float, Select
+
+from app.core.database import ReadSessionLocal
+from app.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+STREAM_MEDIA_TYPES = (NDJSON_MEDIA_TYPE, CSV_MEDIA_TYPE, ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE)
+
+# Low-cardinality string columns sent as dictionary-encoded Arrow columns
+DICTIONARY_COLUMNS = {"location", "source", "sector", "system_id", "consumer_id"}
+
+STREAM_CHUNK_SIZE = 5000
+
+
+def negotiate_stream_format(accept: str | None) -> str | None:
+    """
+    Pick a streaming media type from an `Accept` header.
+
+    Args:
+        accept (str | None): Raw `Accept` header value.
+
+    Returns:
+        str | None: A supported streaming media type, or None for the default JSON response.
+    """
+    if not accept:
+        return None
+    for part in accept.split(","):
+        media_type = part.split(";", 1)[0].strip().lower()
+        if media_type in STREAM_MEDIA_TYPES:
+            return media_type
+    return None
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_ndjson(columns: Sequence[str], rows: Sequence[Sequence]) -> bytes:
+    """
+    Encode rows as newline-delimited JSON objects.
+
+    Args:
+        columns (Sequence[str]): Column names, in row order.
+        rows (Sequence[Sequence]): Row tuples.
+
+    Returns:
+        bytes: One JSON object per line.
+    """
+    lines = [json.dumps(dict(zip(columns, row)), default=_json_default) for row in rows]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def encode_csv(rows: Sequence[Sequence]) -> bytes:
+    """
+    Encode rows as CSV lines.
+
+    Args:
+        rows (Sequence[Sequence]): Row tuples; datetimes are written in ISO format.
+
+    Returns:
+        bytes: CSV lines without a header.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+class _DrainableSink(io.RawIOBase):
+    """
+    Write-only file object whose buffered bytes can be taken after each write,
+    so Arrow and Parquet writers can feed a streaming response.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def arrow_schema(columns) -> pa.Schema:
+    """
+    Map SQLAlchemy columns to an Arrow schema.
+
+    Floats become float64 buffers, timestamps microsecond timestamps, and
+    the string dimensions in `DICTIONARY_COLUMNS` dictionary-encoded strings.
+
+    Args:
+        columns: SQLAlchemy columns in row order.
+
+    Returns:
+        pa.Schema: Matching Arrow schema.
+    """
+    fields = []
+    for column in columns:
+        if isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif column.name in DICTIONARY_COLUMNS:
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable))
+    return pa.schema(fields)
+
+
+def encode_record_batch(schema: pa.Schema, rows: Sequence[Sequence]) -> pa.RecordBatch:
+    """
+    Transpose row tuples into an Arrow record batch.
+
+    Args:
+        schema (pa.Schema): Schema from `arrow_schema`.
+        rows (Sequence[Sequence]): Row tuples in schema order.
+
+    Returns:
+        pa.RecordBatch: Columnar batch.
+    """
+    values = list(zip(*rows)) if rows else [[] for _ in schema]
+    arrays = []
+    for field, column in zip(schema, values):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(column, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(column, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+async def stream_partitions(stmt: Select, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[Sequence]:
+    """
+    Run a statement on a server-side cursor and yield its rows in fixed-size partitions.
+
+    The session is owned by the generator rather than a request dependency,
+    because a streaming body keeps reading after the endpoint has returned.
+
+    Args:
+        stmt (Select): Column statement to execute.
+        chunk_size (int): Rows fetched per round trip.
+
+    Yields:
+        Sequence: Up to `chunk_size` row tuples.
+    """
+    async with ReadSessionLocal() as session:
+        result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            yield partition
+
+
+async def _stream_text(stmt: Select, media_type: str, chunk_size: int) -> AsyncIterator[bytes]:
+    columns = [column.name for column in stmt.selected_columns]
+    if media_type == CSV_MEDIA_TYPE:
+        yield encode_csv([columns])
+
+    async for partition in stream_partitions(stmt, chunk_size):
+        if media_type == CSV_MEDIA_TYPE:
+            yield encode_csv(partition)
+        else:
+            yield encode_ndjson(columns, partition)
+
+
+async def _stream_columnar(stmt: Select, media_type: str, chunk_size: int) -> AsyncIterator[bytes]:
+    schema = arrow_schema(stmt.selected_columns)
+    sink = _DrainableSink()
+    if media_type == PARQUET_MEDIA_TYPE:
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    async for partition in stream_partitions(stmt, chunk_size):
+        writer.write_batch(encode_record_batch(schema, partition))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+async def stream_rows(stmt: Select, media_type: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Stream the result of a column statement as NDJSON, CSV, an Arrow IPC stream or Parquet.
+
+    Arrow batches and Parquet row groups are written one per fetched chunk,
+    so memory stays bounded by `chunk_size` for every format.
+
+    Args:
+        stmt (Select): Column statement to execute.
+        media_type (str): One of `STREAM_MEDIA_TYPES`.
+        chunk_size (int): Rows fetched and encoded per chunk.
+
+    Yields:
+        bytes: Encoded chunks.
+    """
+    if media_type in (ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE):
+        chunks = _stream_columnar(stmt, media_type, chunk_size)
+    else:
+        chunks = _stream_text(stmt, media_type, chunk_size)
+
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        yield chunk
+    logger.info("✅ Streamed %d bytes as %s.", total, media_type)
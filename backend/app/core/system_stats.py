@@ -0,0 +1,237 @@
+import asyncio
+from collections.abc import Sequence
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app.config import config
+from app.core.cache import data_version
+from app.core.data_generator import GENERATION_CONFIG
+from app.core.database import ReadSessionLocal
+from app.core.energy_queries import bucket_expr
+from app.core.logger import setup_logger
+from app.core.sketches import TDigest
+from app.core.streaming import stream_partitions
+from app.models.energy_generation import EnergyGeneration
+
+logger = setup_logger(__name__)
+
+# Daily output quantiles reported per system
+QUANTILES = {"p5_daily_kwh": 0.05, "p50_daily_kwh": 0.5, "p95_daily_kwh": 0.95}
+
+# Day numbers are taken relative to this date to keep the regression sums small
+_EPOCH = np.datetime64("2020-01-01", "D")
+_DAYS_PER_MONTH = 365.25 / 12
+
+# Configured daily capacity per system id; generated copies ("SYS-UK-WIND-1-2") share their base id's
+CAPACITIES = {
+    system_id: capacity
+    for sources in GENERATION_CONFIG.values()
+    for systems in sources.values()
+    for system_id, capacity in systems.items()
+}
+
+
+def configured_capacity(system_id: str) -> float | None:
+    capacity = CAPACITIES.get(system_id)
+    if capacity is None:
+        capacity = CAPACITIES.get(system_id.rsplit("-", 1)[0])
+    return capacity
+
+
+class SystemSketch:
+    """
+    Mergeable summary of one system's daily output.
+
+    Keeps the sums needed for the mean and the least-squares trend of
+    daily output over time, plus a t-digest of the daily values, so two
+    sketches over disjoint days merge into the sketch of their union.
+    """
+
+    __slots__ = ("source", "location", "days", "total", "sum_t", "sum_tt", "sum_ty", "digest")
+
+    def __init__(self, source: str, location: str):
+        self.source = source
+        self.location = location
+        self.days = 0
+        self.total = self.sum_t = self.sum_tt = self.sum_ty = 0.0
+        self.digest = TDigest()
+
+    def update(self, days: np.ndarray, values: np.ndarray) -> None:
+        """
+        Add daily totals, with `days` as day numbers since `_EPOCH`.
+        """
+        self.days += len(values)
+        self.total += float(values.sum())
+        self.sum_t += float(days.sum())
+        self.sum_tt += float((days * days).sum())
+        self.sum_ty += float((days * values).sum())
+        self.digest.update(values)
+
+    def merge(self, other: "SystemSketch") -> "SystemSketch":
+        self.days += other.days
+        self.total += other.total
+        self.sum_t += other.sum_t
+        self.sum_tt += other.sum_tt
+        self.sum_ty += other.sum_ty
+        self.digest.merge(other.digest)
+        return self
+
+    def trend(self) -> float | None:
+        """
+        Least-squares slope of daily output, in kWh/day gained per day.
+        """
+        spread = self.days * self.sum_tt - self.sum_t ** 2
+        if self.days < 2 or spread <= 0:
+            return None
+        return (self.days * self.sum_ty - self.sum_t * self.total) / spread
+
+
+def fold_daily_rows(sketches: dict[str, SystemSketch], rows: Sequence[Sequence]) -> None:
+    """
+    Fold `(system_id, source, location, day, energy_kwh)` rows into per-system sketches.
+    """
+    if not rows:
+        return
+    system_ids, sources, locations, days, values = zip(*rows)
+    day_numbers = (np.array(days, dtype="datetime64[D]") - _EPOCH).astype(np.float64)
+    values = np.array(values, dtype=np.float64)
+    _, codes = np.unique(np.array(system_ids), return_inverse=True)
+
+    order = np.argsort(codes, kind="stable")
+    for group in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+        first = group[0]
+        sketch = sketches.get(system_ids[first])
+        if sketch is None:
+            sketch = sketches[system_ids[first]] = SystemSketch(sources[first], locations[first])
+        sketch.update(day_numbers[group], values[group])
+
+
+def _month_starts(first: datetime, last: datetime) -> list[datetime]:
+    months = np.arange(np.datetime64(first, "M"), np.datetime64(last, "M") + 2)
+    return [month.astype(datetime) for month in months.astype("datetime64[us]")]
+
+
+def summarize(sketches: dict[str, SystemSketch]) -> list[dict]:
+    """
+    Turn merged sketches into per-system statistics ranked within each source.
+
+    Systems are ranked by mean daily output, 1 being the most productive
+    system of its source. The capacity factor compares mean daily output
+    with the configured (initial) daily capacity, so capacity upgrades can
+    push it above 1; systems missing from the configuration have none.
+
+    Returns:
+        list[dict]: Rows matching `EnergySystemStats`, ordered by source and rank.
+    """
+    rows = []
+    for system_id, sketch in sketches.items():
+        mean = sketch.total / sketch.days
+        capacity = configured_capacity(system_id)
+        slope = sketch.trend()
+        row = {
+            "system_id": system_id,
+            "source": sketch.source,
+            "location": sketch.location,
+            "days": sketch.days,
+            "total_kwh": sketch.total,
+            "mean_daily_kwh": mean,
+            "capacity_kwh_per_day": capacity,
+            "capacity_factor": mean / capacity if capacity else None,
+            "trend_kwh_per_month": slope * _DAYS_PER_MONTH if slope is not None else None,
+        }
+        row.update({name: sketch.digest.quantile(q) for name, q in QUANTILES.items()})
+        rows.append(row)
+
+    rows.sort(key=lambda row: (row["source"], -row["mean_daily_kwh"], row["system_id"]))
+    rank, source = 0, None
+    for row in rows:
+        rank = rank + 1 if row["source"] == source else 1
+        source = row["source"]
+        row["rank_in_source"] = rank
+    return rows
+
+
+class SystemStatsEngine:
+    """
+    Single-pass, per-month computation of per-system generation statistics.
+
+    Every calendar month is scanned once, on its own read connection and
+    with up to `concurrency` months in flight, into a `SystemSketch` per
+    system. Month sketches are kept until `data_version` changes, and the
+    whole-history statistics are just their merge.
+
+    Attributes:
+        concurrency (int): Months scanned in parallel
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._version = None
+        self._months: dict[datetime, dict[str, SystemSketch]] = {}
+        self._lock = asyncio.Lock()
+        self._scans = 0
+        self._hits = 0
+
+    async def _scan_month(self, start: datetime, end: datetime, limit: asyncio.Semaphore) -> dict[str, SystemSketch]:
+        day = bucket_expr("day", EnergyGeneration.timestamp)
+        stmt = (
+            select(
+                EnergyGeneration.system_id, EnergyGeneration.source, EnergyGeneration.location,
+                day, func.sum(EnergyGeneration.energy_kwh),
+            )
+            .where(EnergyGeneration.timestamp >= start, EnergyGeneration.timestamp < end)
+            .group_by(EnergyGeneration.system_id, EnergyGeneration.source, EnergyGeneration.location, day)
+        )
+        sketches: dict[str, SystemSketch] = {}
+        async with limit:
+            async for rows in stream_partitions(stmt):
+                fold_daily_rows(sketches, rows)
+        self._scans += 1
+        return sketches
+
+    async def compute(self) -> list[dict]:
+        """
+        Per-system statistics over the whole generation history.
+
+        Returns:
+            list[dict]: Rows from `summarize`.
+        """
+        async with self._lock:
+            if self._version != data_version.value:
+                self._months.clear()
+                self._version = data_version.value
+
+            async with ReadSessionLocal() as session:
+                result = await session.execute(
+                    select(func.min(EnergyGeneration.timestamp), func.max(EnergyGeneration.timestamp))
+                )
+                first, last = result.one()
+            if first is None:
+                return []
+
+            starts = _month_starts(first, last)
+            months = list(zip(starts, starts[1:]))
+            missing = [month for month in months if month[0] not in self._months]
+            self._hits += len(months) - len(missing)
+            if missing:
+                limit = asyncio.Semaphore(self.concurrency)
+                scanned = await asyncio.gather(*(self._scan_month(start, end, limit) for start, end in missing))
+                self._months.update((start, sketches) for (start, _), sketches in zip(missing, scanned))
+                logger.info("📊 Scanned %d months of generation into system sketches.", len(missing))
+
+            merged: dict[str, SystemSketch] = {}
+            for start, _ in months:
+                for system_id, sketch in self._months[start].items():
+                    target = merged.get(system_id)
+                    if target is None:
+                        target = merged[system_id] = SystemSketch(sketch.source, sketch.location)
+                    target.merge(sketch)
+        return summarize(merged)
+
+    def stats(self) -> dict:
+        return {"months_cached": len(self._months), "month_scans": self._scans, "month_hits": self._hits}
+
+
+system_stats = SystemStatsEngine(config.SYSTEM_STATS_CONCURRENCY)
@@ -1,10 +1,46 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.analytics import analytics, is_memory_engine
+from app.core.cache import response_cache
+from app.core.exports import exports
+from app.core.forecasting import forecaster
+from app.core.hashing import password_hasher
+from app.core.live import live
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from app.core.security import token_cache
+from app.core.system_stats import system_stats
 from app.routes import auth
 from app.routes import energy
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm the in-memory analytics engine, when enabled, before serving requests,
+    run the export workers while the app is up, and stop them and the
+    forecast worker processes on shutdown.
+    """
+    if is_memory_engine():
+        await analytics.ensure_loaded()
+    await exports.start()
+    yield
+    await exports.stop()
+    await forecaster.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+registry.register_stats("response_cache", "Energy response cache", response_cache.stats)
+registry.register_stats("token_cache", "Verified token cache", token_cache.stats)
+registry.register_stats("password_hashing", "bcrypt thread pool", password_hasher.stats)
+registry.register_stats("analytics", "In-memory analytics column stores", analytics.stats)
+registry.register_stats("exports", "Background export jobs", exports.stats)
+registry.register_stats("forecasting", "Forecast model fits", forecaster.stats)
+registry.register_stats("live", "Live update subscribers", live.stats)
+registry.register_stats("system_stats", "Per-system statistics month sketches", system_stats.stats)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,7 +49,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-High-Water-Mark"],
 )
+# Outermost, so latency includes CORS handling and every response is counted
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 def read_root():
@@ -22,6 +61,13 @@ def read_root():
     """
     return {"message": "Welcome to the Renewable Energy Visualizer API!"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus text exposition of request, SQL, pool, cache and hashing metrics.
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
 # Include authentication routes
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(energy.router, prefix="/energy", tags=["Energy"])
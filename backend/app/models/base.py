@@ -1,3 +1,14 @@
+from sqlalchemy import Sequence
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
+
+# Numbers every row inserted into either energy table, so clients can ask for rows above the last number they saw
+INGEST_SEQUENCE = Sequence("energy_ingest_seq", metadata=Base.metadata)
+
+
+def record_columns(model) -> list:
+    """
+    Columns of an energy table that records supply, in table order; columns the database assigns are left out.
+    """
+    return [column for column in model.__table__.columns if column.server_default is None]
@@ -1,15 +1,28 @@
-from sqlalchemy import Column, String, Float, DateTime
-from app.models.base import Base
+from sqlalchemy import BigInteger, Column, String, Float, DateTime, Index
+
+from app.config import config
+from app.models.base import INGEST_SEQUENCE, Base
 
 
 class EnergyConsumption(Base):
     __tablename__ = "energy_consumption"
+    __table_args__ = (
+        Index("ix_energy_consumption_location_timestamp", "location", "timestamp"),
+        Index("ix_energy_consumption_sector_timestamp", "sector", "timestamp"),
+        Index("ix_energy_consumption_timestamp_id", "timestamp", "id"),
+        Index("ix_energy_consumption_timestamp_brin", "timestamp", postgresql_using="brin"),
+        Index("ix_energy_consumption_ingest_seq", "ingest_seq"),
+        {"postgresql_partition_by": "RANGE (timestamp)"} if config.ENERGY_PARTITIONING else {},
+    )
 
     id = Column(String, primary_key=True, index=True)
-    timestamp = Column(DateTime, nullable=False)
+    # Partitioned tables need the partition key in the primary key
+    timestamp = Column(DateTime, nullable=False, primary_key=config.ENERGY_PARTITIONING)
     energy_kwh = Column(Float, nullable=False)
     location = Column(String, nullable=False)
     sector = Column(String, nullable=False)
     consumer_id = Column(String, index=True, nullable=False)
     price = Column(Float, nullable=False)
     total = Column(Float, nullable=False)
+    # Assigned by the database on insert; delta reads return rows above a client's high-water mark
+    ingest_seq = Column(BigInteger, server_default=INGEST_SEQUENCE.next_value(), nullable=False)
@@ -0,0 +1,57 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, String
+
+from app.models.base import Base
+
+
+class EnergyGenerationRollup(Base):
+    """
+    Pre-aggregated generation per time bucket, location and source.
+
+    Attributes:
+        granularity (str): Bucket size, "day" or "month"
+        bucket (datetime): Start of the bucket
+        location (str): Generation location
+        source (str): Generation source
+        readings (int): Number of raw readings in the bucket
+        energy_kwh_sum (float): Sum of energy_kwh
+        energy_kwh_min (float): Minimum energy_kwh
+        energy_kwh_max (float): Maximum energy_kwh
+    """
+    __tablename__ = "energy_generation_rollup"
+
+    granularity = Column(String, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    location = Column(String, primary_key=True)
+    source = Column(String, primary_key=True)
+    readings = Column(BigInteger, nullable=False)
+    energy_kwh_sum = Column(Float, nullable=False)
+    energy_kwh_min = Column(Float, nullable=False)
+    energy_kwh_max = Column(Float, nullable=False)
+
+
+class EnergyConsumptionRollup(Base):
+    """
+    Pre-aggregated consumption per time bucket, location and sector.
+
+    Attributes:
+        granularity (str): Bucket size, "day" or "month"
+        bucket (datetime): Start of the bucket
+        location (str): Consumption location
+        sector (str): Consumer sector
+        readings (int): Number of raw readings in the bucket
+        energy_kwh_sum (float): Sum of energy_kwh
+        energy_kwh_min (float): Minimum energy_kwh
+        energy_kwh_max (float): Maximum energy_kwh
+        total_sum (float): Sum of total cost
+    """
+    __tablename__ = "energy_consumption_rollup"
+
+    granularity = Column(String, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    location = Column(String, primary_key=True)
+    sector = Column(String, primary_key=True)
+    readings = Column(BigInteger, nullable=False)
+    energy_kwh_sum = Column(Float, nullable=False)
+    energy_kwh_min = Column(Float, nullable=False)
+    energy_kwh_max = Column(Float, nullable=False)
+    total_sum = Column(Float, nullable=False)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Index, String
+
+from app.models.base import Base
+
+
+class LocationHierarchy(Base):
+    """
+    Places the `location` values of the energy tables in a city → region → country hierarchy.
+
+    Attributes:
+        location (str): Value as stored in the energy tables' `location` column
+        level (str): "city" or "country"
+        city (str): City, for city-level locations
+        region (str): Region (state or constituent country), for city-level locations
+        country (str): Country the location belongs to
+    """
+    __tablename__ = "location_hierarchy"
+    __table_args__ = (
+        Index("ix_location_hierarchy_country", "country"),
+    )
+
+    location = Column(String, primary_key=True)
+    level = Column(String, nullable=False)
+    city = Column(String, nullable=True)
+    region = Column(String, nullable=True)
+    country = Column(String, nullable=False)
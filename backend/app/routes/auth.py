@@ -5,13 +5,23 @@ from sqlalchemy.future import select
 
 from app.core.database import get_db
 from app.core.logger import setup_logger
-from app.core.security import create_access_token, get_current_user, hash_password, verify_password
+from app.core.hashing import HashingOverloaded, password_hasher
+from app.core.security import create_access_token, get_current_user
 from app.models.user import User
 from app.schemas.user import UserCreate
 
 router = APIRouter()
 logger = setup_logger(__name__)
 
+
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", status_code=201)
 async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """
@@ -22,30 +32,34 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
         db (AsyncSession): Injected SQLAlchemy session.
 
     Raises:
-        HTTPException: If a user with the same email already exists.
+        HTTPException: If a user with the same email already exists,
+            or 503 when the hashing queue is full.
 
     Returns:
         dict: Success message and the registered user's email.
     """
-    logger.info(f"Attempting to register user: {user.email}")
+    logger.info("Attempting to register user: %s", user.email)
     result = await db.execute(select(User).where(User.email == user.email))
     existing_user = result.scalar_one_or_none()
 
     if existing_user:
-        logger.warning(f"Registration failed: Email already registered - {user.email}")
+        logger.warning("Registration failed: Email already registered - %s", user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    hashed_pw = hash_password(user.password)
+    try:
+        hashed_pw = await password_hasher.hash(user.password)
+    except HashingOverloaded:
+        raise _hashing_busy()
     new_user = User(email=user.email, hashed_password=hashed_pw)
 
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
 
-    logger.info(f"User registered successfully: {new_user.email}")
+    logger.info("User registered successfully: %s", new_user.email)
     return {"message": "User registered successfully", "email": new_user.email}
 
 
@@ -57,29 +71,41 @@ async def login_user(
     """
     Authenticates a user by verifying their email and password from the database.
 
+    Password hashes made with an outdated bcrypt cost factor are transparently
+    replaced with one using the configured factor.
+
     Args:
         form_data (OAuth2PasswordRequestForm): The incoming login form with username (email) and password.
         db (AsyncSession): Injected SQLAlchemy session.
 
     Raises:
-        HTTPException: If credentials are invalid.
+        HTTPException: If credentials are invalid, or 503 when the hashing queue is full.
 
     Returns:
         dict: JWT access token and token type.
     """
-    logger.info(f"Login attempt for user: {form_data.username}")
+    logger.info("Login attempt for user: %s", form_data.username)
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        logger.warning(f"Login failed: Invalid credentials for user: {form_data.username}")
+    try:
+        valid = user is not None and await password_hasher.verify(form_data.password, user.hashed_password)
+        if valid and password_hasher.needs_rehash(user.hashed_password):
+            user.hashed_password = await password_hasher.hash(form_data.password)
+            await db.commit()
+            logger.info("Password hash upgraded to %d rounds: %s", password_hasher.rounds, user.email)
+    except HashingOverloaded:
+        raise _hashing_busy()
+
+    if not valid:
+        logger.warning("Login failed: Invalid credentials for user: %s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
     token = create_access_token(data={"sub": user.email})
-    logger.info(f"Login successful: {user.email}")
+    logger.info("Login successful: %s", user.email)
     return {"access_token": token, "token_type": "bearer"}
 
 
@@ -94,7 +120,7 @@ def read_profile(user: dict = Depends(get_current_user)):
     Returns:
         dict: User info (currently only email).
     """
-    logger.info(f"Profile accessed: {user['sub']}")
+    logger.info("Profile accessed: %s", user["sub"])
     return {"email": user["sub"]}
 
 
@@ -109,5 +135,5 @@ def get_dashboard(user: dict = Depends(get_current_user)):
     Returns:
         dict: Personalized message
     """
-    logger.info(f"Dashboard accessed by: {user['sub']}")
+    logger.info("Dashboard accessed by: %s", user["sub"])
     return {"message": f"Welcome back, {user['sub']}! You are viewing your dashboard."}
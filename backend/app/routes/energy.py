@@ -1,39 +1,686 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import time
+from datetime import datetime
+from typing import List, Literal
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from typing import List
 
+from app.models.base import record_columns
 from app.models.energy_generation import EnergyGeneration
 from app.models.energy_consumption import EnergyConsumption
-from app.schemas.energy import EnergyGenerationRead, EnergyConsumptionRead
-from app.core.database import get_db
+from app.schemas.energy import (
+    EnergyBalancePoint, EnergyConsumptionRead, EnergyExportCreate, EnergyExportJob, EnergyForecastPoint,
+    EnergyGenerationRead, EnergySeriesPoint, EnergySystemStats, IngestResult,
+)
+from app.config import config
+from app.core.analytics import analytics, is_memory_engine
+from app.core.cache import cached_response, data_version
+from app.core.database import get_read_db
+from app.core.downsampling import Method, downsample_series
+from app.core.exports import ExportJob, ExportsOverloaded, exports
+from app.core.forecasting import forecaster
+from app.core.ingest import INGEST_MEDIA_TYPES, ingest
+from app.core.live import KEEPALIVE_EVENT, SSE_MEDIA_TYPE, live, sse_event
+from app.core.energy_queries import (
+    Aggregate, Bucket, encode_cursor, high_water_query, keyset_query, naive_utc, series_query,
+)
+from app.core.locations import balance_query
 from app.core.logger import setup_logger
+from app.core.rollups import rollup_series_query
+from app.core.serialization import encode_records, encode_series, read_fields, select_fields
+from app.core.streaming import negotiate_stream_format, stream_rows
+from app.core.system_stats import system_stats
 
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_stream_user
 
 router = APIRouter()
 logger = setup_logger(__name__)
 
 
+PAGE_LIMIT_DEFAULT = 1000
+PAGE_LIMIT_MAX = 10000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+HIGH_WATER_MARK_HEADER = "X-High-Water-Mark"
+POINTS_MAX = 10000
+
+# Request body documentation for the batch ingest routes
+INGEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {media_type: {"schema": {"type": "string"}} for media_type in INGEST_MEDIA_TYPES},
+    }
+}
+
+# Response fields per model, in the order the declared response_model serializes them
+READ_FIELDS = {
+    EnergyGeneration: read_fields(EnergyGenerationRead),
+    EnergyConsumption: read_fields(EnergyConsumptionRead),
+}
+BALANCE_FIELDS = read_fields(EnergyBalancePoint)
+SYSTEM_STATS_FIELDS = read_fields(EnergySystemStats)
+FORECAST_FIELDS = read_fields(EnergyForecastPoint)
+
+# Forecastable dataset -> (model, dimensions a forecast can be split by)
+FORECAST_DATASETS = {
+    "generation": (EnergyGeneration, ("location", "source", "system_id")),
+    "consumption": (EnergyConsumption, ("location", "sector", "consumer_id")),
+}
+
+
+async def _list_records(
+    request: Request,
+    db: AsyncSession,
+    model,
+    limit: int | None,
+    after: str | None,
+    **filters,
+):
+    """
+    Serve a keyset listing either as one JSON page or, when the client accepts
+    one of the streaming formats, as a streamed export of every matching row.
+
+    JSON pages default to `PAGE_LIMIT_DEFAULT` rows, expose the cursor of
+    the following page in the `X-Next-Cursor` header and go through the
+    response cache. Streams are only bounded when `limit` is given explicitly.
+    Both carry the table's `ingest_seq` high-water mark, read before the rows,
+    in the `X-High-Water-Mark` header.
+
+    Raises:
+        HTTPException: If the `after` cursor is malformed.
+
+    Returns:
+        Response | StreamingResponse: Cached JSON page, or a streaming body.
+    """
+    try:
+        stmt = keyset_query(model, after, **filters)
+    except ValueError as e:
+        logger.warning("⚠️ Rejected pagination cursor: %s", e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    media_type = negotiate_stream_format(request.headers.get("accept"))
+    if media_type:
+        stmt = stmt.with_only_columns(*record_columns(model))
+        if limit:
+            stmt = stmt.limit(limit)
+        high_water = await db.scalar(high_water_query(model))
+        logger.info("📤 Streaming %s as %s...", model.__tablename__, media_type)
+        return StreamingResponse(
+            stream_rows(stmt, media_type), media_type=media_type, headers={HIGH_WATER_MARK_HEADER: str(high_water)},
+        )
+
+    limit = limit or PAGE_LIMIT_DEFAULT
+    fields = READ_FIELDS[model]
+    stmt = select_fields(stmt, model, fields)
+
+    async def build():
+        # Read first: rows committed in between may come back too, but none below the mark can be missed
+        high_water = await db.scalar(high_water_query(model))
+        # Plain tuples encoded by orjson; the response_model only documents the schema
+        result = await db.execute(stmt.limit(limit + 1))
+        records = result.tuples().all()
+        headers = {HIGH_WATER_MARK_HEADER: str(high_water)}
+        if len(records) > limit:
+            records = records[:limit]
+            last = dict(zip(fields, records[-1]))
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(last["timestamp"], last["id"])
+        logger.info("✅ %d %s records retrieved.", len(records), model.__tablename__)
+        return encode_records(fields, records), headers
+
+    return await cached_response(request, build)
+
+
+async def _series_points(db: AsyncSession, model, *args, **filters) -> list[tuple]:
+    """
+    Compute `(bucket, key, value)` series rows with the configured analytics engine.
+
+    The memory engine aggregates its NumPy copy of the table; otherwise the
+    query goes to the rollup tables when they answer it exactly, else to the
+    raw table.
+    """
+    if is_memory_engine():
+        return await analytics.series(model, *args, **filters)
+    stmt = rollup_series_query(model, *args, **filters)
+    if stmt is None:
+        stmt = series_query(model, *args, **filters)
+    result = await db.execute(stmt)
+    return result.tuples().all()
+
+
 @router.get("/generation", response_model=List[EnergyGenerationRead])
-async def get_all_generation(db: AsyncSession = Depends(get_db), user: dict = Depends(get_current_user)):
+async def get_all_generation(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=PAGE_LIMIT_MAX),
+    after: str | None = None,
+    since: int | None = Query(None, ge=0),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    location: List[str] | None = Query(None),
+    source: List[str] | None = Query(None),
+    system_id: List[str] | None = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
     """
-    Returns all energy generation records.
+    Returns one page of energy generation records ordered by timestamp.
+
+    The cursor for the next page is returned in the `X-Next-Cursor` header
+    and is absent on the last page. With `since`, only rows ingested after
+    that high-water mark are listed; the `X-High-Water-Mark` header of the
+    first page is the value to send next time. Sending an `Accept` header of
+    `application/x-ndjson`, `text/csv`, `application/vnd.apache.arrow.stream`
+    or `application/vnd.apache.parquet` streams every matching row instead.
+
+    Args:
+        request (Request): Incoming request, used for `Accept` negotiation and caching.
+        limit (int, optional): Page size, or a row cap for streamed responses.
+        after (str, optional): Cursor returned with the previous page.
+        since (int, optional): High-water mark of an earlier listing; only newer rows are returned.
+        start (datetime, optional): Inclusive lower bound, passed as `from`.
+        end (datetime, optional): Exclusive upper bound, passed as `to`.
+        location (List[str], optional): Locations to include.
+        source (List[str], optional): Sources to include.
+        system_id (List[str], optional): Systems to include.
+        db (AsyncSession): Injected SQLAlchemy session.
+        user (dict): Decoded JWT payload.
+
+    Returns:
+        List[EnergyGenerationRead] | StreamingResponse: Generation records on this page, or a stream.
     """
     logger.info("📡 Fetching energy generation data...")
-    result = await db.execute(select(EnergyGeneration))
-    records = result.scalars().all()
-    logger.info(f"✅ {len(records)} generation records retrieved.")
-    return records
+    return await _list_records(
+        request, db, EnergyGeneration, limit, after, start=naive_utc(start), end=naive_utc(end), since=since,
+        location=location, source=source, system_id=system_id,
+    )
 
 
 @router.get("/consumption", response_model=List[EnergyConsumptionRead])
-async def get_all_consumption(db: AsyncSession = Depends(get_db), user: dict = Depends(get_current_user)):
+async def get_all_consumption(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=PAGE_LIMIT_MAX),
+    after: str | None = None,
+    since: int | None = Query(None, ge=0),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    location: List[str] | None = Query(None),
+    sector: List[str] | None = Query(None),
+    consumer_id: List[str] | None = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
     """
-    Returns all energy consumption records.
+    Returns one page of energy consumption records ordered by timestamp.
+
+    The cursor for the next page is returned in the `X-Next-Cursor` header
+    and is absent on the last page. With `since`, only rows ingested after
+    that high-water mark are listed; the `X-High-Water-Mark` header of the
+    first page is the value to send next time. Sending an `Accept` header of
+    `application/x-ndjson`, `text/csv`, `application/vnd.apache.arrow.stream`
+    or `application/vnd.apache.parquet` streams every matching row instead.
+
+    Args:
+        request (Request): Incoming request, used for `Accept` negotiation and caching.
+        limit (int, optional): Page size, or a row cap for streamed responses.
+        after (str, optional): Cursor returned with the previous page.
+        since (int, optional): High-water mark of an earlier listing; only newer rows are returned.
+        start (datetime, optional): Inclusive lower bound, passed as `from`.
+        end (datetime, optional): Exclusive upper bound, passed as `to`.
+        location (List[str], optional): Locations to include.
+        sector (List[str], optional): Sectors to include.
+        consumer_id (List[str], optional): Consumers to include.
+        db (AsyncSession): Injected SQLAlchemy session.
+        user (dict): Decoded JWT payload.
+
+    Returns:
+        List[EnergyConsumptionRead] | StreamingResponse: Consumption records on this page, or a stream.
     """
     logger.info("📡 Fetching energy consumption data...")
-    result = await db.execute(select(EnergyConsumption))
-    records = result.scalars().all()
-    logger.info(f"✅ {len(records)} consumption records retrieved.")
-    return records
+    return await _list_records(
+        request, db, EnergyConsumption, limit, after, start=naive_utc(start), end=naive_utc(end), since=since,
+        location=location, sector=sector, consumer_id=consumer_id,
+    )
+
+
+@router.get("/generation/series", response_model=List[EnergySeriesPoint])
+async def get_generation_series(
+    request: Request,
+    bucket: Bucket = "day",
+    aggregate: Aggregate = "sum",
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    location: List[str] | None = Query(None),
+    source: List[str] | None = Query(None),
+    system_id: List[str] | None = Query(None),
+    group_by: Literal["location", "source", "system_id"] | None = None,
+    max_points: int | None = Query(None, alias="points", ge=3, le=POINTS_MAX),
+    method: Method = "lttb",
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Returns generated energy aggregated into time buckets by the database.
+
+    With `points`, every series (one per `group_by` key) is downsampled to
+    at most that many points, so chart payloads stay the size of the chart.
+
+    Args:
+        request (Request): Incoming request, used for caching.
+        bucket (Bucket): Bucket size (hour, day, week or month).
+        aggregate (Aggregate): Aggregate applied to energy_kwh within each bucket.
+        start (datetime, optional): Inclusive lower bound, passed as `from`.
+        end (datetime, optional): Exclusive upper bound, passed as `to`.
+        location (List[str], optional): Locations to include.
+        source (List[str], optional): Sources to include.
+        system_id (List[str], optional): Systems to include.
+        group_by (str, optional): Dimension to split the series by.
+        max_points (int, optional): Point budget per series, passed as `points`; longer series are downsampled.
+        method (Method): Downsampling algorithm, `lttb` (shape) or `minmax` (envelope).
+        db (AsyncSession): Injected SQLAlchemy session.
+        user (dict): Decoded JWT payload.
+
+    Returns:
+        List[EnergySeriesPoint]: One point per bucket (and key, when grouped).
+    """
+    logger.info("📡 Fetching generation series (bucket=%s, aggregate=%s)...", bucket, aggregate)
+    args = (EnergyGeneration, "energy_kwh", bucket, aggregate, group_by, naive_utc(start), naive_utc(end))
+    filters = dict(location=location, source=source, system_id=system_id)
+
+    async def build():
+        points = await _series_points(db, *args, **filters)
+        if max_points:
+            points = await asyncio.to_thread(downsample_series, points, max_points, method)
+        logger.info("✅ %d generation series points retrieved.", len(points))
+        return encode_series(points), {}
+
+    return await cached_response(request, build)
+
+
+@router.get("/consumption/series", response_model=List[EnergySeriesPoint])
+async def get_consumption_series(
+    request: Request,
+    bucket: Bucket = "day",
+    aggregate: Aggregate = "sum",
+    metric: Literal["energy_kwh", "price", "total"] = "energy_kwh",
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    location: List[str] | None = Query(None),
+    sector: List[str] | None = Query(None),
+    consumer_id: List[str] | None = Query(None),
+    group_by: Literal["location", "sector", "consumer_id"] | None = None,
+    max_points: int | None = Query(None, alias="points", ge=3, le=POINTS_MAX),
+    method: Method = "lttb",
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Returns consumed energy (or cost) aggregated into time buckets by the database.
+
+    With `points`, every series (one per `group_by` key) is downsampled to
+    at most that many points, so chart payloads stay the size of the chart.
+
+    Args:
+        request (Request): Incoming request, used for caching.
+        bucket (Bucket): Bucket size (hour, day, week or month).
+        aggregate (Aggregate): Aggregate applied to the metric within each bucket.
+        metric (str): Column to aggregate (energy_kwh, price or total).
+        start (datetime, optional): Inclusive lower bound, passed as `from`.
+        end (datetime, optional): Exclusive upper bound, passed as `to`.
+        location (List[str], optional): Locations to include.
+        sector (List[str], optional): Sectors to include.
+        consumer_id (List[str], optional): Consumers to include.
+        group_by (str, optional): Dimension to split the series by.
+        max_points (int, optional): Point budget per series, passed as `points`; longer series are downsampled.
+        method (Method): Downsampling algorithm, `lttb` (shape) or `minmax` (envelope).
+        db (AsyncSession): Injected SQLAlchemy session.
+        user (dict): Decoded JWT payload.
+
+    Returns:
+        List[EnergySeriesPoint]: One point per bucket (and key, when grouped).
+    """
+    logger.info("📡 Fetching consumption series (bucket=%s, aggregate=%s)...", bucket, aggregate)
+    args = (EnergyConsumption, metric, bucket, aggregate, group_by, naive_utc(start), naive_utc(end))
+    filters = dict(location=location, sector=sector, consumer_id=consumer_id)
+
+    async def build():
+        points = await _series_points(db, *args, **filters)
+        if max_points:
+            points = await asyncio.to_thread(downsample_series, points, max_points, method)
+        logger.info("✅ %d consumption series points retrieved.", len(points))
+        return encode_series(points), {}
+
+    return await cached_response(request, build)
+
+
+@router.get("/balance", response_model=List[EnergyBalancePoint])
+async def get_balance(
+    request: Request,
+    bucket: Bucket = "day",
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    country: List[str] | None = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Returns generation, consumption and their difference per country and time bucket.
+
+    Consumption is recorded per city and generation per country; both are
+    rolled up to country level through the location hierarchy and joined
+    in a single query.
+
+    Args:
+        request (Request): Incoming request, used for caching.
+        bucket (Bucket): Bucket size (hour, day, week or month).
+        start (datetime, optional): Inclusive lower bound, passed as `from`.
+        end (datetime, optional): Exclusive upper bound, passed as `to`.
+        country (List[str], optional): Countries to include.
+        db (AsyncSession): Injected SQLAlchemy session.
+        user (dict): Decoded JWT payload.
+
+    Returns:
+        List[EnergyBalancePoint]: One point per bucket and country.
+    """
+    logger.info("📡 Fetching energy balance (bucket=%s)...", bucket)
+    stmt = balance_query(bucket, naive_utc(start), naive_utc(end), country)
+
+    async def build():
+        result = await db.execute(stmt)
+        points = result.tuples().all()
+        logger.info("✅ %d balance points retrieved.", len(points))
+        return encode_records(BALANCE_FIELDS, points), {}
+
+    return await cached_response(request, build)
+
+
+@router.get("/systems/stats", response_model=List[EnergySystemStats])
+async def get_system_stats(
+    request: Request,
+    source: List[str] | None = Query(None),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Returns whole-history statistics for every generation system.
+
+    Per system: total and mean daily output, capacity factor against the
+    configured capacity, approximate p5/p50/p95 of daily output, the trend
+    of daily output per month and the rank by mean output within its
+    source. Computed from per-month sketches that are reused until new data
+    is ingested.
+
+    Args:
+        request (Request): Incoming request, used for caching.
+        source (List[str], optional): Sources to include; ranks are always within the full source.
+        user (dict): Decoded JWT payload.
+
+    Returns:
+        List[EnergySystemStats]: One entry per system, ordered by source and rank.
+    """
+    logger.info("📡 Fetching system statistics...")
+
+    async def build():
+        rows = [row for row in await system_stats.compute() if not source or row["source"] in source]
+        logger.info("✅ Statistics for %d systems computed.", len(rows))
+        return encode_records(SYSTEM_STATS_FIELDS, ([row[name] for name in SYSTEM_STATS_FIELDS] for row in rows)), {}
+
+    return await cached_response(request, build)
+
+
+@router.get("/forecast", response_model=List[EnergyForecastPoint])
+async def get_forecast(
+    request: Request,
+    dataset: Literal["generation", "consumption"] = "generation",
+    group_by: Literal["location", "source", "system_id", "sector", "consumer_id"] = "location",
+    key: List[str] | None = Query(None),
+    days: int = Query(30, ge=1, le=365),
+    level: float = Query(0.95, gt=0, lt=1),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Returns daily energy forecasts with prediction intervals for every series of a dataset.
+
+    Each series (daily kWh per `group_by` value) gets an additive
+    Holt-Winters model with weekly seasonality, fitted in a worker process
+    and cached until new data arrives.
+
+    Args:
+        request (Request): Incoming request, used for caching.
+        dataset (str): generation or consumption.
+        group_by (str): Dimension whose values are forecast separately.
+        key (List[str], optional): Values of `group_by` to forecast; all by default.
+        days (int): Days to forecast past the last recorded day.
+        level (float): Prediction interval coverage.
+        db (AsyncSession): Injected SQLAlchemy session.
+        user (dict): Decoded JWT payload.
+
+    Raises:
+        HTTPException: 400 if `group_by` is not a dimension of `dataset`.
+
+    Returns:
+        List[EnergyForecastPoint]: One point per series and forecast day.
+    """
+    model, dimensions = FORECAST_DATASETS[dataset]
+    if group_by not in dimensions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{dataset} forecasts can be grouped by: {', '.join(dimensions)}",
+        )
+    logger.info("📡 Forecasting %s by %s, %d days...", dataset, group_by, days)
+
+    async def build():
+        rows = await _series_points(db, model, "energy_kwh", "day", "sum", group_by, None, None, **{group_by: key})
+        points = await forecaster.forecast(f"{dataset}:{group_by}", rows, days, level)
+        logger.info("✅ %d forecast points computed.", len(points))
+        return encode_records(FORECAST_FIELDS, points), {}
+
+    return await cached_response(request, build)
+
+
+async def _ingest(request: Request, model) -> IngestResult:
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type not in INGEST_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Send one of: {', '.join(INGEST_MEDIA_TYPES)}",
+        )
+    return await ingest(model, request.stream(), media_type)
+
+
+@router.post("/generation/batch", response_model=IngestResult, openapi_extra=INGEST_BODY)
+async def ingest_generation(request: Request, user: dict = Depends(get_current_user)):
+    """
+    Ingests generation readings from a streamed NDJSON or CSV (with header) body.
+
+    Rows are validated one by one and written in batches; rows whose `id`
+    already exists are counted as duplicates. Rows without an `id` get one
+    derived from `system_id` and `timestamp`, so resending them is safe.
+
+    Args:
+        request (Request): Incoming request whose body is streamed.
+        user (dict): Decoded JWT payload.
+
+    Raises:
+        HTTPException: 415 for other content types.
+
+    Returns:
+        IngestResult: Accepted, duplicate and rejected row counts.
+    """
+    logger.info("📥 Generation batch ingest by %s...", user["sub"])
+    return await _ingest(request, EnergyGeneration)
+
+
+@router.post("/consumption/batch", response_model=IngestResult, openapi_extra=INGEST_BODY)
+async def ingest_consumption(request: Request, user: dict = Depends(get_current_user)):
+    """
+    Ingests consumption readings from a streamed NDJSON or CSV (with header) body.
+
+    Rows are validated one by one and written in batches; rows whose `id`
+    already exists are counted as duplicates. Rows without an `id` get one
+    derived from `consumer_id` and `timestamp`, so resending them is safe.
+
+    Args:
+        request (Request): Incoming request whose body is streamed.
+        user (dict): Decoded JWT payload.
+
+    Raises:
+        HTTPException: 415 for other content types.
+
+    Returns:
+        IngestResult: Accepted, duplicate and rejected row counts.
+    """
+    logger.info("📥 Consumption batch ingest by %s...", user["sub"])
+    return await _ingest(request, EnergyConsumption)
+
+
+@router.get("/live", response_class=StreamingResponse, responses={200: {"content": {SSE_MEDIA_TYPE: {}}}})
+async def stream_live_updates(user: dict = Depends(get_stream_user)):
+    """
+    Pushes newly ingested readings to the client as Server-Sent Events.
+
+    A `ready` event carries the current data version, a list with one
+    high-water mark per dataset. Then each `update` event carries the
+    version and, per dataset with new rows, the row `count`, up to
+    `LIVE_MAX_READINGS` of the newest `readings`, and daily `totals` per
+    source or sector. Rows ingested within `LIVE_WINDOW_MS` of each other
+    share one event. A client that falls `LIVE_QUEUE_SIZE` events behind
+    gets a single `resync` event in place of its backlog and should reload.
+    The same happens when an update's `count` exceeds its `readings`.
+
+    Updates cover ingests handled by the server process holding the stream;
+    with several worker processes, a client only hears about the ingests
+    that reached its own worker. The stream is closed when the token it was
+    opened with expires, and the client should reconnect with a new one.
+
+    Args:
+        user (dict): Decoded JWT payload, from the Authorization header or the `token` query parameter.
+
+    Returns:
+        StreamingResponse: `text/event-stream` body that stays open until the client disconnects or the token expires.
+    """
+    subscriber = live.subscribe(user["sub"])
+    expires_at = user.get("exp")
+
+    async def events():
+        try:
+            yield sse_event("ready", orjson.dumps({"version": await data_version.current()}))
+            while True:
+                timeout = config.LIVE_KEEPALIVE_SECONDS
+                if expires_at is not None:
+                    remaining = expires_at - time.time()
+                    if remaining <= 0:
+                        logger.info("📡 Closing live stream of %s: token expired.", user["sub"])
+                        return
+                    timeout = min(timeout, remaining)
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), timeout)
+                except TimeoutError:
+                    yield KEEPALIVE_EVENT
+        finally:
+            live.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _export_status(request: Request, job: ExportJob) -> EnergyExportJob:
+    download_url = str(request.url_for("download_export", job_id=job.id)) if job.status == "done" else None
+    return EnergyExportJob(**job.describe(exports.retention), download_url=download_url)
+
+
+def _find_export(job_id: str) -> ExportJob:
+    job = exports.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found or expired")
+    return job
+
+
+@router.post("/exports", response_model=EnergyExportJob, status_code=status.HTTP_202_ACCEPTED)
+async def create_export(
+    request: Request,
+    export: EnergyExportCreate,
+    user: dict = Depends(get_current_user),
+):
+    """
+    Starts a background export of generation or consumption records to a gzipped CSV or Parquet file.
+
+    The export runs outside the request; poll the returned job for progress
+    and download the file from its `download_url` once it is done. An export
+    identical to one already queued, running or finished on unchanged data
+    returns that job instead of starting another. Jobs are kept by the
+    server process that accepted them, so with several processes the job
+    is only found through the same one.
+
+    Args:
+        request (Request): Incoming request, used to build the job URLs.
+        export (EnergyExportCreate): Dataset, format, time range and dimension filters.
+        user (dict): Decoded JWT payload.
+
+    Raises:
+        HTTPException: 503 when too many exports are already waiting.
+
+    Returns:
+        EnergyExportJob: The new or existing job.
+    """
+    # Identical exports are shared only while the data they read is unchanged
+    await data_version.current()
+    try:
+        job = exports.submit(export)
+    except ExportsOverloaded as e:
+        logger.warning("🚦 Rejecting export by %s: %s", user["sub"], e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many exports queued, retry later",
+            headers={"Retry-After": "30"},
+        )
+    logger.info("📦 Export %s requested by %s.", job.id, user["sub"])
+    return _export_status(request, job)
+
+
+@router.get("/exports/{job_id}", response_model=EnergyExportJob)
+async def get_export(request: Request, job_id: str, user: dict = Depends(get_current_user)):
+    """
+    Returns the status and progress of an export job.
+
+    Args:
+        request (Request): Incoming request, used to build the download URL.
+        job_id (str): Id returned when the export was created.
+        user (dict): Decoded JWT payload.
+
+    Raises:
+        HTTPException: 404 for unknown or expired jobs.
+
+    Returns:
+        EnergyExportJob: Current job state.
+    """
+    return _export_status(request, _find_export(job_id))
+
+
+@router.get("/exports/{job_id}/file", response_class=FileResponse, name="download_export")
+async def download_export(job_id: str, user: dict = Depends(get_current_user)):
+    """
+    Downloads a finished export.
+
+    `Range` requests are supported, so an interrupted download can resume
+    from the bytes already received; `If-Range` with the returned `ETag`
+    guards against resuming into a different file.
+
+    Args:
+        job_id (str): Id of a finished export.
+        user (dict): Decoded JWT payload.
+
+    Raises:
+        HTTPException: 404 for unknown or expired jobs, 409 while the export is not done.
+
+    Returns:
+        FileResponse: The export file.
+    """
+    job = _find_export(job_id)
+    if job.status != "done":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Export is {job.status}")
+    logger.info("📥 Export %s downloaded by %s.", job.id, user["sub"])
+    return FileResponse(job.path, media_type=job.media_type, filename=job.filename)
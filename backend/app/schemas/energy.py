@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from datetime import UTC, datetime
 
 
 class EnergyGenerationBase(BaseModel):
@@ -33,3 +35,117 @@ class EnergyConsumptionCreate(EnergyConsumptionBase):
 
 class EnergyConsumptionRead(EnergyConsumptionBase):
     id: str
+
+
+class EnergySeriesPoint(BaseModel):
+    bucket: datetime
+    key: str | None = None
+    value: float
+
+
+class EnergyBalancePoint(BaseModel):
+    bucket: datetime
+    country: str
+    generation_kwh: float
+    consumption_kwh: float
+    net_kwh: float
+
+
+class EnergySystemStats(BaseModel):
+    system_id: str
+    source: str
+    location: str
+    days: int
+    total_kwh: float
+    mean_daily_kwh: float
+    capacity_kwh_per_day: float | None = None
+    capacity_factor: float | None = None
+    trend_kwh_per_month: float | None = None
+    p5_daily_kwh: float
+    p50_daily_kwh: float
+    p95_daily_kwh: float
+    rank_in_source: int
+
+
+class EnergyForecastPoint(BaseModel):
+    key: str
+    day: datetime
+    forecast: float
+    lower: float
+    upper: float
+
+
+class EnergyGenerationIngest(EnergyGenerationCreate):
+    id: str | None = None
+
+
+class EnergyConsumptionIngest(EnergyConsumptionCreate):
+    id: str | None = None
+
+
+class IngestError(BaseModel):
+    line: int
+    error: str
+
+
+class IngestResult(BaseModel):
+    accepted: int
+    duplicates: int
+    rejected: int
+    errors: list[IngestError] = []
+
+
+# Dimension filters an export of each dataset accepts
+EXPORT_DIMENSIONS = {
+    "generation": ("location", "source", "system_id"),
+    "consumption": ("location", "sector", "consumer_id"),
+}
+
+
+class EnergyExportCreate(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    dataset: Literal["generation", "consumption"]
+    format: Literal["csv", "parquet"] = "csv"
+    start: datetime | None = Field(None, alias="from")
+    end: datetime | None = Field(None, alias="to")
+    location: list[str] | None = None
+    source: list[str] | None = None
+    system_id: list[str] | None = None
+    sector: list[str] | None = None
+    consumer_id: list[str] | None = None
+
+    @field_validator("start", "end")
+    @classmethod
+    def to_naive_utc(cls, value: datetime | None) -> datetime | None:
+        # Stored timestamps are naive UTC
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+    @model_validator(mode="after")
+    def check_dimensions(self):
+        allowed = EXPORT_DIMENSIONS[self.dataset]
+        for name in ("source", "system_id", "sector", "consumer_id"):
+            if getattr(self, name) and name not in allowed:
+                raise ValueError(f"{name} does not apply to {self.dataset}")
+        return self
+
+    def filters(self) -> dict[str, list[str] | None]:
+        return {name: getattr(self, name) for name in EXPORT_DIMENSIONS[self.dataset]}
+
+
+class EnergyExportJob(BaseModel):
+    id: str
+    status: Literal["queued", "running", "done", "failed"]
+    dataset: str
+    format: str
+    rows: int
+    total_rows: int | None = None
+    progress: float
+    bytes: int
+    created_at: datetime
+    finished_at: datetime | None = None
+    expires_at: datetime | None = None
+    error: str | None = None
+    download_url: str | None = None
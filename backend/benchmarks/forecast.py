@@ -0,0 +1,69 @@
+"""
+Backtest the Holt-Winters forecasts on the generated data.
+
+Holds out the last `--holdout` days of every system's daily generation,
+fits on the history before it, and reports the error against a naive
+forecast (mean of the last four weeks), interval coverage, and the
+monthly capacity growth implied by the fitted trend, which the data
+generator sets to 2% per month.
+
+Run from the backend directory against a loaded database:
+
+    python -m benchmarks.forecast --holdout 30 --level 0.9
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.config import config
+from app.core.data_generator import START_DATE
+from app.core.database import read_engine
+from app.core.energy_queries import series_query
+from app.core.forecasting import SEASON, daily_series, fit_holt_winters, project
+from app.models.energy_generation import EnergyGeneration
+
+GENERATOR_GROWTH = 0.02
+DAYS_PER_MONTH = 365.25 / 12
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with read_engine.connect() as conn:
+        result = await conn.execute(series_query(EnergyGeneration, "energy_kwh", "day", "sum", "system_id"))
+        rows = result.tuples().all()
+    await read_engine.dispose()
+
+    # Systems whose history ends early or starts late would need a window of their own
+    series = daily_series(rows, config.FORECAST_HISTORY_DAYS + args.holdout)
+    length = max(len(values) for _, values in series.values())
+    if length < args.holdout + 2 * SEASON:
+        raise SystemExit(f"{length} days of data is too short for a {args.holdout} day holdout")
+    keys = [key for key, (_, values) in series.items() if len(values) == length]
+    first_day = series[keys[0]][0]
+    matrix = np.stack([series[key][1] for key in keys])
+    history, actual = matrix[:, :-args.holdout], matrix[:, -args.holdout:]
+
+    started = time.perf_counter()
+    fit = fit_holt_winters(history)
+    elapsed = time.perf_counter() - started
+    mean, lower, upper = project(fit, args.holdout, args.level)
+    naive = history[:, -28:].mean(axis=1, keepdims=True)
+
+    # Output is factor * capacity * (1 + growth * month), so trend / (mean output / (1 + growth * mean month)) ~ growth
+    first_month = (first_day.year - START_DATE.year) * 12 + first_day.month - START_DATE.month
+    mean_month = first_month + history.shape[1] / 2 / DAYS_PER_MONTH
+    implied = fit["trend"] * DAYS_PER_MONTH * (1 + GENERATOR_GROWTH * mean_month) / history.mean(axis=1)
+
+    print(f"{len(keys)} of {len(series)} systems, {history.shape[1]} days of history, fitted in {elapsed * 1000:.0f} ms")
+    print(f"MAE holt-winters  {np.abs(mean - actual).mean():8.2f} kWh/day")
+    print(f"MAE naive         {np.abs(naive - actual).mean():8.2f} kWh/day")
+    print(f"{args.level:.0%} interval coverage {((actual >= lower) & (actual <= upper)).mean():.1%}")
+    print(f"implied growth    {np.median(implied):.2%}/month median (generator: {GENERATOR_GROWTH:.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--holdout", type=int, default=30)
+    parser.add_argument("--level", type=float, default=0.9)
+    asyncio.run(main(parser.parse_args()))
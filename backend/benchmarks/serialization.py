@@ -0,0 +1,67 @@
+"""
+Compare the ORM + Pydantic serialization of energy listings with the
+column-tuple + orjson fast path used by the energy routes.
+
+Run from the backend directory against a loaded database:
+
+    python -m benchmarks.serialization --rows 1000 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.core.database import ReadSessionLocal, read_engine
+from app.core.serialization import encode_records, read_fields, select_fields
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+from app.schemas.energy import EnergyConsumptionRead, EnergyGenerationRead
+
+SCHEMAS = {EnergyGeneration: EnergyGenerationRead, EnergyConsumption: EnergyConsumptionRead}
+
+
+async def orm_pydantic(session, model, rows: int) -> bytes:
+    adapter = TypeAdapter(List[SCHEMAS[model]])
+    result = await session.execute(select(model).order_by(model.timestamp, model.id).limit(rows))
+    records = result.scalars().all()
+    return adapter.dump_json(adapter.validate_python(records, from_attributes=True))
+
+
+async def tuples_orjson(session, model, rows: int) -> bytes:
+    fields = read_fields(SCHEMAS[model])
+    stmt = select_fields(select(model).order_by(model.timestamp, model.id), model, fields)
+    result = await session.execute(stmt.limit(rows))
+    return encode_records(fields, result.tuples().all())
+
+
+async def measure(path, model, rows: int, repeat: int) -> tuple[float, int]:
+    timings = []
+    async with ReadSessionLocal() as session:
+        body = await path(session, model, rows)
+        for _ in range(repeat):
+            session.expunge_all()
+            started = time.perf_counter()
+            await path(session, model, rows)
+            timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2], len(body)
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'table':<20}{'rows':>8}  {'path':<16}{'ms/request':>12}{'rows/s':>12}{'bytes':>12}")
+    for model in (EnergyGeneration, EnergyConsumption):
+        for rows in args.rows:
+            for name, path in (("orm+pydantic", orm_pydantic), ("tuples+orjson", tuples_orjson)):
+                median, size = await measure(path, model, rows, args.repeat)
+                print(f"{model.__tablename__:<20}{rows:>8}  {name:<16}{median * 1000:>12.1f}{rows / median:>12,.0f}{size:>12,}")
+    await read_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
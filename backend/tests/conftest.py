@@ -4,9 +4,17 @@ import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, text
 
+from app.core.cache import response_cache
+from app.core.compact_schema import is_compact
+from app.core.database import engine, read_engine
+from app.core.rollups import ROLLUPS
 from app.main import app
 
+# Location of every row tests ingest, so they can be told apart from the loaded data and removed
+TEST_LOCATION = "Testland"
+
 
 @pytest.fixture(scope="session")
 def anyio_backend():
@@ -32,3 +40,45 @@ async def async_client(client: TestClient) -> AsyncGenerator:
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url=client.base_url) as ac:
         yield ac
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def dispose_engine() -> AsyncGenerator:
+    """
+    Drops pooled connections after each test, since every test runs on its own event loop.
+    """
+    yield
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+@pytest_asyncio.fixture()
+async def auth_headers(async_client: AsyncClient) -> dict:
+    """
+    Authorization header for the demo user, used by protected energy routes.
+    """
+    payload = {"username": "demo@example.com", "password": "demopass"}
+    response = await async_client.post("/auth/login", data=payload)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest_asyncio.fixture()
+async def test_location() -> AsyncGenerator:
+    """
+    Location for rows a test ingests; they and their rollups are deleted when the test ends.
+    """
+    yield TEST_LOCATION
+    async with engine.begin() as conn:
+        for model, (rollup, _) in ROLLUPS.items():
+            if is_compact():
+                await conn.execute(
+                    text(
+                        f"DELETE FROM {model.__tablename__}_facts WHERE location_id = "
+                        "(SELECT id FROM energy_dim_location WHERE name = :location)"
+                    ),
+                    {"location": TEST_LOCATION},
+                )
+            else:
+                await conn.execute(delete(model).where(model.location == TEST_LOCATION))
+            await conn.execute(delete(rollup).where(rollup.location == TEST_LOCATION))
+    response_cache.clear()
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.core.analytics import AnalyticsEngine, ColumnStore
+from app.core.cache import data_version
+from app.core.database import engine, read_engine
+from app.core.energy_queries import series_query
+from app.core.ingest import insert_records, to_record
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 4, 1)
+
+CASES = [
+    (EnergyGeneration, "energy_kwh", "day", "sum", None, {}),
+    (EnergyGeneration, "energy_kwh", "week", "avg", "source", {}),
+    (EnergyGeneration, "energy_kwh", "month", "max", "system_id", {"location": ["UK", "USA"]}),
+    (EnergyGeneration, "energy_kwh", "hour", "count", "location", {"source": ["wind"]}),
+    (EnergyConsumption, "total", "month", "sum", "sector", {}),
+    (EnergyConsumption, "price", "day", "min", "location", {"sector": ["residential"]}),
+    (EnergyConsumption, "price", "hour", "max", None, {}),
+    (EnergyConsumption, "energy_kwh", "week", "sum", None, {"location": ["London"], "consumer_id": ["missing"]}),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("model", "metric", "bucket", "aggregate", "group_by", "filters"), CASES)
+async def test_memory_series_matches_sql(model, metric, bucket, aggregate, group_by, filters):
+    """
+    Test the in-memory column store returns the same series as the SQL aggregation.
+    """
+    store = ColumnStore(model)
+    await store.load()
+    args = (metric, bucket, aggregate, group_by, START, END)
+
+    async with read_engine.connect() as conn:
+        result = await conn.execute(series_query(model, *args, **filters))
+        expected = result.tuples().all()
+    actual = store.series(*args, **filters)
+
+    assert [(bucket, key) for bucket, key, _ in actual] == [(bucket, key) for bucket, key, _ in expected]
+    assert [value for _, _, value in actual] == pytest.approx([float(value) for _, _, value in expected])
+
+
+@pytest.mark.asyncio
+async def test_memory_store_reports_usage():
+    """
+    Test the memory report covers every stored column.
+    """
+    store = ColumnStore(EnergyConsumption)
+    rows = await store.load()
+
+    usage = store.memory_usage()
+
+    assert usage["rows"] == rows > 0
+    assert usage["columns"]["timestamp"] == usage["columns"]["total"] == 8 * rows
+    assert set(usage["columns"]) == {"timestamp", "energy_kwh", "price", "total", "location", "sector", "consumer_id"}
+    assert usage["bytes"] == sum(usage["columns"].values())
+
+
+@pytest.mark.asyncio
+async def test_memory_engine_reloads_rows_committed_elsewhere(test_location, monkeypatch):
+    """
+    Test the engine reloads once the data version read from the database moves, not only after local ingests.
+    """
+    memory = AnalyticsEngine(max_staleness=60)
+    args = ("energy_kwh", "day", "sum", "location", None, None)
+    before = await memory.series(EnergyGeneration, *args, location=[test_location])
+
+    record = to_record(EnergyGeneration, {
+        "timestamp": "2030-01-05T00:00:00", "energy_kwh": 2.0, "source": "Solar",
+        "location": test_location, "system_id": "SYS-TEST-ELSEWHERE",
+    })
+    async with engine.begin() as conn:
+        await insert_records(conn, EnergyGeneration, [record])
+    monkeypatch.setattr(data_version, "_fresh_until", 0.0)
+    after = await memory.series(EnergyGeneration, *args, location=[test_location])
+
+    assert before == []
+    assert after == [(datetime(2030, 1, 5), test_location, 2.0)]
+    assert (memory.loads, memory.appends) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_merged_store_matches_full_load(test_location):
+    """
+    Test rows merged above the high-water mark, including ones older than the newest held, match a full load.
+    """
+    store = ColumnStore(EnergyGeneration)
+    await store.load()
+    records = [
+        to_record(EnergyGeneration, {
+            "timestamp": timestamp, "energy_kwh": 3.0, "source": "Solar",
+            "location": test_location, "system_id": "SYS-TEST-MERGE",
+        })
+        for timestamp in ("2030-01-07T00:00:00", "2024-01-01T12:00:00")
+    ]
+    async with engine.begin() as conn:
+        await insert_records(conn, EnergyGeneration, records)
+
+    merged, full = ColumnStore(EnergyGeneration), ColumnStore(EnergyGeneration)
+    assert await merged.load(store) == 2
+    await full.load()
+
+    args = ("energy_kwh", "month", "sum", "location", None, None)
+    assert merged.high_water == full.high_water > store.high_water
+    assert bool(np.all(merged.timestamps[1:] >= merged.timestamps[:-1]))
+    actual, expected = merged.series(*args), full.series(*args)
+    assert [(bucket, key) for bucket, key, _ in actual] == [(bucket, key) for bucket, key, _ in expected]
+    assert [value for _, _, value in actual] == pytest.approx([value for _, _, value in expected])
+    assert (datetime(2024, 1, 1), test_location, 3.0) in actual
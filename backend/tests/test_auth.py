@@ -2,6 +2,8 @@ import uuid
 
 import pytest
 
+from app.core import security
+
 
 @pytest.mark.asyncio
 async def test_register_user(async_client):
@@ -56,3 +58,23 @@ async def test_login_failure(async_client):
     data = response.json()
     assert "detail" in data
     assert "invalid credentials" in data["detail"].lower()
+
+
+def test_token_cache_never_serves_expired_tokens(monkeypatch):
+    """
+    Test cached payloads are returned until their exp claim and evicted in LRU order.
+    """
+    now = 1_000_000.0
+    monkeypatch.setattr(security.time, "time", lambda: now)
+    cache = security.TokenCache(max_entries=2)
+
+    cache.put("a", {"sub": "a", "exp": now + 60})
+    cache.put("b", {"sub": "b", "exp": now + 1})
+    assert cache.get("a") == {"sub": "a", "exp": now + 60}
+    cache.put("c", {"sub": "c", "exp": now + 120})
+    assert cache.get("b") is None
+
+    now += 60
+    assert cache.get("a") is None
+    assert cache.get("c") == {"sub": "c", "exp": now + 60}
+    assert cache.stats() == {"entries": 1, "hits": 2, "misses": 2, "hit_rate": 0.5}
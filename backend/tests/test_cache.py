@@ -0,0 +1,99 @@
+import pytest
+
+from app.core.cache import CachedResponse, ResponseCache, data_version
+from app.core.database import engine
+from app.core.ingest import insert_records, to_record
+from app.models.energy_consumption import EnergyConsumption
+from app.models.energy_generation import EnergyGeneration
+
+
+def test_response_cache_evicts_lru_and_invalidates_on_version(monkeypatch):
+    """
+    Test entries are evicted least-recently-used under the byte budget and dropped when the data version moves.
+    """
+    cache = ResponseCache(max_bytes=250, ttl=60)
+    for key in ("a", "b"):
+        cache.put(key, CachedResponse(b"x" * 100, {}, "application/json", data_version.value, 60))
+    cache.get("a")
+    cache.put("c", CachedResponse(b"x" * 100, {}, "application/json", data_version.value, 60))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    monkeypatch.setattr(data_version, "value", (*data_version.value, 1))
+
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_series_cache_hit_and_conditional_request(async_client, auth_headers):
+    """
+    Test a repeated series request is served from cache, compressed, and revalidated with 304.
+    """
+    params = {"bucket": "month", "group_by": "system_id", "from": "2023-06-01T00:00:00"}
+    headers = {**auth_headers, "Accept-Encoding": "gzip"}
+
+    first = await async_client.get("/energy/generation/series", params=params, headers=headers)
+    second = await async_client.get("/energy/generation/series", params=params, headers=headers)
+    revalidated = await async_client.get(
+        "/energy/generation/series", params=params, headers={**headers, "If-None-Match": first.headers["etag"]}
+    )
+
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+    assert second.headers["content-encoding"] == "gzip"
+    assert second.json() == first.json()
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+
+@pytest.mark.asyncio
+async def test_rows_committed_by_another_process_invalidate_cache(async_client, auth_headers, test_location, monkeypatch):
+    """
+    Test rows committed outside this process's ingest invalidate cached responses once the version is re-read.
+    """
+    monkeypatch.setattr(data_version, "ttl", 60)
+    params = {"location": test_location}
+    first = await async_client.get("/energy/generation", params=params, headers=auth_headers)
+
+    # What another worker's ingest would commit; this process is not told about it
+    record = to_record(EnergyGeneration, {
+        "timestamp": "2030-01-04T00:00:00", "energy_kwh": 1.0, "source": "Solar",
+        "location": test_location, "system_id": "SYS-TEST-ELSEWHERE",
+    })
+    async with engine.begin() as conn:
+        await insert_records(conn, EnergyGeneration, [record])
+
+    cached = await async_client.get("/energy/generation", params=params, headers=auth_headers)
+    monkeypatch.setattr(data_version, "_fresh_until", 0.0)
+    reread = await async_client.get("/energy/generation", params=params, headers=auth_headers)
+
+    assert first.json() == cached.json() == []
+    assert cached.headers["x-cache"] == "HIT"
+    assert reread.headers["x-cache"] == "MISS"
+    assert [row["system_id"] for row in reread.json()] == ["SYS-TEST-ELSEWHERE"]
+
+
+@pytest.mark.asyncio
+async def test_version_moves_when_tables_commit_out_of_sequence_order(test_location):
+    """
+    Test a generation batch committed after a consumption batch that drew a higher `ingest_seq` still moves the version.
+    """
+    generation = to_record(EnergyGeneration, {
+        "timestamp": "2030-01-06T00:00:00", "energy_kwh": 1.0, "source": "Solar",
+        "location": test_location, "system_id": "SYS-TEST-ORDER",
+    })
+    consumption = to_record(EnergyConsumption, {
+        "timestamp": "2030-01-06T00:00:00", "energy_kwh": 1.0, "location": test_location,
+        "sector": "residential", "consumer_id": "CON-TEST-ORDER", "price": 0.2, "total": 0.2,
+    })
+
+    async with engine.connect() as slow:
+        async with slow.begin():
+            await insert_records(slow, EnergyGeneration, [generation])
+            async with engine.begin() as fast:
+                await insert_records(fast, EnergyConsumption, [consumption])
+            after_consumption = await data_version.refresh()
+        after_generation = await data_version.refresh()
+
+    assert after_generation != after_consumption
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import select
+
+from app.config import config
+from app.core.compact_schema import _bulk_insert_sql, copy_records, is_compact, managed_tables
+from app.core.database import engine
+from app.core.ingest import to_record
+from app.models.base import Base, record_columns
+from app.models.energy_generation import EnergyGeneration
+
+
+def test_managed_tables_leave_energy_tables_to_compact_views(monkeypatch):
+    """
+    Test create_all skips the energy tables only in compact mode.
+    """
+    monkeypatch.setattr(config, "ENERGY_SCHEMA_MODE", "standard")
+    assert "energy_generation" in {table.name for table in managed_tables(Base.metadata)}
+
+    monkeypatch.setattr(config, "ENERGY_SCHEMA_MODE", "compact")
+    names = {table.name for table in managed_tables(Base.metadata)}
+    assert "energy_generation" not in names and "energy_consumption" not in names
+    assert "users" in names
+
+
+def test_bulk_insert_resolves_every_dimension():
+    """
+    Test the staged insert adds missing dimension values and joins each one into the facts.
+    """
+    statements = _bulk_insert_sql(EnergyGeneration, "staging")
+
+    assert len(statements) == 4
+    assert all("NOT EXISTS" in statement for statement in statements[:3])
+    facts = statements[-1]
+    assert facts.startswith("INSERT INTO energy_generation_facts (id, timestamp, energy_kwh, source_id")
+    assert "s.id::uuid" in facts
+    for dim in ("system", "location", "source"):
+        assert f"JOIN energy_dim_{dim} d_{dim} ON" in facts
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not is_compact(), reason="only the compact bulk insert skips existing ids")
+async def test_copy_reports_only_the_records_it_inserted(test_location):
+    """
+    Test records whose id is already stored, or repeated in the batch, are left out of the inserted ones.
+    """
+    new = to_record(EnergyGeneration, {
+        "timestamp": "2030-01-08T00:00:00", "energy_kwh": 1.0, "source": "Solar",
+        "location": test_location, "system_id": "SYS-TEST-COPY",
+    })
+    async with engine.connect() as conn:
+        result = await conn.execute(select(*record_columns(EnergyGeneration)).limit(1))
+        existing = tuple(result.one())
+        await conn.rollback()
+        driver = (await conn.get_raw_connection()).driver_connection
+        transaction = await conn.begin()
+        inserted = await copy_records(conn, driver, EnergyGeneration, [existing, new, new])
+        await transaction.rollback()
+
+    assert inserted == [new]
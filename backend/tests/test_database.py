@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.compact_schema import is_compact
+from app.core.database import ReadSessionLocal, engine
+from app.core.migrations import ENERGY_MODELS, INGEST_SEQ_INDEXES, TIME_INDEXES, run_migrations
+from app.core.partitions import ensure_monthly_partitions
+
+
+@pytest.mark.asyncio
+async def test_read_sessions_are_read_only():
+    """
+    Test the read pool serves queries but refuses writes.
+    """
+    async with ReadSessionLocal() as session:
+        assert (await session.execute(text("SELECT count(*) FROM users"))).scalar_one() >= 1
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            await session.execute(text("UPDATE users SET email = email"))
+
+
+@pytest.mark.asyncio
+async def test_new_partition_takes_over_default_rows():
+    """
+    Test a month added after rows landed in the DEFAULT partition moves those rows into it.
+    """
+    async with engine.connect() as conn:
+        await conn.execute(text(
+            "CREATE TABLE test_readings (id VARCHAR, timestamp TIMESTAMP, PRIMARY KEY (id, timestamp)) "
+            "PARTITION BY RANGE (timestamp)"
+        ))
+        await ensure_monthly_partitions(conn, "test_readings", date(2030, 1, 1), date(2030, 1, 1))
+        await conn.execute(text("INSERT INTO test_readings VALUES ('a', '2030-01-31'), ('b', '2030-02-14')"))
+
+        assert await ensure_monthly_partitions(conn, "test_readings", date(2030, 1, 1), date(2030, 2, 1)) == 1
+        placed = await conn.execute(text("SELECT id, tableoid::regclass::text FROM test_readings ORDER BY id"))
+        assert placed.all() == [("a", "test_readings_p2030_01"), ("b", "test_readings_p2030_02")]
+        await conn.rollback()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(is_compact(), reason="the compact schema indexes its fact tables itself")
+async def test_migrations_upgrade_tables_from_before_the_ingest_sequence():
+    """
+    Test migrations 1 and 4 apply in order to tables that have no `ingest_seq` column yet.
+    """
+    async with engine.connect() as conn:
+        for model in ENERGY_MODELS:
+            await conn.execute(text(f"ALTER TABLE {model.__tablename__} DROP COLUMN ingest_seq"))
+        for name in TIME_INDEXES:
+            await conn.execute(text(f"DROP INDEX {name}"))
+        await conn.execute(text("DELETE FROM schema_migrations WHERE version IN (1, 4)"))
+
+        assert await run_migrations(conn) == [1, 4]
+        result = await conn.execute(text("SELECT indexname FROM pg_indexes WHERE indexname LIKE 'ix_energy_%'"))
+        assert set(TIME_INDEXES + INGEST_SEQ_INDEXES) <= set(result.scalars().all())
+        await conn.rollback()
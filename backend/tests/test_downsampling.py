@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.core.downsampling import downsample_series, lttb, minmax
+
+
+def test_lttb_keeps_endpoints_and_spike():
+    """
+    Test LTTB returns the requested count, the first and last points and an isolated spike.
+    """
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[500] = 10.0
+
+    kept = lttb(x, y, 50)
+
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 999 and 500 in kept
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_minmax_keeps_each_bucket_envelope():
+    """
+    Test the min/max envelope keeps the extremes of every bucket.
+    """
+    rng = np.random.default_rng(7)
+    y = rng.normal(size=1000)
+
+    kept = minmax(np.arange(1000, dtype=float), y, 20)
+
+    for lo in range(0, 1000, 100):
+        bucket = kept[(kept >= lo) & (kept < lo + 100)]
+        assert y[bucket].min() == y[lo:lo + 100].min() and y[bucket].max() == y[lo:lo + 100].max()
+
+
+def test_downsample_series_applies_budget_per_key():
+    """
+    Test each keyed series is reduced separately and rows stay in bucket order.
+    """
+    start = datetime(2024, 1, 1)
+    rows = [(start + timedelta(days=d), key, float(d % 7)) for d in range(365) for key in ("UK", "USA")]
+
+    kept = downsample_series(rows, 30, "lttb")
+
+    assert sum(1 for row in kept if row[1] == "UK") == 30
+    assert sum(1 for row in kept if row[1] == "USA") == 30
+    assert kept == sorted(kept, key=lambda row: (row[0], row[1]))
+
+
+@pytest.mark.asyncio
+async def test_series_endpoint_downsamples(async_client, auth_headers):
+    """
+    Test `points` caps the generation series per location.
+    """
+    params = {"bucket": "day", "group_by": "location", "points": 40, "method": "minmax"}
+
+    response = await async_client.get("/energy/generation/series", params=params, headers=auth_headers)
+
+    assert response.status_code == 200
+    per_key = {}
+    for point in response.json():
+        per_key[point["key"]] = per_key.get(point["key"], 0) + 1
+    assert per_key and max(per_key.values()) <= 40
@@ -0,0 +1,256 @@
+import csv
+import io
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_generation_series_requires_auth(async_client):
+    """
+    Test the series endpoint rejects anonymous requests.
+    """
+    response = await async_client.get("/energy/generation/series")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_generation_series_monthly_grouped(async_client, auth_headers):
+    """
+    Test monthly generation buckets split by location within a date range.
+    """
+    params = {
+        "bucket": "month",
+        "from": "2024-01-01T00:00:00",
+        "to": "2024-04-01T00:00:00",
+        "group_by": "location",
+    }
+
+    response = await async_client.get("/energy/generation/series", params=params, headers=auth_headers)
+
+    assert response.status_code == 200
+    points = response.json()
+    assert {p["bucket"][:7] for p in points} == {"2024-01", "2024-02", "2024-03"}
+    assert all(p["key"] and p["value"] > 0 for p in points)
+
+
+@pytest.mark.asyncio
+async def test_consumption_series_matches_day_totals(async_client, auth_headers):
+    """
+    Test daily consumption sums agree with the per-sector split of the same day.
+    """
+    params = {"bucket": "day", "from": "2024-06-01T00:00:00", "to": "2024-06-02T00:00:00"}
+
+    total = await async_client.get("/energy/consumption/series", params=params, headers=auth_headers)
+    split = await async_client.get(
+        "/energy/consumption/series", params={**params, "group_by": "sector"}, headers=auth_headers
+    )
+
+    assert total.status_code == split.status_code == 200
+    assert len(total.json()) == 1
+    assert total.json()[0]["value"] == pytest.approx(sum(p["value"] for p in split.json()))
+
+
+@pytest.mark.asyncio
+async def test_timezone_aware_bounds_are_read_as_utc(async_client, auth_headers):
+    """
+    Test `from`/`to` with an offset select the same rows as the equivalent naive UTC bounds.
+    """
+    naive = {"from": "2024-06-01T00:00:00", "to": "2024-06-02T00:00:00"}
+    aware = {"from": "2024-06-01T00:00:00Z", "to": "2024-06-02T02:00:00+02:00"}
+
+    for path in ("/energy/generation/series", "/energy/balance", "/energy/consumption"):
+        expected = await async_client.get(path, params=naive, headers=auth_headers)
+        response = await async_client.get(path, params=aware, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json() == expected.json()
+
+
+@pytest.mark.asyncio
+async def test_generation_keyset_pages_cover_range(async_client, auth_headers):
+    """
+    Test following X-Next-Cursor walks a filtered range without gaps or repeats.
+    """
+    params = {"from": "2024-03-01T00:00:00", "to": "2024-03-08T00:00:00", "location": "UK", "limit": 10}
+
+    full = await async_client.get("/energy/generation", params={**params, "limit": 1000}, headers=auth_headers)
+    expected = [row["id"] for row in full.json()]
+
+    seen = []
+    cursor = None
+    while True:
+        page_params = {**params, "after": cursor} if cursor else params
+        response = await async_client.get("/energy/generation", params=page_params, headers=auth_headers)
+        assert response.status_code == 200
+        seen.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(expected) == 35
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_consumption_rejects_invalid_cursor(async_client, auth_headers):
+    """
+    Test a malformed cursor is reported as a bad request.
+    """
+    response = await async_client.get("/energy/consumption", params={"after": "not-a-cursor"}, headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_generation_streams_ndjson(async_client, auth_headers):
+    """
+    Test Accept: application/x-ndjson streams every matching row, past the default page size.
+    """
+    headers = {**auth_headers, "Accept": "application/x-ndjson"}
+
+    response = await async_client.get("/energy/generation", params={"location": "USA"}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) > 1000
+    assert {row["location"] for row in rows} == {"USA"}
+    assert [row["timestamp"] for row in rows] == sorted(row["timestamp"] for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_consumption_streams_csv(async_client, auth_headers):
+    """
+    Test Accept: text/csv streams a header line followed by the requested rows.
+    """
+    headers = {**auth_headers, "Accept": "text/csv"}
+    params = {"from": "2024-01-01T00:00:00", "to": "2024-01-02T00:00:00"}
+
+    response = await async_client.get("/energy/consumption", params=params, headers=headers)
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 11
+    assert set(rows[0]) == {"id", "timestamp", "energy_kwh", "location", "sector", "consumer_id", "price", "total"}
+
+
+@pytest.mark.asyncio
+async def test_consumption_streams_arrow_ipc(async_client, auth_headers):
+    """
+    Test the Arrow IPC stream decodes with float buffers and dictionary-encoded dimensions.
+    """
+    headers = {**auth_headers, "Accept": "application/vnd.apache.arrow.stream"}
+    params = {"from": "2024-01-01T00:00:00", "to": "2024-02-01T00:00:00"}
+
+    response = await async_client.get("/energy/consumption", params=params, headers=headers)
+
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 11 * 31
+    assert table.schema.field("total").type == pa.float64()
+    assert pa.types.is_dictionary(table.schema.field("sector").type)
+
+
+@pytest.mark.asyncio
+async def test_generation_streams_parquet(async_client, auth_headers):
+    """
+    Test the Parquet stream is a complete file matching the JSON listing.
+    """
+    params = {"from": "2024-01-01T00:00:00", "to": "2024-01-03T00:00:00"}
+    headers = {**auth_headers, "Accept": "application/vnd.apache.parquet"}
+
+    response = await async_client.get("/energy/generation", params=params, headers=headers)
+    listing = await async_client.get("/energy/generation", params=params, headers=auth_headers)
+
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("id").to_pylist() == [row["id"] for row in listing.json()]
+
+
+@pytest.mark.asyncio
+async def test_series_from_rollups_matches_raw(async_client, auth_headers):
+    """
+    Test day-aligned ranges served from rollups agree with the raw-table aggregation.
+
+    A `from` one second past midnight selects the same readings but is not
+    day-aligned, so it forces the raw path.
+    """
+    params = {"bucket": "week", "to": "2024-03-01T00:00:00", "group_by": "sector", "aggregate": "avg"}
+
+    rollup = await async_client.get(
+        "/energy/consumption/series", params={**params, "from": "2024-01-01T00:00:00"}, headers=auth_headers
+    )
+    raw = await async_client.get(
+        "/energy/consumption/series", params={**params, "from": "2024-01-01T00:00:01"}, headers=auth_headers
+    )
+
+    assert rollup.status_code == raw.status_code == 200
+    assert [(p["bucket"], p["key"]) for p in rollup.json()] == [(p["bucket"], p["key"]) for p in raw.json()]
+    for a, b in zip(rollup.json(), raw.json()):
+        assert a["value"] == pytest.approx(b["value"])
+
+
+@pytest.mark.asyncio
+async def test_balance_nets_city_consumption_per_country(async_client, auth_headers):
+    """
+    Test the balance rolls city consumption up to its country and nets it against generation.
+    """
+    params = {"bucket": "day", "from": "2024-06-01T00:00:00", "to": "2024-06-02T00:00:00"}
+
+    balance = await async_client.get("/energy/balance", params={**params, "country": "UK"}, headers=auth_headers)
+    generation = await async_client.get(
+        "/energy/generation/series", params={**params, "location": "UK"}, headers=auth_headers
+    )
+    consumption = await async_client.get(
+        "/energy/consumption/series", params={**params, "location": ["London", "Manchester"]}, headers=auth_headers
+    )
+
+    assert balance.status_code == 200
+    [point] = balance.json()
+    assert point["country"] == "UK"
+    assert point["generation_kwh"] == pytest.approx(generation.json()[0]["value"])
+    assert point["consumption_kwh"] == pytest.approx(consumption.json()[0]["value"])
+    assert point["net_kwh"] == pytest.approx(point["generation_kwh"] - point["consumption_kwh"])
+
+
+@pytest.mark.asyncio
+async def test_system_stats_rank_within_source(async_client, auth_headers):
+    """
+    Test system statistics rank configured systems by mean daily output within their source.
+    """
+    response = await async_client.get("/energy/systems/stats", params={"source": "wind"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert {row["source"] for row in stats} == {"wind"}
+    assert [row["rank_in_source"] for row in stats] == list(range(1, len(stats) + 1))
+    means = [row["mean_daily_kwh"] for row in stats]
+    assert means == sorted(means, reverse=True)
+    uk = next(row for row in stats if row["system_id"] == "SYS-UK-WIND-1")
+    assert uk["capacity_kwh_per_day"] == 90
+    assert uk["p5_daily_kwh"] <= uk["p50_daily_kwh"] <= uk["p95_daily_kwh"]
+    assert uk["trend_kwh_per_month"] > 0
+
+
+@pytest.mark.asyncio
+async def test_forecast_projects_each_series(async_client, auth_headers):
+    """
+    Test forecasts cover the requested days for every series, inside their intervals.
+    """
+    params = {"dataset": "consumption", "group_by": "location", "key": ["London", "Sydney"], "days": 14}
+
+    response = await async_client.get("/energy/forecast", params=params, headers=auth_headers)
+    invalid = await async_client.get(
+        "/energy/forecast", params={"dataset": "consumption", "group_by": "source"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    points = response.json()
+    assert sorted({p["key"] for p in points}) == ["London", "Sydney"]
+    assert len(points) == 28
+    assert all(0 <= p["lower"] <= p["forecast"] <= p["upper"] for p in points)
+    assert invalid.status_code == 400
@@ -0,0 +1,112 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import uuid
+
+import pytest
+
+from app.core.exports import ExportManager
+from app.schemas.energy import EnergyExportCreate
+
+
+async def wait_for_export(async_client, auth_headers, job_id: str) -> dict:
+    for _ in range(200):
+        job = (await async_client.get(f"/energy/exports/{job_id}", headers=auth_headers)).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"export {job_id} did not finish")
+
+
+@pytest.mark.asyncio
+async def test_export_runs_in_background_and_resumes_with_range(async_client, auth_headers, test_location):
+    """
+    Test an export is deduplicated, finishes with all matching rows and serves byte ranges.
+    """
+    system = f"SYS-TEST-{uuid.uuid4()}"
+    body = "\n".join(
+        json.dumps({"timestamp": f"2030-02-01T{hour:02d}:00:00", "energy_kwh": hour, "source": "Wind",
+                    "location": test_location, "system_id": system})
+        for hour in range(24)
+    )
+    await async_client.post(
+        "/energy/generation/batch", content=body, headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    export = {"dataset": "generation", "format": "csv", "system_id": [system]}
+
+    created = await async_client.post("/energy/exports", json=export, headers=auth_headers)
+    again = await async_client.post("/energy/exports", json=export, headers=auth_headers)
+    job = await wait_for_export(async_client, auth_headers, created.json()["id"])
+
+    assert created.status_code == 202
+    assert again.json()["id"] == created.json()["id"]
+    assert (job["status"], job["rows"], job["total_rows"], job["progress"]) == ("done", 24, 24, 1.0)
+
+    full = await async_client.get(job["download_url"], headers=auth_headers)
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(full.content).decode())))
+    assert [row["energy_kwh"] for row in rows] == [str(float(hour)) for hour in range(24)]
+    assert len(full.content) == job["bytes"]
+
+    resumed = await async_client.get(job["download_url"], headers={**auth_headers, "Range": "bytes=100-"})
+    assert resumed.status_code == 206
+    assert resumed.content == full.content[100:]
+
+
+@pytest.mark.asyncio
+async def test_export_rejects_filters_of_other_dataset(async_client, auth_headers):
+    """
+    Test dimension filters must belong to the exported dataset.
+    """
+    response = await async_client.post(
+        "/energy/exports", json={"dataset": "consumption", "source": ["Solar"]}, headers=auth_headers,
+    )
+    missing = await async_client.get("/energy/exports/unknown", headers=auth_headers)
+
+    assert response.status_code == 422
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_expired_exports_are_removed(tmp_path):
+    """
+    Test finished exports past their retention lose both their job and their file, and stray
+    export files are removed while unrelated files are kept.
+    """
+    manager = ExportManager(str(tmp_path), workers=1, max_queued=4, retention=0)
+    job = manager.submit(EnergyExportCreate(dataset="generation", format="parquet", system_id=["SYS-NONE"]))
+    for _ in range(200):
+        if job.status in ("done", "failed"):
+            break
+        await asyncio.sleep(0.05)
+    assert job.status == "done" and os.path.exists(job.path)
+    (tmp_path / f"{uuid.uuid4().hex}.csv.gz.part").write_bytes(b"")
+    (tmp_path / "notes.csv.gz").write_bytes(b"")
+
+    assert manager.cleanup() == 1
+    await manager.stop()
+
+    assert manager.get(job.id) is None
+    assert os.listdir(tmp_path) == ["notes.csv.gz"]
+
+
+@pytest.mark.asyncio
+async def test_exports_cancelled_by_shutdown_count_as_failed(tmp_path):
+    """
+    Test an export still running when the manager stops is reported, and counted, as failed.
+    """
+    manager = ExportManager(str(tmp_path), workers=1, max_queued=4, retention=0)
+    await manager.start()
+    job = manager.submit(EnergyExportCreate(dataset="generation", format="csv"))
+    for _ in range(200):
+        if job.status != "queued":
+            break
+        await asyncio.sleep(0.01)
+
+    await manager.stop()
+
+    assert (job.status, job.error) == ("failed", "cancelled")
+    assert manager.stats()["failed"] == 1
+    assert os.listdir(tmp_path) == []
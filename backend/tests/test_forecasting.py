@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+
+from app.core.cache import data_version
+from app.core.forecasting import SEASON, Forecaster, daily_series, fit_holt_winters, project
+
+
+def test_holt_winters_recovers_trend_and_season():
+    """
+    Test a noiseless trend plus weekly pattern is projected forward exactly.
+    """
+    t = np.arange(140 + 14)
+    pattern = np.array([5.0, 0.0, -3.0, 2.0, 1.0, -4.0, -1.0])
+    series = 100 + 0.5 * t + pattern[t % SEASON]
+
+    fit = fit_holt_winters(series[None, :140])
+    mean, lower, upper = project(fit, 14, 0.95)
+
+    assert np.allclose(fit["trend"], 0.5)
+    assert np.allclose(mean[0], series[140:])
+    assert np.all(lower <= mean) and np.all(mean <= upper)
+
+
+def test_prediction_interval_widens_with_horizon():
+    """
+    Test intervals grow with the horizon and cover most noisy future values.
+    """
+    rng = np.random.default_rng(11)
+    t = np.arange(365 + 30)
+    series = 50 + 0.1 * t + rng.normal(0, 5, (40, len(t)))
+
+    fit = fit_holt_winters(series[:, :365])
+    mean, lower, upper = project(fit, 30, 0.9)
+
+    width = upper - lower
+    assert np.all(width[:, -1] > width[:, 0])
+    covered = ((series[:, 365:] >= lower) & (series[:, 365:] <= upper)).mean()
+    assert 0.8 < covered <= 1.0
+
+
+def test_daily_series_fill_gaps_and_trim_history_per_key():
+    """
+    Test missing days carry the previous value and each key keeps its own window, ending on its own last day.
+    """
+    start = datetime(2024, 1, 1)
+    rows = [(start + timedelta(days=d), "a", float(d)) for d in range(10) if d != 7]
+    rows += [(start + timedelta(days=d), "b", float(d)) for d in range(5, 10)]
+    rows += [(start + timedelta(days=d), "c", 1.0) for d in range(400, 404)]
+
+    series = daily_series(rows, history_days=8)
+
+    assert list(series) == ["a", "b", "c"]
+    assert series["a"][0] == start + timedelta(days=2)
+    assert series["a"][1].tolist() == [2, 3, 4, 5, 6, 6, 8, 9]
+    # Starts on its own first day rather than being back-filled to the others' window
+    assert series["b"][0] == start + timedelta(days=5)
+    assert series["b"][1].tolist() == [5, 6, 7, 8, 9]
+    assert series["c"][0] == start + timedelta(days=400)
+    assert series["c"][1].tolist() == [1.0] * 4
+
+
+@pytest.mark.asyncio
+async def test_series_running_ahead_do_not_push_out_the_others(monkeypatch):
+    """
+    Test every key is forecast from its own last day, even when another key's data runs years further.
+    """
+    # Starting the worker can outlast the version's TTL; the cache hit below needs it unchanged
+    monkeypatch.setattr(data_version, "ttl", 60)
+    await data_version.refresh()
+    forecaster = Forecaster(workers=1, max_entries=10, history_days=56)
+    early, late = datetime(2024, 1, 1), datetime(2030, 1, 1)
+    rows = [(early + timedelta(days=d), "early", 10.0 + d % SEASON) for d in range(60)]
+    rows += [(late + timedelta(days=d), "late", 5.0) for d in range(20)]
+    try:
+        points = await forecaster.forecast("test:location", rows, 2, 0.9)
+        again = await forecaster.forecast("test:location", rows[:60], 2, 0.9)
+    finally:
+        await forecaster.stop()
+
+    assert [(key, day) for key, day, *_ in points] == [
+        ("early", early + timedelta(days=60)), ("early", early + timedelta(days=61)),
+        ("late", late + timedelta(days=20)), ("late", late + timedelta(days=21)),
+    ]
+    assert again == points[:2]
+    assert forecaster.stats() == {"cached_fits": 2, "fits": 2, "hits": 1}
+
+
+@pytest.mark.asyncio
+async def test_cached_fits_evicted_during_a_fit_are_still_used(monkeypatch):
+    """
+    Test a request whose cached fits are evicted by another request while it waits on the pool still completes.
+    """
+    forecaster = Forecaster(workers=1, max_entries=10, history_days=28)
+    start = datetime(2024, 1, 1)
+    cached = [(start + timedelta(days=d), "cached", 10.0 + d % SEASON) for d in range(28)]
+    fresh = [(start + timedelta(days=d), "fresh", 20.0 + d % SEASON) for d in range(21)]
+    fit = forecaster._fit
+
+    async def fit_while_evicting(values):
+        forecaster._fits.clear()
+        return await fit(values)
+
+    try:
+        expected = await forecaster.forecast("test:location", cached, 2, 0.9)
+        monkeypatch.setattr(forecaster, "_fit", fit_while_evicting)
+        points = await forecaster.forecast("test:location", cached + fresh, 2, 0.9)
+    finally:
+        await forecaster.stop()
+
+    assert points[:2] == expected
+    assert [key for key, *_ in points[2:]] == ["fresh", "fresh"]
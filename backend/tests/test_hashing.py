@@ -0,0 +1,45 @@
+import asyncio
+import uuid
+
+import bcrypt
+import pytest
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.core.hashing import HashingOverloaded, PasswordHasher, hash_rounds, password_hasher
+from app.models.user import User
+
+
+@pytest.mark.asyncio
+async def test_hasher_rejects_when_queue_is_full():
+    """
+    Test jobs beyond the worker and queue limits are rejected and counted.
+    """
+    hasher = PasswordHasher(rounds=4, max_concurrency=1, max_queue=1)
+
+    results = await asyncio.gather(*(hasher.hash("secret") for _ in range(3)), return_exceptions=True)
+
+    assert sum(isinstance(result, HashingOverloaded) for result in results) == 1
+    hashed = next(result for result in results if isinstance(result, str))
+    assert hash_rounds(hashed) == 4 and await hasher.verify("secret", hashed)
+    stats = hasher.stats()
+    assert (stats["completed"], stats["rejected"], stats["pending"]) == (3, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_outdated_hash(async_client):
+    """
+    Test a successful login rehashes a password stored with a different cost factor.
+    """
+    email = f"user-{uuid.uuid4()}@example.com"
+    async with AsyncSessionLocal() as session:
+        session.add(User(email=email, hashed_password=bcrypt.hashpw(b"oldpass", bcrypt.gensalt(rounds=4)).decode()))
+        await session.commit()
+
+    response = await async_client.post("/auth/login", data={"username": email, "password": "oldpass"})
+
+    assert response.status_code == 200
+    async with AsyncSessionLocal() as session:
+        stored = (await session.execute(select(User.hashed_password).where(User.email == email))).scalar_one()
+    assert hash_rounds(stored) == password_hasher.rounds
+    assert await password_hasher.verify("oldpass", stored)
@@ -0,0 +1,90 @@
+import json
+import uuid
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_generation_batch_ingest_is_idempotent(async_client, auth_headers, test_location):
+    """
+    Test NDJSON rows are accepted once, resent rows count as duplicates and bad rows are rejected.
+    """
+    system = f"SYS-TEST-{uuid.uuid4()}"
+    rows = [
+        {"timestamp": "2030-01-01T00:00:00", "energy_kwh": 1.5, "source": "Solar", "location": test_location, "system_id": system},
+        {"timestamp": "2030-01-01T01:00:00Z", "energy_kwh": 2.5, "source": "Solar", "location": test_location, "system_id": system},
+        {"timestamp": "2030-01-01T02:00:00", "energy_kwh": "lots", "source": "Solar", "location": test_location, "system_id": system},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n{not json\n"
+    headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+
+    first = await async_client.post("/energy/generation/batch", content=body, headers=headers)
+    second = await async_client.post("/energy/generation/batch", content=body, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert {k: first.json()[k] for k in ("accepted", "duplicates", "rejected")} == {"accepted": 2, "duplicates": 0, "rejected": 2}
+    assert {k: second.json()[k] for k in ("accepted", "duplicates", "rejected")} == {"accepted": 0, "duplicates": 2, "rejected": 2}
+    assert [error["line"] for error in first.json()["errors"]] == [3, 4]
+
+    stored = await async_client.get("/energy/generation", params={"system_id": system}, headers=auth_headers)
+    assert [(row["timestamp"], row["energy_kwh"]) for row in stored.json()] == [
+        ("2030-01-01T00:00:00", 1.5),
+        ("2030-01-01T01:00:00", 2.5),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_consumption_batch_ingest_accepts_csv(async_client, auth_headers, test_location):
+    """
+    Test a CSV body with a header row and explicit ids is ingested.
+    """
+    row_id = str(uuid.uuid4())
+    body = (
+        "id,timestamp,energy_kwh,location,sector,consumer_id,price,total\r\n"
+        f"{row_id},2030-01-01T00:00:00,10.0,{test_location},Residential,CON-TEST,0.2,2.0\r\n"
+    )
+    headers = {**auth_headers, "Content-Type": "text/csv"}
+
+    response = await async_client.post("/energy/consumption/batch", content=body, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"accepted": 1, "duplicates": 0, "rejected": 0, "errors": []}
+
+
+@pytest.mark.asyncio
+async def test_batch_ingest_rejects_other_content_types(async_client, auth_headers):
+    """
+    Test bodies that are neither NDJSON nor CSV are refused with 415.
+    """
+    response = await async_client.post("/energy/generation/batch", json=[], headers=auth_headers)
+
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_since_lists_only_rows_ingested_after_high_water_mark(async_client, auth_headers, test_location):
+    """
+    Test `since` returns rows ingested after a listing's high-water mark, which then advances.
+    """
+    system = f"SYS-TEST-{uuid.uuid4()}"
+    headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+
+    def row(hour):
+        return json.dumps({
+            "timestamp": f"2030-01-03T0{hour}:00:00", "energy_kwh": 1.0, "source": "Solar",
+            "location": test_location, "system_id": system,
+        })
+
+    await async_client.post("/energy/generation/batch", content=row(0), headers=headers)
+    before = await async_client.get("/energy/generation", params={"system_id": system}, headers=auth_headers)
+    mark = int(before.headers["x-high-water-mark"])
+    await async_client.post("/energy/generation/batch", content=row(1) + "\n" + row(2), headers=headers)
+
+    delta = await async_client.get("/energy/generation", params={"since": mark}, headers=auth_headers)
+    new_mark = int(delta.headers["x-high-water-mark"])
+    caught_up = await async_client.get("/energy/generation", params={"since": new_mark}, headers=auth_headers)
+
+    assert len(before.json()) == 1
+    assert [r["timestamp"] for r in delta.json() if r["system_id"] == system] == ["2030-01-03T01:00:00", "2030-01-03T02:00:00"]
+    assert new_mark > mark
+    assert caught_up.json() == []
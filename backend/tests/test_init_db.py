@@ -0,0 +1,12 @@
+from app.core.init_db import GEN_CSV, read_csv_chunks
+from app.models.energy_generation import EnergyGeneration
+
+
+def test_csv_chunks_resume_after_committed_rows():
+    """
+    Test reading with `skip` continues exactly where the committed chunks stopped.
+    """
+    full = [record for chunk in read_csv_chunks(GEN_CSV, EnergyGeneration, 1000) for record in chunk]
+    resumed = [record for chunk in read_csv_chunks(GEN_CSV, EnergyGeneration, 1000, skip=3000) for record in chunk]
+
+    assert resumed == full[3000:]
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import config
+from app.core.cache import data_version
+from app.core.live import RESYNC_EVENT, LiveBroadcaster, live
+from app.core.security import create_access_token
+from app.models.energy_generation import EnergyGeneration
+
+
+def parse_event(event: bytes) -> tuple[str, dict]:
+    fields = dict(line.split(": ", 1) for line in event.decode().strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+@pytest.mark.asyncio
+async def test_bursts_are_coalesced_and_slow_clients_resync():
+    """
+    Test rows published within one window become one event, and a full queue is replaced by a resync.
+    """
+    broadcaster = LiveBroadcaster(window=0.01, max_queued=2, max_readings=1)
+    fast, slow = broadcaster.subscribe("fast"), broadcaster.subscribe("slow")
+    day = datetime(2030, 1, 1)
+    for hour in range(3):
+        broadcaster.publish(EnergyGeneration, [(f"id-{hour}", day.replace(hour=hour), 1.0, "Solar", "Testland", "SYS-1")])
+
+    event, data = parse_event(await asyncio.wait_for(fast.queue.get(), 1))
+    assert event == "update"
+    assert data["generation"]["count"] == 3
+    assert [row["id"] for row in data["generation"]["readings"]] == ["id-2"]
+    assert data["generation"]["totals"] == [{"bucket": "2030-01-01T00:00:00", "key": "Solar", "value": 3.0}]
+
+    for _ in range(2):
+        broadcaster.publish(EnergyGeneration, [("id-x", day, 1.0, "Solar", "Testland", "SYS-1")])
+        broadcaster.flush()
+    assert slow.queue.qsize() == 1 and slow.queue.get_nowait() == RESYNC_EVENT
+    assert fast.queue.qsize() == 2
+    assert broadcaster.stats() == {"subscribers": 2, "events": 3, "resyncs": 1}
+
+
+@pytest.mark.asyncio
+async def test_live_requires_token(async_client):
+    """
+    Test the live stream rejects clients without a token, whether in the header or the query string.
+    """
+    missing = await async_client.get("/energy/live")
+    invalid = await async_client.get("/energy/live", params={"token": "not-a-token"})
+
+    assert missing.status_code == invalid.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_live_stream_closes_when_token_expires(async_client):
+    """
+    Test the stream opened with a query-string token ends once that token expires.
+    """
+    token = create_access_token({"sub": "demo@example.com"}, expires_delta=timedelta(seconds=2))
+
+    response = await asyncio.wait_for(async_client.get("/energy/live", params={"token": token}), 5)
+
+    assert response.status_code == 200
+    assert parse_event(response.content.split(b"\n\n")[0])[0] == "ready"
+
+
+@pytest.mark.asyncio
+async def test_ingested_rows_are_pushed_to_subscribers(async_client, auth_headers, test_location, monkeypatch):
+    """
+    Test each committed ingest batch reaches live subscribers with a data version that already includes it.
+    """
+    monkeypatch.setattr(config, "INGEST_BATCH_SIZE", 1)
+    monkeypatch.setattr(live, "window", 0)
+    system = f"SYS-TEST-{uuid.uuid4()}"
+    body = "\n".join(
+        json.dumps({"timestamp": f"2030-01-02T0{hour}:00:00", "energy_kwh": 4.0, "source": "Wind",
+                    "location": test_location, "system_id": system})
+        for hour in range(2)
+    )
+    before = await data_version.refresh()
+    subscriber = live.subscribe("test")
+    try:
+        response = await async_client.post(
+            "/energy/generation/batch", content=body, headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        )
+        events = [parse_event(await asyncio.wait_for(subscriber.queue.get(), 2)) for _ in range(2)]
+    finally:
+        live.unsubscribe(subscriber)
+
+    assert response.json()["accepted"] == 2
+    assert [event for event, _ in events] == ["update", "update"]
+    assert [[reading["system_id"] for reading in data["generation"]["readings"]] for _, data in events] == [[system]] * 2
+    # The first update is sent while the second batch is still being written
+    assert list(before) < events[0][1]["version"] < events[1][1]["version"] == list(data_version.value)
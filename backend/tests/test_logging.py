@@ -0,0 +1,44 @@
+import json
+import logging
+
+from app.core.logger import JsonFormatter, SamplingFilter, _sampling_rate, parse_sampling
+
+
+def _record(level: int, msg: str, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("app.routes.energy", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_message_and_extra_fields():
+    """
+    Test %-style arguments are merged and `extra=` fields become JSON keys.
+    """
+    line = JsonFormatter().format(_record(logging.INFO, "%d rows from %s", 5, "generation", route="/energy"))
+
+    entry = json.loads(line)
+    assert entry["message"] == "5 rows from generation"
+    assert (entry["level"], entry["logger"], entry["route"]) == ("INFO", "app.routes.energy", "/energy")
+
+
+def test_sampling_keeps_fraction_of_info_and_all_warnings():
+    """
+    Test a 0.25 sampling rate keeps exactly one INFO record in four, and every warning.
+    """
+    sampler = SamplingFilter(0.25)
+
+    kept = sum(sampler.filter(_record(logging.INFO, "tick")) for _ in range(100))
+    assert kept == 25
+    assert all(sampler.filter(_record(logging.WARNING, "slow")) for _ in range(10))
+
+
+def test_sampling_rate_uses_most_specific_prefix():
+    """
+    Test logger names match configured prefixes on dotted boundaries.
+    """
+    rates = parse_sampling("app=0.5, app.routes.energy=0.1,app.core.sec=0")
+
+    assert _sampling_rate("app.routes.energy", rates) == 0.1
+    assert _sampling_rate("app.routes.auth", rates) == 0.5
+    assert _sampling_rate("app.core.security", rates) == 0.5
+    assert _sampling_rate("uvicorn", rates) is None
@@ -0,0 +1,47 @@
+import pytest
+
+from app.core.metrics import Histogram, statement_labels
+
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    Test observations land in cumulative le buckets with matching sum and count.
+    """
+    histogram = Histogram("demo_seconds", "Demo", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "/x")
+
+    lines = histogram.render()
+
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/x",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+    assert 'demo_seconds_sum{route="/x"} 5.55' in lines
+    assert 'demo_seconds_count{route="/x"} 3' in lines
+
+
+def test_statement_labels():
+    """
+    Test SQL statements are labelled by operation and main table.
+    """
+    assert statement_labels('SELECT energy_generation.id FROM energy_generation WHERE x') == ("select", "energy_generation")
+    assert statement_labels("INSERT INTO users (email) VALUES ($1)") == ("insert", "users")
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_routes_and_sql(async_client, auth_headers):
+    """
+    Test /metrics exposes route templates, SQL timings, pool usage and cache stats.
+    """
+    await async_client.get("/energy/generation?limit=5", headers=auth_headers)
+
+    response = await async_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/energy/generation",status="200"}' in body
+    assert 'db_statement_duration_seconds_count{operation="select",table="energy_generation"}' in body
+    assert "db_pool_checkout_seconds_count" in body
+    assert "db_pool_primary_checked_out" in body
+    assert "response_cache_hits" in body and "token_cache_hit_rate" in body
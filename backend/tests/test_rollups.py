@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.database import engine
+from app.core.rollups import check_rollups, rollup_rows
+from app.models.energy_consumption import EnergyConsumption
+
+
+def test_rollup_rows_aggregates_per_granularity():
+    """
+    Test raw records fold into day and month buckets with sum/count/min/max and cost.
+    """
+    records = [
+        ("a", datetime(2024, 5, 1, 23, 59), 10.0, "London", "residential", "CON-1", 0.1, 1.0),
+        ("b", datetime(2024, 5, 1, 23, 59), 30.0, "London", "residential", "CON-2", 0.1, 3.0),
+        ("c", datetime(2024, 5, 2, 23, 59), 20.0, "London", "residential", "CON-1", 0.1, 2.0),
+    ]
+
+    rows = rollup_rows(EnergyConsumption, records)
+
+    by_key = {(row["granularity"], row["bucket"]): row for row in rows}
+    assert len(rows) == 3
+    month = by_key[("month", datetime(2024, 5, 1))]
+    assert (month["readings"], month["energy_kwh_sum"], month["total_sum"]) == (3, 60.0, 6.0)
+    assert (month["energy_kwh_min"], month["energy_kwh_max"]) == (10.0, 30.0)
+    assert by_key[("day", datetime(2024, 5, 1))]["energy_kwh_sum"] == 40.0
+
+
+@pytest.mark.asyncio
+async def test_rollups_consistent_with_raw_data():
+    """
+    Test the stored rollups agree with the raw tables.
+    """
+    async with engine.connect() as conn:
+        problems = await check_rollups(conn)
+
+    assert problems == []
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.core.serialization import encode_records, encode_series, read_fields
+from app.schemas.energy import EnergyConsumptionRead, EnergySeriesPoint
+
+
+def test_encode_records_matches_pydantic_dump():
+    """
+    Test the orjson fast path produces the same bytes as the response schema dump.
+    """
+    fields = read_fields(EnergyConsumptionRead)
+    rows = [
+        (datetime(2024, 1, 1), 48.97, "USA", "Residential", "CON-1", 0.1234, 6.04, "a"),
+        (datetime(2024, 1, 1, 0, 15, 0, 250000), 1e-05, "India", "Commercial", "CON-2", 0.1, 12345678.9, "b"),
+    ]
+
+    adapter = TypeAdapter(List[EnergyConsumptionRead])
+    expected = adapter.dump_json(adapter.validate_python([dict(zip(fields, row)) for row in rows]))
+    assert encode_records(fields, rows) == expected
+
+
+def test_encode_series_always_emits_float_values():
+    """
+    Test integer aggregates such as counts are serialized as floats, like the schema does.
+    """
+    rows = [(datetime(2024, 1, 1), None, 12), (datetime(2024, 1, 2), "USA", 2.5)]
+
+    adapter = TypeAdapter(List[EnergySeriesPoint])
+    expected = adapter.dump_json(adapter.validate_python([dict(zip(("bucket", "key", "value"), r)) for r in rows]))
+    assert encode_series(rows) == expected
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from app.core.sketches import TDigest
+from app.core.system_stats import SystemSketch
+
+
+def test_tdigest_merged_quantiles_match_exact_ranks():
+    """
+    Test digests built on separate parts and merged keep quantile rank errors small.
+    """
+    values = np.random.default_rng(7).exponential(5, 100_000)
+    merged = TDigest()
+    for part in np.array_split(values, 8):
+        digest = TDigest()
+        digest.update(part)
+        merged.merge(digest)
+
+    ordered = np.sort(values)
+    for q in (0.01, 0.05, 0.5, 0.95, 0.99):
+        rank = np.searchsorted(ordered, merged.quantile(q)) / len(ordered)
+        assert abs(rank - q) < 0.005
+    assert merged.count == len(values)
+    assert len(merged) <= 60
+
+
+def test_system_sketch_merge_matches_single_pass():
+    """
+    Test the trend and totals of merged month sketches equal one sketch over all days.
+    """
+    days = np.arange(120, dtype=np.float64)
+    values = 50 + 0.5 * days
+
+    whole = SystemSketch("wind", "UK")
+    whole.update(days, values)
+    merged = SystemSketch("wind", "UK")
+    for part_days, part_values in zip(np.array_split(days, 4), np.array_split(values, 4)):
+        part = SystemSketch("wind", "UK")
+        part.update(part_days, part_values)
+        merged.merge(part)
+
+    assert merged.days == whole.days == 120
+    assert merged.total == pytest.approx(whole.total)
+    assert merged.trend() == pytest.approx(whole.trend()) == 0.5
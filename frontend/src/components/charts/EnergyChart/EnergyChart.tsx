@@ -1,6 +1,6 @@
-import { useEffect, useState, useMemo } from "react";
+import { useEffect, useState, useMemo, useRef } from "react";
 import { Line } from "react-chartjs-2";
-// import { api } from "../../../library/axios";
+import { api } from "../../../library/axios";
 import Filters from "./Filters";
 import dayjs from "dayjs";
 
@@ -29,10 +29,31 @@ ChartJS.register(
 type EnergyChartProps = {
     consumptionData: any[];
     generationData: any[];
+    // Changes when live updates arrive, so the series are refetched
+    dataVersion: number[];
 };
 
+type SeriesPoint = { bucket: string; key: string | null; value: number };
 
-export default function EnergyChart({ consumptionData, generationData }: EnergyChartProps) {
+// Daily totals downsampled server-side to one point per pixel of chart width.
+const fetchSeries = async (url: string, from: string, to: string, locations: string[] | null, points: number) => {
+    const res = await api.get<SeriesPoint[]>(url, {
+        params: { bucket: "day", from, to, location: locations ?? undefined, points },
+        paramsSerializer: { indexes: null },
+    });
+    const totals: Record<string, number> = {};
+    res.data.forEach(({ bucket, value }) => {
+        totals[bucket.split("T")[0]] = value;
+    });
+    return totals;
+};
+
+
+// Keeps the previous array (and so the selection) when the set of locations is unchanged.
+const sameLocations = (previous: string[], next: string[]) =>
+    previous.length === next.length && previous.every((location, i) => location === next[i]);
+
+export default function EnergyChart({ consumptionData, generationData, dataVersion }: EnergyChartProps) {
     const dateList = useMemo(() => {
         const dates = [];
         let current = dayjs("2023-01-01");
@@ -55,6 +76,17 @@ export default function EnergyChart({ consumptionData, generationData }: EnergyC
     const [generationLocations, setGenerationLocations] = useState<string[]>([]);
     const [selectedConsumptionLocations, setSelectedConsumptionLocations] = useState<string[]>([]);
     const [selectedGenerationLocations, setSelectedGenerationLocations] = useState<string[]>([]);
+    const [consumptionTotals, setConsumptionTotals] = useState<Record<string, number>>({});
+    const [generationTotals, setGenerationTotals] = useState<Record<string, number>>({});
+    const chartRef = useRef<HTMLDivElement>(null);
+    const [chartWidth, setChartWidth] = useState(600);
+
+    useEffect(() => {
+        if (!chartRef.current) return;
+        const observer = new ResizeObserver(([entry]) => setChartWidth(Math.round(entry.contentRect.width)));
+        observer.observe(chartRef.current);
+        return () => observer.disconnect();
+    }, []);
 
     // useEffect(() => {
     //     const fetchConsumption = async () => {
@@ -95,55 +127,59 @@ export default function EnergyChart({ consumptionData, generationData }: EnergyC
     }, [dateList]);
 
     useEffect(() => {
-        const consumptionLocs = new Set(consumptionData.map((item) => item.location));
-        const generationLocs = new Set(generationData.map((item) => item.location));
+        const consumptionLocs = Array.from(new Set(consumptionData.map((item) => item.location))).sort();
+        const generationLocs = Array.from(new Set(generationData.map((item) => item.location))).sort();
 
-        setConsumptionLocations(Array.from(consumptionLocs));
-        setGenerationLocations(Array.from(generationLocs));
-        setSelectedConsumptionLocations(Array.from(consumptionLocs));
-        setSelectedGenerationLocations(Array.from(generationLocs));
+        if (!sameLocations(consumptionLocations, consumptionLocs)) {
+            setConsumptionLocations(consumptionLocs);
+            setSelectedConsumptionLocations(consumptionLocs);
+        }
+        if (!sameLocations(generationLocations, generationLocs)) {
+            setGenerationLocations(generationLocs);
+            setSelectedGenerationLocations(generationLocs);
+        }
+        // eslint-disable-next-line react-hooks/exhaustive-deps
     }, [consumptionData, generationData]);
 
     const startDate = dayjs(dateList[dateRange[0]]);
     const endDate = dayjs(dateList[dateRange[1]]);
 
-    const filteredConsumption = consumptionData.filter((entry) => {
-        const entryDate = dayjs(entry.timestamp);
-        return (
-            selectedConsumptionLocations.includes(entry.location) &&
-            entryDate.isAfter(startDate.subtract(1, "day")) &&
-            entryDate.isBefore(endDate.add(1, "day"))
-        );
-    });
-
-    const filteredGeneration = generationData.filter((entry) => {
-        const entryDate = dayjs(entry.timestamp);
-        return (
-            selectedGenerationLocations.includes(entry.location) &&
-            entryDate.isAfter(startDate.subtract(1, "day")) &&
-            entryDate.isBefore(endDate.add(1, "day"))
-        );
-    });
-
-    const groupByDate = (data: any[]) => {
-        const totals: Record<string, number> = {};
-        data.forEach(({ timestamp, energy_kwh }) => {
-            const date = timestamp.split("T")[0];
-            totals[date] = (totals[date] || 0) + energy_kwh;
-        });
-        return totals;
-    };
+    useEffect(() => {
+        if (!startDate.isValid() || !endDate.isValid()) return;
+        const from = startDate.format("YYYY-MM-DD");
+        const to = endDate.add(1, "day").format("YYYY-MM-DD");
+        const points = Math.max(3, chartWidth);
+        // No location filter when everything is selected; nothing to fetch when nothing is
+        const load = (url: string, all: string[], selected: string[]) =>
+            selected.length === 0
+                ? Promise.resolve({})
+                : fetchSeries(url, from, to, selected.length === all.length ? null : selected, points);
 
-    const consumptionTotals = groupByDate(filteredConsumption);
-    const generationTotals = groupByDate(filteredGeneration);
+        let cancelled = false;
+        Promise.all([
+            load("/energy/consumption/series", consumptionLocations, selectedConsumptionLocations),
+            load("/energy/generation/series", generationLocations, selectedGenerationLocations),
+        ])
+            .then(([consumption, generation]) => {
+                if (cancelled) return;
+                setConsumptionTotals(consumption);
+                setGenerationTotals(generation);
+            })
+            .catch((err) => console.error("❌ Error fetching energy series", err));
+        return () => {
+            cancelled = true;
+        };
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [dateRange, chartWidth, dataVersion, consumptionLocations, generationLocations, selectedConsumptionLocations, selectedGenerationLocations]);
 
     const allDates = Array.from(
         new Set([...Object.keys(consumptionTotals), ...Object.keys(generationTotals)])
     ).sort();
 
     const labels = allDates;
-    const consumption = allDates.map((date) => consumptionTotals[date] ?? 0);
-    const generation = allDates.map((date) => generationTotals[date] ?? 0);
+    // Downsampled series keep different days, so gaps are bridged rather than drawn as zero
+    const consumption = allDates.map((date) => consumptionTotals[date] ?? null);
+    const generation = allDates.map((date) => generationTotals[date] ?? null);
 
     const datasets = [];
 
@@ -155,6 +191,7 @@ export default function EnergyChart({ consumptionData, generationData }: EnergyC
             borderColor: "rgb(75, 192, 192)",
             tension: 0.3,
             pointRadius: 3,
+            spanGaps: true,
         });
     }
 
@@ -166,6 +203,7 @@ export default function EnergyChart({ consumptionData, generationData }: EnergyC
             borderColor: "rgb(255, 99, 132)",
             tension: 0.3,
             pointRadius: 3,
+            spanGaps: true,
         });
     }
 
@@ -223,7 +261,7 @@ export default function EnergyChart({ consumptionData, generationData }: EnergyC
                 setSelectedGenerationLocations={setSelectedGenerationLocations}
             />
             <h2 className="text-lg font-semibold mb-4">Energy Generation vs Consumption</h2>
-            <div className="w-full min-w-[600px]">
+            <div ref={chartRef} className="w-full min-w-[600px]">
                 <Line data={data} options={options} />
             </div>
         </div>
@@ -1,35 +1,93 @@
-import { useEffect, useState } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 import { api } from "../library/axios";
 import EnergyChart from "../components/charts/EnergyChart/EnergyChart";
 import SectorBarChart from "../components/charts/SourceBarChart/SourceBarChart";
 import PieChart from "../components/charts/PieChart/PieChart";
 
+const PAGE_LIMIT = 10000;
+
+// Follows the X-Next-Cursor header until the listing is exhausted. With `since`, only rows
+// ingested after that mark are listed; the first page's X-High-Water-Mark is the next one.
+const fetchAllPages = async (url: string, since?: number) => {
+    const rows: any[] = [];
+    let after: string | undefined;
+    let highWater: number | undefined;
+    do {
+        const res = await api.get(url, { params: { limit: PAGE_LIMIT, after, since } });
+        rows.push(...res.data);
+        highWater ??= Number(res.headers["x-high-water-mark"]);
+        after = res.headers["x-next-cursor"];
+    } while (after);
+    return { rows, highWater };
+};
+
+// Appends pushed or delta-synced readings, skipping ids already loaded (the two may overlap).
+const mergeReadings = (rows: any[], readings: any[]) => {
+    const ids = new Set(rows.map((row) => row.id));
+    const added = readings.filter((row) => !ids.has(row.id));
+    return added.length ? [...rows, ...added] : rows;
+};
+
+type LiveDataset = { count: number; readings: any[] };
+
 export default function Dashboard() {
     const [consumptionData, setConsumptionData] = useState<any[]>([]);
     const [generationData, setGenerationData] = useState<any[]>([]);
+    const [dataVersion, setDataVersion] = useState<number[]>([]);
+    // High-water marks of the last listings; later fetches only ask for rows ingested after them
+    const highWater = useRef<{ consumption?: number; generation?: number }>({});
+
+    const fetchData = useCallback(async () => {
+        try {
+            const marks = highWater.current;
+            const [cons, gen] = await Promise.all([
+                fetchAllPages("/energy/consumption", marks.consumption),
+                fetchAllPages("/energy/generation", marks.generation),
+            ]);
+            if (marks.consumption === undefined) setConsumptionData(cons.rows);
+            else setConsumptionData((rows) => mergeReadings(rows, cons.rows));
+            if (marks.generation === undefined) setGenerationData(gen.rows);
+            else setGenerationData((rows) => mergeReadings(rows, gen.rows));
+            highWater.current = { consumption: cons.highWater, generation: gen.highWater };
+        } catch (err) {
+            console.error("❌ Error fetching dashboard data", err);
+        }
+    }, []);
 
     useEffect(() => {
-        const fetchData = async () => {
-            try {
-                const [consRes, genRes] = await Promise.all([
-                    api.get("/energy/consumption"),
-                    api.get("/energy/generation"),
-                ]);
-                setConsumptionData(consRes.data);
-                setGenerationData(genRes.data);
-            } catch (err) {
-                console.error("❌ Error fetching dashboard data", err);
+        fetchData();
+    }, [fetchData]);
+
+    // New readings are pushed by the server; only a missed update (resync) or a truncated one triggers a delta sync.
+    useEffect(() => {
+        const token = localStorage.getItem("token");
+        if (!token) return;
+        const source = new EventSource(`${api.defaults.baseURL ?? ""}/energy/live?token=${encodeURIComponent(token)}`);
+
+        source.addEventListener("update", (event) => {
+            const update: { version: number[]; consumption?: LiveDataset; generation?: LiveDataset } = JSON.parse(
+                (event as MessageEvent).data
+            );
+            const datasets = [update.consumption, update.generation].filter(Boolean) as LiveDataset[];
+            if (datasets.some(({ count, readings }) => count > readings.length)) {
+                fetchData();
+            } else {
+                if (update.consumption) setConsumptionData((rows) => mergeReadings(rows, update.consumption!.readings));
+                if (update.generation) setGenerationData((rows) => mergeReadings(rows, update.generation!.readings));
             }
-        };
+            setDataVersion(update.version);
+        });
+        source.addEventListener("resync", () => fetchData());
 
-        fetchData();
-    }, []);
+        return () => source.close();
+    }, [fetchData]);
 
     return (
         <div className="max-w-7xl mx-auto p-4 space-y-4">
             <EnergyChart
                 consumptionData={consumptionData}
                 generationData={generationData}
+                dataVersion={dataVersion}
             />
             <div className="flex flex-col md:flex-row gap-4">
                 <div className="w-full md:w-1/2">